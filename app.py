@@ -4,9 +4,24 @@ import numpy as np
 import joblib
 import json
 import os
+import asyncio
+import tempfile
+import time
 from datetime import datetime
-from utils.webscraper import scrape_website_metadata, format_metadata_for_display
-from PIL import Image
+from utils.feature_encoder import FeatureEncoder, SCRAPED_DEFAULTS
+from utils.tree_engine import load_website_forest, predict_with_proba
+from utils.inference_client import ServerConnection, RemoteWebsiteModel, RemoteImageModel
+from utils.bulk_analysis import run_bulk_analysis, parse_url_list, DEFAULT_MAX_CONCURRENCY, DEFAULT_PER_HOST_LIMIT
+from utils.batch_predict import predict_csv_in_chunks, DEFAULT_CHUNK_SIZE, RESULT_COLUMNS, MAX_DOWNLOAD_BYTES
+from utils.known_domains import load_known_domains
+from utils.content_classifier import classify_content, CONTENT_MIN_CONFIDENCE
+from utils.news_analysis import AnalysisCache, analysis_cache_key, build_analysis_prompt, parse_analysis, ANALYSIS_MODEL, ANALYSIS_TEMPERATURE, ANALYSIS_MAX_TOKENS
+from utils.image_preprocess import open_image, preprocess_image
+from utils.bulk_images import count_images, iter_image_files, iter_image_predictions, DEFAULT_BATCH_SIZE, RESULT_COLUMNS as IMAGE_RESULT_COLUMNS
+from utils.image_cache import ImageResultCache, image_digest, model_version, perceptual_hash
+from utils.image_model_runtime import image_model_path
+from utils.image_inference import load_fast_image_model, latency_report
+from utils.startup import record_load, load_status, load_report, start_prewarm, import_report
 import io
 
 # Page configuration
@@ -54,11 +69,38 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Load website credibility model
-@st.cache_resource
+WEBSITE_MODEL_PATH = 'models/stacking_model.joblib'
+IMAGE_MODEL_PATH = 'models/resnet50_best_fixed.keras'
+
+# Models and API clients are loaded by the tab that first needs them, not at startup.
+# With INFERENCE_SERVER_URL set, predictions go to the model server (python -m utils.inference_server).
+# A server that did not answer is retried after INFERENCE_RETRY_SECONDS, not given up on for good
+@st.cache_resource(show_spinner=False)
+def inference_server_connection():
+    return ServerConnection()
+
+def get_inference_server():
+    return inference_server_connection().get()
+
+# In-process website model (memory-mapped arrays if converted, else the joblib forest)
+@st.cache_resource(show_spinner="Loading website credibility model...")
+def load_local_website_model():
+    return load_website_forest(WEBSITE_MODEL_PATH)
+
+# Load website credibility model; cached separately for server and in-process scoring,
+# so a model server that comes up after the app is used from then on
 def load_website_model():
+    return load_website_model_for('website' in get_inference_server()[1])
+
+@st.cache_resource(show_spinner="Loading website credibility model...")
+def load_website_model_for(use_server):
+    started = time.perf_counter()
     try:
-        model = joblib.load('models/stacking_model.joblib')
+        inference_client, served_models = get_inference_server()
+        if use_server and 'website' in served_models:
+            model = RemoteWebsiteModel(inference_client, served_models['website'], fallback=load_local_website_model)
+        else:
+            model = load_local_website_model()
         features = joblib.load('models/feature_names.joblib')
         with open('models/model_metadata.json', 'r') as f:
             metadata = json.load(f)
@@ -69,35 +111,67 @@ def load_website_model():
         if len(features) > n_features_expected:
             features = features[:n_features_expected]
 
+        # Precompile the (column, value) -> index table once for all scoring paths
+        encoder = FeatureEncoder(features)
         
-        return model, features, metadata, True
+        record_load('website', started)
+        return model, features, encoder, metadata, True
     except Exception as e:
-        return None, None, None, False
+        record_load('website', started, error=str(e))
+        return None, None, None, None, False
 
-# Load AI image detection model
-@st.cache_resource
+# In-process image model (imports Keras/TensorFlow, the slowest part of a cold start).
+# With IMAGE_MODEL_RUNTIME=tflite the quantized export is loaded instead (python -m utils.image_model_runtime)
+@st.cache_resource(show_spinner="Loading image detection model...")
+def load_local_image_model():
+    import warnings
+    warnings.filterwarnings('ignore')
+    
+    # Load the Keras model (.keras file is a zip format in Keras 3.x)
+    # Using FIXED version with data_format parameter removed from RandomFlip
+    # Wrapped in a compiled call path and warmed up, so the first Analyze click is not the slow one
+    return load_fast_image_model(image_model_path(IMAGE_MODEL_PATH))
+
+# Load AI image detection model (cached per scoring path like the website model)
 def load_image_model():
+    return load_image_model_for('image' in get_inference_server()[1])
+
+@st.cache_resource(show_spinner="Loading image detection model...")
+def load_image_model_for(use_server):
+    started = time.perf_counter()
     try:
-        import keras  # Keras 3.x is standalone, not from tensorflow
-        import warnings
-        warnings.filterwarnings('ignore')
-        
-        # Load the Keras model (.keras file is a zip format in Keras 3.x)
-        # Using FIXED version with data_format parameter removed from RandomFlip
-        model = keras.models.load_model('models/resnet50_best_fixed.keras')
+        inference_client, served_models = get_inference_server()
+        if use_server and 'image' in served_models:
+            model = RemoteImageModel(inference_client, served_models['image'], fallback=load_local_image_model)
+        else:
+            model = load_local_image_model()
         
+        record_load('image', started)
         return model, True
     except Exception as e:
-        # Store error message for display
+        # Store error message for display (may run in the prewarm thread, so not in session state)
         error_msg = str(e)
         if "batch_normalization" in error_msg.lower() or "input" in error_msg.lower():
-            st.session_state['image_model_error'] = "Keras version mismatch: Model requires Keras 3.x"
+            record_load('image', started, error="Keras version mismatch: Model requires Keras 3.x")
         else:
-            st.session_state['image_model_error'] = f"Error: {error_msg[:200]}"
+            record_load('image', started, error=f"Error: {error_msg[:200]}")
         return None, False
 
+@st.cache_resource
+def load_known_domain_index():
+    started = time.perf_counter()
+    try:
+        index = load_known_domains()
+        record_load('known_domains', started)
+        return index
+    except Exception as e:
+        record_load('known_domains', started, error=str(e))
+        return None
+
 # Initialize Groq API from environment variable
+@st.cache_resource(show_spinner=False)
 def initialize_groq():
+    started = time.perf_counter()
     try:
         api_key = os.getenv('GROQ_API_KEY')
         if not api_key:
@@ -109,17 +183,88 @@ def initialize_groq():
             api_key=api_key,
             base_url="https://api.groq.com/openai/v1"
         )
+        record_load('groq', started)
         return client, None
     except Exception as e:
+        record_load('groq', started, error=str(e))
         return None, str(e)
 
-# Load all models
-website_model, feature_names, model_info, website_model_loaded = load_website_model()
-image_model, image_model_loaded = load_image_model()
+# Results of previously analyzed images, keyed by content hash and model version
+@st.cache_resource(show_spinner=False)
+def load_image_cache():
+    try:
+        if os.path.exists(IMAGE_MODEL_PATH):
+            # The quantized model's probabilities differ slightly, so it gets its own entries
+            version = model_version(image_model_path(IMAGE_MODEL_PATH))
+        else:
+            version = get_inference_server()[1].get('image', {}).get('version')
+        return ImageResultCache(version) if version else None
+    except Exception as e:
+        return None
+
+# Parsed LLM verdicts keyed by normalized article text, prompt version, model and temperature
+@st.cache_resource(show_spinner=False)
+def load_analysis_cache():
+    try:
+        return AnalysisCache()
+    except Exception as e:
+        return None
 
-# Initialize Groq API on startup
-groq_client, groq_error = initialize_groq()
-groq_initialized = groq_client is not None
+# Optional background prewarming (PREWARM_MODELS=website,image or all), started once per process
+@st.cache_resource
+def prewarm_models():
+    return start_prewarm({
+        'website': load_website_model,
+        'known_domains': load_known_domain_index,
+        'groq': initialize_groq,
+        'image': load_image_model,
+    })
+
+prewarm_models()
+
+groq_configured = bool(os.getenv('GROQ_API_KEY'))
+
+def image_model_available():
+    # Either the local Keras file or a model server that has the image model loaded
+    return os.path.exists(IMAGE_MODEL_PATH) or 'image' in get_inference_server()[1]
+
+def show_load_status(name, ready_caption, missing_caption):
+    status = load_status(name)
+    if status is None:
+        st.info("Status: Loads on first use")
+        st.caption(missing_caption)
+    elif status['error']:
+        st.error("Status: Not Loaded")
+        st.caption(status['error'])
+    else:
+        st.success("Status: Loaded")
+        st.caption(f"{ready_caption} (loaded in {status['seconds']:.1f}s)")
+
+def discard_batch_output():
+    # Scored CSVs stay in the temp directory only until offered for download or replaced by the next run
+    output_path = st.session_state.pop('batch_output_path', None)
+    if output_path:
+        try:
+            os.remove(output_path)
+        except OSError:
+            pass
+
+def offer_batch_download(output_path, label, file_name):
+    # st.download_button holds the whole file in server memory, so very large results are not offered
+    size = os.path.getsize(output_path)
+    if size > MAX_DOWNLOAD_BYTES:
+        st.warning(f"The results file is {size / 1e6:,.0f} MB, over the {MAX_DOWNLOAD_BYTES / 1e6:,.0f} MB "
+                   "download limit. Split the input into smaller files to download the results.")
+    else:
+        with open(output_path, 'rb') as results_file:
+            st.download_button(
+                label=label,
+                data=results_file,
+                file_name=file_name,
+                mime="text/csv",
+                use_container_width=True
+            )
+    discard_batch_output()
 
 # Header
 st.markdown('<h1 class="main-header">AI Detection Suite</h1>', unsafe_allow_html=True)
@@ -133,24 +278,18 @@ with st.sidebar:
     
     # Website Model Status
     st.markdown("#### Website Credibility Model")
-    if website_model_loaded:
-        st.success("Status: Loaded")
-        st.caption("Model ready for analysis")
-    else:
-        st.error("Status: Not Loaded")
+    show_load_status('website', "Model ready for analysis",
+                     "Loaded by the URL, manual entry and batch tabs")
+    if load_status('website') and load_status('website')['error']:
         st.caption("Check if models/stacking_model.joblib exists")
     
     st.divider()
     
     # Image Model Status
     st.markdown("#### AI Image Detection Model")
-    if image_model_loaded:
-        st.success("Status: Loaded")
-        st.caption("Model ready for predictions")
-    else:
-        st.error("Status: Not Loaded")
-        if 'image_model_error' in st.session_state:
-            st.caption(st.session_state['image_model_error'])
+    show_load_status('image', "Model ready for predictions",
+                     "Loaded when the first image is analyzed")
+    if load_status('image') and load_status('image')['error']:
         st.info("""
         **Issue:** The model was saved with Keras 3.10.0 but we have Keras 2.15.0
         
@@ -165,19 +304,35 @@ with st.sidebar:
     st.markdown("#### Fake News Detection (AI-Powered)")
     st.markdown("**Groq API Status**")
     
-    if groq_initialized:
-        st.success("Status: Connected")
+    groq_status = load_status('groq')
+    if groq_configured and not (groq_status and groq_status['error']):
+        st.success("Status: Connected" if groq_status else "Status: Configured")
         st.caption("Groq AI ready for analysis")
     else:
         st.error("Status: Not Connected")
-        if groq_error:
-            st.caption(f"Error: {groq_error}")
+        if groq_status and groq_status['error']:
+            st.caption(f"Error: {groq_status['error']}")
         else:
             st.caption("Set GROQ_API_KEY environment variable")
         st.info("""To enable this feature, set the GROQ_API_KEY environment variable.
         
 Get your key at: https://console.groq.com/""")
     
+    st.divider()
+    with st.expander("Startup Report"):
+        loads = load_report()
+        if loads:
+            st.dataframe(pd.DataFrame(loads), use_container_width=True, hide_index=True)
+        else:
+            st.caption("Nothing loaded yet")
+        latencies = latency_report()
+        if latencies:
+            st.markdown("**Image inference latency** (single image)")
+            st.dataframe(pd.DataFrame(latencies), use_container_width=True, hide_index=True)
+        if st.button("Measure import costs", help="Cold import time of each heavy dependency in a fresh interpreter"):
+            with st.spinner("Measuring imports..."):
+                st.dataframe(pd.DataFrame(import_report()), use_container_width=True, hide_index=True)
+    
     st.divider()
     st.caption("AI Detection Suite v2.0")
     st.caption("Multi-Model Analysis Platform")
@@ -205,11 +360,42 @@ with tab1:
     col_scrape1, col_scrape2 = st.columns([1, 3])
     with col_scrape1:
         scrape_button = st.button("Analyze Website", type="primary", use_container_width=True)
+    with col_scrape2:
+        force_full_scrape = st.checkbox("Always run a full scrape (skip the curated source lists)",
+                                        key="force_full_scrape")
+    
+    # Domains on the curated trusted/untrusted lists get an instant verdict without any network requests
+    known_entry = None
+    if scrape_button and url_input and not force_full_scrape:
+        known_domains = load_known_domain_index()
+        if known_domains is not None:
+            known_entry = known_domains.lookup(url_input)
+    
+    if known_entry is not None:
+        st.success(f"{known_entry['domain']} is on the curated source lists ({known_entry['source']})")
+        
+        st.divider()
+        st.markdown("### Analysis Result")
+        if known_entry['verdict'] == 'Trusted':
+            st.success("**TRUSTED WEBSITE**")
+        else:
+            st.error("**UNTRUSTED WEBSITE**")
+        st.caption("Verdict taken from the curated list - no requests were made. "
+                   "Tick 'Always run a full scrape' to analyze the live site instead.")
+        
+        with st.expander("Curated Metadata", expanded=True):
+            st.dataframe(
+                pd.DataFrame(list(known_entry['metadata'].items()), columns=['Field', 'Value']),
+                use_container_width=True,
+                hide_index=True
+            )
     
-    if scrape_button and url_input:
+    elif scrape_button and url_input:
         with st.spinner(f"Analyzing {url_input}..."):
-            # Scrape website
-            scraped_data = scrape_website_metadata(url_input)
+            from utils.webscraper import scrape_website_metadata_async
+            
+            # Scrape website (HTTP, TLS and WHOIS stages run concurrently)
+            scraped_data = asyncio.run(scrape_website_metadata_async(url_input))
             
             if 'error' in scraped_data:
                 st.error(f"Error: {scraped_data['error']}")
@@ -253,70 +439,20 @@ with tab1:
                         st.write(f"Mobile: {scraped_data.get('mobile_responsive', 'No')}")
                 
                 # Make prediction
+                website_model, feature_names, feature_encoder, model_info, website_model_loaded = load_website_model()
                 if website_model_loaded:
                     with st.spinner("Making prediction..."):
-                        # Convert scraped data to DataFrame
-                        # Calculate domain age bucket
-                        domain_age = scraped_data.get('domain_age_years', 0.0)
-                        if domain_age < 1:
-                            domain_age_bucket = '0-1y'
-                        elif domain_age < 5:
-                            domain_age_bucket = '1-5y'
-                        elif domain_age < 10:
-                            domain_age_bucket = '5-10y'
-                        elif domain_age < 20:
-                            domain_age_bucket = '10-20y'
-                        else:
-                            domain_age_bucket = '20y+'
-                        
-                        input_data = {
-                            'has_https': scraped_data.get('has_https', 'No'),
-                            'ssl_valid': scraped_data.get('ssl_valid', 'No'),
-                            'ssl_issuer': scraped_data.get('ssl_issuer', 'Unknown'),
-                            'tls_version': scraped_data.get('tls_version', 'none'),
-                            'certificate_type': scraped_data.get('certificate_type', 'none'),
-                            'domain_age_years': domain_age,
-                            'domain_age_bucket': domain_age_bucket,
-                            'domain_registrar': scraped_data.get('domain_registrar', 'Unknown'),
-                            'whois_privacy_enabled': scraped_data.get('whois_privacy_enabled', False),
-                            'page_load_time_sec': scraped_data.get('page_load_time_sec', 0.0),
-                            'redirect_count': scraped_data.get('redirect_count', 0),
-                            'server_response_code': scraped_data.get('server_response_code', 404),
-                            'ads_density_score': scraped_data.get('ads_density_score', 0.0),
-                            'external_links_count': scraped_data.get('external_links_count', 0),
-                            'popups_present': scraped_data.get('popups_present', 'No'),
-                            'server_location': scraped_data.get('server_location', 'Unknown'),
-                            'hosting_type': scraped_data.get('hosting_type', 'shared'),
-                            'cdn_used': scraped_data.get('cdn_used', 'no'),
-                            'contact_info_available': scraped_data.get('contact_info_available', False),
-                            'privacy_policy_exists': scraped_data.get('privacy_policy_exists', False),
-                            'terms_of_service_exists': scraped_data.get('terms_of_service_exists', False),
-                            'social_media_presence': scraped_data.get('social_media_presence', 'low'),
-                            'content_update_frequency': scraped_data.get('content_update_frequency', 'irregular'),
-                            'mobile_responsive': scraped_data.get('mobile_responsive', 'No')
-                        }
-                        
-                        df_scraped = pd.DataFrame([input_data])
-                        
-                        # Get encoded features with one-hot encoding
-                        df_encoded = pd.get_dummies(df_scraped)
-                        
-                        # Create a dataframe with all required features
-                        df_final = pd.DataFrame(0, index=[0], columns=feature_names)
-                        
-                        # Fill in the features that we have
-                        for col in df_encoded.columns:
-                            if col in feature_names:
-                                df_final[col] = df_encoded[col].values[0]
+                        # Encode scraped metadata straight into the model's feature row
+                        X_scraped = feature_encoder.encode(scraped_data, defaults=SCRAPED_DEFAULTS)[np.newaxis, :]
                         
                         # Ensure we have exactly the right number of features
-                        if len(df_final.columns) != website_model.n_features_in_:
-                            st.error(f"Feature mismatch: {len(df_final.columns)} provided, {website_model.n_features_in_} expected")
+                        if X_scraped.shape[1] != website_model.n_features_in_:
+                            st.error(f"Feature mismatch: {X_scraped.shape[1]} provided, {website_model.n_features_in_} expected")
                             st.stop()
                         
                         # Make prediction
-                        prediction = website_model.predict(df_final)[0]
-                        prediction_proba = website_model.predict_proba(df_final)[0]
+                        labels, probabilities = predict_with_proba(website_model, X_scraped)
+                        prediction, prediction_proba = labels[0], probabilities[0]
                         
                         # Display result
                         st.divider()
@@ -392,6 +528,94 @@ with tab1:
     
     elif scrape_button and not url_input:
         st.warning("Please enter a URL to analyze")
+    
+    # Bulk URL analysis
+    st.divider()
+    st.markdown("### Bulk URL Analysis")
+    st.markdown("Paste a list of URLs (one per line) or upload a file to scrape and score many websites at once.")
+    
+    col_bulk1, col_bulk2 = st.columns(2)
+    with col_bulk1:
+        bulk_text = st.text_area("URLs", height=150, placeholder="https://example.com\nexample.org", key="bulk_urls")
+    with col_bulk2:
+        bulk_file = st.file_uploader("Or upload a URL list", type=["txt", "csv"], key="bulk_url_file")
+        bulk_concurrency = st.slider("Concurrent requests", 1, 32, DEFAULT_MAX_CONCURRENCY)
+        bulk_per_host = st.slider("Concurrent requests per host", 1, 8, DEFAULT_PER_HOST_LIMIT)
+        bulk_head_only = st.checkbox("Quick scan (download only each page's head and first KB)",
+                                     help="Much less data per URL; content features only see the top of each page")
+    
+    bulk_button = st.button("Analyze All URLs", type="primary")
+    
+    if bulk_button:
+        bulk_source = bulk_text or ''
+        if bulk_file is not None:
+            bulk_source += '\n' + bulk_file.read().decode('utf-8', errors='ignore')
+        bulk_urls = parse_url_list(bulk_source)
+        website_model, feature_names, feature_encoder, model_info, website_model_loaded = load_website_model()
+        known_domains = None if force_full_scrape else load_known_domain_index()
+        
+        if not bulk_urls:
+            st.warning("Please enter or upload at least one URL")
+        elif not website_model_loaded:
+            st.error("Model not loaded. Please check model files.")
+        else:
+            bulk_progress = st.progress(0.0, text=f"Analyzing {len(bulk_urls)} URLs...")
+            bulk_table = st.empty()
+            bulk_rows = []
+            
+            def show_bulk_result(url, scraped):
+                row = {'URL': url, 'Domain': scraped.get('domain', ''), 'Source': 'Live scrape', 'Prediction': 'Error',
+                       'Confidence': None, 'Trust_Probability': None, 'Error': scraped.get('error', '')}
+                if 'error' not in scraped:
+                    X_row = feature_encoder.encode(scraped, defaults=SCRAPED_DEFAULTS)[np.newaxis, :]
+                    labels, probabilities = predict_with_proba(website_model, X_row)
+                    row['Prediction'] = 'Trusted' if labels[0] == 1 else 'Untrusted'
+                    row['Confidence'] = probabilities[0].max() * 100
+                    row['Trust_Probability'] = probabilities[0][1] * 100
+                    row.update({k: v for k, v in scraped.items() if k not in ('domain', 'debug_info')})
+                bulk_rows.append(row)
+                render_bulk_rows()
+            
+            def render_bulk_rows():
+                # Render results as they complete
+                bulk_progress.progress(len(bulk_rows) / len(bulk_urls),
+                                       text=f"Analyzed {len(bulk_rows)} of {len(bulk_urls)} URLs")
+                bulk_table.dataframe(
+                    pd.DataFrame(bulk_rows)[['URL', 'Source', 'Prediction', 'Confidence', 'Trust_Probability', 'Error']],
+                    use_container_width=True
+                )
+            
+            # Curated domains are answered from the index straight away; only the rest are scraped
+            urls_to_scrape = []
+            for url in bulk_urls:
+                entry = None
+                if known_domains is not None:
+                    entry = known_domains.lookup(url)
+                if entry is None:
+                    urls_to_scrape.append(url)
+                    continue
+                bulk_rows.append({'URL': url, 'Domain': entry['domain'], 'Source': 'Curated list',
+                                  'Prediction': entry['verdict'], 'Confidence': None,
+                                  'Trust_Probability': None, 'Error': ''})
+            if bulk_rows:
+                render_bulk_rows()
+            
+            run_bulk_analysis(urls_to_scrape, show_bulk_result, max_concurrency=bulk_concurrency,
+                              per_host_limit=bulk_per_host, head_only=bulk_head_only)
+            
+            bulk_results = pd.DataFrame(bulk_rows)
+            trusted_count = (bulk_results['Prediction'] == 'Trusted').sum()
+            error_count = (bulk_results['Prediction'] == 'Error').sum()
+            st.success(f"Analyzed {len(bulk_results)} URLs: {trusted_count} trusted, "
+                       f"{len(bulk_results) - trusted_count - error_count} untrusted, {error_count} failed")
+            
+            st.download_button(
+                label="Download Bulk Results CSV",
+                data=bulk_results.to_csv(index=False),
+                file_name="bulk_url_analysis.csv",
+                mime="text/csv",
+                use_container_width=True
+            )
 
 # Tab 2: Manual Entry
 with tab2:
@@ -442,66 +666,43 @@ with tab2:
         mobile_responsive = st.selectbox("Mobile Responsive?", ["Yes", "No", "Partial"])
     
     if st.button("Check Credibility", type="primary", use_container_width=True):
+        website_model, feature_names, feature_encoder, model_info, website_model_loaded = load_website_model()
         if website_model_loaded:
-            # Calculate domain age bucket
-            if domain_age < 1:
-                domain_age_bucket = '0-1y'
-            elif domain_age < 5:
-                domain_age_bucket = '1-5y'
-            elif domain_age < 10:
-                domain_age_bucket = '5-10y'
-            elif domain_age < 20:
-                domain_age_bucket = '10-20y'
-            else:
-                domain_age_bucket = '20y+'
-            
-            # Create input dataframe
-            input_data = pd.DataFrame({
-                'has_https': [has_https],
-                'ssl_valid': [ssl_valid],
-                'ssl_issuer': [ssl_issuer],
-                'tls_version': [tls_version],
-                'certificate_type': [certificate_type],
-                'domain_age_years': [domain_age],
-                'domain_age_bucket': [domain_age_bucket],
-                'domain_registrar': [domain_registrar],
-                'whois_privacy_enabled': [whois_privacy],
-                'page_load_time_sec': [page_load_time],
-                'redirect_count': [redirect_count],
-                'server_response_code': [response_code],
-                'ads_density_score': [ads_density],
-                'external_links_count': [external_links],
-                'popups_present': [popups],
-                'server_location': [server_location],
-                'hosting_type': [hosting_type],
-                'cdn_used': [cdn_used],
-                'contact_info_available': [contact_info],
-                'privacy_policy_exists': [privacy_policy],
-                'terms_of_service_exists': [terms_of_service],
-                'social_media_presence': [social_media],
-                'content_update_frequency': [content_update],
-                'mobile_responsive': [mobile_responsive]
-            })
-            
-            # One-hot encode categorical features
-            input_encoded = pd.get_dummies(input_data)
-            
-            # Create a dataframe with all required features
-            input_final = pd.DataFrame(0, index=[0], columns=feature_names)
-            
-            # Fill in the features that we have
-            for col in input_encoded.columns:
-                if col in feature_names:
-                    input_final[col] = input_encoded[col].values[0]
+            # Encode inputs straight into the model's feature row
+            input_final = feature_encoder.encode({
+                'has_https': has_https,
+                'ssl_valid': ssl_valid,
+                'ssl_issuer': ssl_issuer,
+                'tls_version': tls_version,
+                'certificate_type': certificate_type,
+                'domain_age_years': domain_age,
+                'domain_registrar': domain_registrar,
+                'whois_privacy_enabled': whois_privacy,
+                'page_load_time_sec': page_load_time,
+                'redirect_count': redirect_count,
+                'server_response_code': response_code,
+                'ads_density_score': ads_density,
+                'external_links_count': external_links,
+                'popups_present': popups,
+                'server_location': server_location,
+                'hosting_type': hosting_type,
+                'cdn_used': cdn_used,
+                'contact_info_available': contact_info,
+                'privacy_policy_exists': privacy_policy,
+                'terms_of_service_exists': terms_of_service,
+                'social_media_presence': social_media,
+                'content_update_frequency': content_update,
+                'mobile_responsive': mobile_responsive
+            })[np.newaxis, :]
             
             # Validate feature count
-            if len(input_final.columns) != website_model.n_features_in_:
-                st.error(f"Feature mismatch: {len(input_final.columns)} provided, {website_model.n_features_in_} expected")
+            if input_final.shape[1] != website_model.n_features_in_:
+                st.error(f"Feature mismatch: {input_final.shape[1]} provided, {website_model.n_features_in_} expected")
                 st.stop()
             
             # Make prediction
-            prediction = website_model.predict(input_final)[0]
-            probability = website_model.predict_proba(input_final)[0]
+            labels, probabilities = predict_with_proba(website_model, input_final)
+            prediction, probability = labels[0], probabilities[0]
             
             # Display results
             st.divider()
@@ -565,48 +766,64 @@ with tab3:
     
     if uploaded_file is not None:
         try:
-            # Read the CSV
-            batch_data = pd.read_csv(uploaded_file)
-            st.success(f"Loaded {len(batch_data)} records")
+            # Read only a preview - the full file is streamed in chunks during prediction
+            preview_data = pd.read_csv(uploaded_file, nrows=5)
+            uploaded_file.seek(0)
+            st.success(f"Loaded {uploaded_file.name} ({uploaded_file.size / 1e6:.1f} MB)")
             
             # Show preview
             with st.expander("Preview Data"):
-                st.dataframe(batch_data.head())
+                st.dataframe(preview_data)
+            
+            chunk_size = st.number_input("Rows per chunk", min_value=1000, max_value=500000,
+                                         value=DEFAULT_CHUNK_SIZE, step=1000)
+            
+            col_run, col_cancel = st.columns([1, 1])
+            with col_run:
+                run_batch = st.button("Run Batch Prediction", type="primary")
+            with col_cancel:
+                # Any click reruns the script, which interrupts a batch that is still running
+                cancel_batch = st.button("Cancel Batch Prediction")
             
-            if st.button("Run Batch Prediction", type="primary"):
+            if cancel_batch and st.session_state.get('batch_progress'):
+                progress = st.session_state.pop('batch_progress')
+                st.warning(f"Batch prediction cancelled after {progress['rows']:,} records")
+                if progress['rows'] > 0:
+                    offer_batch_download(progress['output_path'], "Download Partial Results CSV",
+                                         "website_credibility_predictions_partial.csv")
+                else:
+                    discard_batch_output()
+            
+            if run_batch:
+                website_model, feature_names, feature_encoder, model_info, website_model_loaded = load_website_model()
                 if website_model_loaded:
-                    # Calculate domain age bucket if not present
-                    if 'domain_age_bucket' not in batch_data.columns:
-                        batch_data['domain_age_bucket'] = pd.cut(
-                            batch_data['domain_age_years'],
-                            bins=[-np.inf, 1, 5, 10, 20, np.inf],
-                            labels=['0-1y', '1-5y', '5-10y', '10-20y', '20y+']
-                        )
-                    
-                    # One-hot encode
-                    batch_encoded = pd.get_dummies(batch_data)
-                    
-                    # Create a dataframe with all required features
-                    batch_final = pd.DataFrame(0, index=range(len(batch_data)), columns=feature_names)
-                    
-                    # Fill in the features that we have
-                    for col in batch_encoded.columns:
-                        if col in feature_names:
-                            batch_final[col] = batch_encoded[col].values
-                    
                     # Validate feature count
-                    if len(batch_final.columns) != website_model.n_features_in_:
-                        st.error(f"Feature mismatch: {len(batch_final.columns)} provided, {website_model.n_features_in_} expected")
+                    if feature_encoder.n_features != website_model.n_features_in_:
+                        st.error(f"Feature mismatch: {feature_encoder.n_features} provided, {website_model.n_features_in_} expected")
                         st.stop()
                     
-                    # Predict
-                    predictions = website_model.predict(batch_final)
-                    probabilities = website_model.predict_proba(batch_final)
+                    # A previous run's file (e.g. from an interrupted run) is removed before starting
+                    discard_batch_output()
+                    fd, output_path = tempfile.mkstemp(prefix='batch_predictions_', suffix='.csv')
+                    os.close(fd)
+                    st.session_state['batch_output_path'] = output_path
                     
-                    # Add results to dataframe
-                    batch_data['Prediction'] = ['Trusted' if p == 1 else 'Untrusted' for p in predictions]
-                    batch_data['Confidence'] = [max(prob)*100 for prob in probabilities]
-                    batch_data['Trust_Probability'] = [prob[1]*100 for prob in probabilities]
+                    progress = {'rows': 0, 'trusted': 0, 'untrusted': 0}
+                    progress_bar = st.progress(0.0, text="Starting batch prediction...")
+                    for progress in predict_csv_in_chunks(uploaded_file, output_path, website_model,
+                                                          feature_encoder, chunksize=int(chunk_size)):
+                        st.session_state['batch_progress'] = {**progress, 'output_path': output_path}
+                        progress_bar.progress(
+                            min(progress['bytes_read'] / max(uploaded_file.size, 1), 1.0),
+                            text=f"Scored {progress['rows']:,} records"
+                        )
+                    st.session_state.pop('batch_progress', None)
+                    progress_bar.empty()
+                    
+                    if progress['rows'] == 0:
+                        discard_batch_output()
+                        st.warning("The uploaded file contains no records")
+                        st.stop()
                     
                     # Display results
                     st.success("Predictions completed!")
@@ -614,36 +831,31 @@ with tab3:
                     # Summary metrics
                     col1, col2, col3 = st.columns(3)
                     with col1:
-                        st.metric("Total Websites", len(batch_data))
+                        st.metric("Total Websites", progress['rows'])
                     with col2:
-                        trusted_count = (predictions == 1).sum()
-                        st.metric("Trusted", trusted_count)
+                        st.metric("Trusted", progress['trusted'])
                     with col3:
-                        untrusted_count = (predictions == 0).sum()
-                        st.metric("Untrusted", untrusted_count)
+                        st.metric("Untrusted", progress['untrusted'])
                     
-                    # Show results
+                    # Show the first results only; the full table is in the download
                     st.markdown("### Analysis Results")
+                    results_preview = pd.read_csv(output_path, nrows=1000, usecols=RESULT_COLUMNS)
+                    if progress['rows'] > len(results_preview):
+                        st.caption(f"Showing the first {len(results_preview):,} of {progress['rows']:,} records")
                     st.dataframe(
-                        batch_data[['Prediction', 'Confidence', 'Trust_Probability']].style.format({
+                        results_preview.style.format({
                             'Confidence': '{:.1f}%',
                             'Trust_Probability': '{:.1f}%'
                         })
                     )
                     
                     # Download results
-                    csv = batch_data.to_csv(index=False)
-                    st.download_button(
-                        label="Download Results CSV",
-                        data=csv,
-                        file_name="website_credibility_predictions.csv",
-                        mime="text/csv",
-                        use_container_width=True
-                    )
+                    offer_batch_download(output_path, "Download Results CSV", "website_credibility_predictions.csv")
                 else:
                     st.error("Model not loaded. Please check model files.")
                     
         except Exception as e:
+            discard_batch_output()
             st.error(f"Error processing file: {e}")
 
 # Tab 4: AI Image Detection
@@ -652,7 +864,9 @@ with tab4:
     st.markdown("Upload an image to determine if it was generated by artificial intelligence or is an authentic photograph.")
     st.divider()
     
-    if not image_model_loaded:
+    # The model itself is only loaded when the first image is analyzed
+    image_model_status = load_status('image')
+    if not image_model_available() or (image_model_status and image_model_status['error']):
         st.warning("""
         **Image AI Detection Model Not Loaded**
         
@@ -674,12 +888,15 @@ with tab4:
             )
             
             if uploaded_image is not None:
-                # Display the image
-                image = Image.open(uploaded_image)
-                st.image(image, caption="Uploaded Image", use_container_width=True)
+                # Display the upload as-is; PIL only reads the header here, pixels are decoded once for analysis
+                image_bytes = uploaded_image.getvalue()
+                image = open_image(image_bytes)
+                # Draft decoding shrinks the image in place, so keep the header values for display
+                image_size, image_mode, image_format = image.size, image.mode, image.format
+                st.image(image_bytes, caption="Uploaded Image", use_container_width=True)
                 
                 # Image information
-                st.caption(f"Image size: {image.size[0]}x{image.size[1]} pixels | Format: {image.format}")
+                st.caption(f"Image size: {image_size[0]}x{image_size[1]} pixels | Format: {image_format}")
         
         with col_info:
             st.markdown("**Analysis Information**")
@@ -690,35 +907,48 @@ with tab4:
             st.write("- Statistical properties")
         
         if uploaded_image is not None:
-            if st.button("Analyze Image", type="primary", use_container_width=True):
+            analyze_image = st.button("Analyze Image", type="primary", use_container_width=True)
+            image_model_loaded = False
+            cached_probability = None
+            if analyze_image:
+                # A repeat upload is answered from the result cache without loading the model
+                image_cache = load_image_cache()
+                upload_digest = image_digest(image_bytes)
+                if image_cache is not None:
+                    cached_probability = image_cache.get(digest=upload_digest)
+                if cached_probability is None:
+                    image_model, image_model_loaded = load_image_model()
+                    if not image_model_loaded:
+                        st.error(f"Image model could not be loaded. {load_status('image')['error']}")
+            if analyze_image and (image_model_loaded or cached_probability is not None):
                 with st.spinner("Analyzing image..."):
                     try:
-                        # Preprocess image for ResNet50 model
-                        # ResNet50 expects 224x224 RGB images
-                        image = Image.open(uploaded_image)
-                        
-                        # Convert to RGB if needed
-                        if image.mode != 'RGB':
-                            image = image.convert('RGB')
-                        
-                        # Resize to 224x224 (ResNet50 input size)
-                        image_resized = image.resize((224, 224))
-                        
-                        # Convert to numpy array
-                        img_array = np.array(image_resized)
-                        
-                        # Normalize to [0, 1] range
-                        img_array = img_array / 255.0
-                        
-                        # Add batch dimension: (1, 224, 224, 3)
-                        img_array = np.expand_dims(img_array, axis=0)
+                        ai_probability = cached_probability
+                        if ai_probability is None:
+                            # Preprocess image for ResNet50 model: 224x224 RGB scaled to [0, 1], shape (1, 224, 224, 3)
+                            # JPEGs are decoded at reduced resolution and written as float32 into a reused buffer
+                            img_array = preprocess_image(image)
+                            
+                            # Re-encoded copies of a known image can still match on their pixels
+                            pixel_hash = None
+                            if image_cache is not None and image_cache.perceptual:
+                                pixel_hash = perceptual_hash(img_array[0])
+                                ai_probability = image_cache.get(phash=pixel_hash)
                         
-                        # Make prediction
-                        prediction = image_model.predict(img_array, verbose=0)
+                        if ai_probability is None:
+                            # Make prediction
+                            prediction = image_model.predict(img_array, verbose=0)
+                            
+                            # Model uses sigmoid activation (single output)
+                            # Output is probability of AI-generated (0=Real, 1=AI)
+                            ai_probability = float(prediction[0][0])
+                            if image_cache is not None:
+                                image_cache.put(ai_probability, digest=upload_digest, phash=pixel_hash)
+                            if hasattr(image_model, 'latency'):
+                                st.caption(f"Inference latency: {image_model.latency.text()}")
+                        else:
+                            st.caption(f"Result from the image cache ({image_cache.stats_text()})")
                         
-                        # Model uses sigmoid activation (single output)
-                        # Output is probability of AI-generated (0=Real, 1=AI)
-                        ai_probability = float(prediction[0][0])
                         real_probability = 1 - ai_probability
                         predicted_class = 1 if ai_probability > 0.5 else 0
                         confidence = max(ai_probability, real_probability) * 100
@@ -752,9 +982,9 @@ with tab4:
                         
                         with col_det1:
                             st.markdown("**Image Properties**")
-                            st.write(f"Dimensions: {image.size[0]} x {image.size[1]} pixels")
-                            st.write(f"Color Mode: {image.mode}")
-                            st.write(f"File Format: {image.format}")
+                            st.write(f"Dimensions: {image_size[0]} x {image_size[1]} pixels")
+                            st.write(f"Color Mode: {image_mode}")
+                            st.write(f"File Format: {image_format}")
                         
                         with col_det2:
                             st.markdown("**Analysis Interpretation**")
@@ -778,13 +1008,70 @@ with tab4:
                         - Check that the model file is not corrupted
                         """)
 
+        
+        # Bulk image detection
+        st.divider()
+        st.markdown("### Bulk Image Detection")
+        st.markdown("Upload many images or a ZIP archive to classify them all in one run.")
+        
+        bulk_images = st.file_uploader(
+            "Choose images or ZIP archives",
+            type=["jpg", "jpeg", "png", "bmp", "webp", "zip"],
+            accept_multiple_files=True,
+            key="bulk_images"
+        )
+        with st.expander("Batching Settings"):
+            image_batch_size = st.slider("Images per model batch", 1, 128, DEFAULT_BATCH_SIZE)
+            image_workers = st.slider("Decode threads", 1, 32, min(os.cpu_count() or 1, 32))
+        
+        if st.button("Analyze All Images", type="primary", disabled=not bulk_images):
+            image_model, image_model_loaded = load_image_model()
+            if not image_model_loaded:
+                st.error(f"Image model could not be loaded. {load_status('image')['error']}")
+            else:
+                uploads = [(upload.name, upload.getvalue()) for upload in bulk_images]
+                image_total = count_images(uploads)
+                image_progress = st.progress(0.0, text=f"Analyzing {image_total} images...")
+                image_table = st.empty()
+                image_rows = []
+                
+                for row in iter_image_predictions(iter_image_files(uploads), image_model,
+                                                  batch_size=image_batch_size, workers=image_workers,
+                                                  cache=load_image_cache()):
+                    image_rows.append(row)
+                    # Stream results, redrawing the table once per model batch
+                    if len(image_rows) % image_batch_size == 0:
+                        image_progress.progress(min(len(image_rows) / max(image_total, 1), 1.0),
+                                                text=f"Analyzed {len(image_rows)} of {image_total} images")
+                        image_table.dataframe(pd.DataFrame(image_rows, columns=IMAGE_RESULT_COLUMNS),
+                                              use_container_width=True)
+                
+                image_progress.progress(1.0, text=f"Analyzed {len(image_rows)} images")
+                image_results = pd.DataFrame(image_rows, columns=IMAGE_RESULT_COLUMNS)
+                image_table.dataframe(image_results, use_container_width=True)
+                
+                ai_count = (image_results['Prediction'] == 'AI-Generated').sum()
+                failed_count = (image_results['Prediction'] == 'Error').sum()
+                st.success(f"Analyzed {len(image_results)} images: {ai_count} AI-generated, "
+                           f"{len(image_results) - ai_count - failed_count} authentic, {failed_count} failed")
+                if load_image_cache() is not None:
+                    st.caption(f"Image result cache: {load_image_cache().stats_text()}")
+                
+                st.download_button(
+                    label="Download Image Results CSV",
+                    data=image_results.to_csv(index=False),
+                    file_name="bulk_image_detection.csv",
+                    mime="text/csv",
+                    use_container_width=True
+                )
+
 # Tab 5: Fake News Detection with AI
 with tab5:
     st.markdown("### Fake News Detection")
     st.markdown("Analyze news articles or text content to detect potential misinformation using advanced AI.")
     st.divider()
     
-    if not groq_initialized:
+    if not groq_configured:
         st.warning("""
         **Groq API Not Available**
         
@@ -833,10 +1120,27 @@ with tab5:
                 st.text_area("Loaded content:", article_text, height=200, disabled=True)
         
         if st.button("Analyze Article", type="primary", use_container_width=True):
-            if article_text and len(article_text.strip()) > 0:
+            article_entered = bool(article_text and article_text.strip())
+            # Articles analyzed before (by any session) are answered from the shared cache, with or without Groq
+            analysis_cache = load_analysis_cache() if article_entered else None
+            analysis_key = analysis_cache_key(article_text) if article_entered else None
+            analysis = analysis_cache.get(analysis_key) if analysis_cache is not None else None
+            groq_client, groq_error = None, None
+            if article_entered and analysis is None:
+                # The OpenAI client library is only imported once an article needs the LLM
+                groq_client, groq_error = initialize_groq()
+            if article_entered and analysis is None and groq_client is None:
+                st.error(f"Groq API not available: {groq_error}")
+            elif article_entered:
                 with st.spinner("Validating content type..."):
                     try:
-                        validation_prompt = f"""Analyze this text and determine if it's suitable for fake news detection. 
+                        # Checked locally first; the LLM is only asked when the local classifier is unsure
+                        content_type, content_confidence, _ = classify_content(article_text)
+                        if analysis is not None:
+                            # Only articles that passed this check were analyzed and cached
+                            content_type = "NEWS"
+                        elif content_confidence < CONTENT_MIN_CONFIDENCE:
+                            validation_prompt = f"""Analyze this text and determine if it's suitable for fake news detection. 
 
 Text to check:
 {article_text[:500]}
@@ -849,12 +1153,12 @@ Respond with ONLY ONE WORD:
 
 Response:"""
                         
-                        validation_response = groq_client.chat.completions.create(
-                            model="llama-3.3-70b-versatile",
-                            messages=[{"role": "user", "content": validation_prompt}],
-                            temperature=0
-                        )
-                        content_type = validation_response.choices[0].message.content.strip().upper()
+                            validation_response = groq_client.chat.completions.create(
+                                model="llama-3.3-70b-versatile",
+                                messages=[{"role": "user", "content": validation_prompt}],
+                                temperature=0
+                            )
+                            content_type = validation_response.choices[0].message.content.strip().upper()
                         
                         # Check if content is appropriate
                         if "CODE" in content_type:
@@ -905,61 +1209,26 @@ Response:"""
                 
                 with st.spinner("Analyzing article with Groq AI..."):
                     try:
-                        analysis_prompt = f"""You are a professional fact-checker and misinformation analyst. Analyze the following article/text for signs of fake news, misinformation, or unreliable content.
-
-**Important:** Your training data may not include recent events. Focus on analyzing writing style, logical consistency, source credibility indicators, and common misinformation patterns.
-
-Consider these factors:
-1. Factual accuracy and verifiability (based on training data)
-2. Source credibility indicators
-3. Emotional manipulation or sensationalism
-4. Logical consistency and reasoning
-5. Use of credible citations or lack thereof
-6. Bias, propaganda, or misleading framing
-7. Writing quality and professionalism
-
-Article to analyze:
-{article_text}
-
-Provide your analysis in this EXACT format:
-
-VERDICT: [LEGITIMATE or FAKE or MISLEADING]
-CONFIDENCE: [percentage as number only, e.g., 85]
-REASONING: [2-3 sentence explanation of your verdict]
-RED_FLAGS: [comma-separated list of concerning elements, or "None" if legitimate]
-RECOMMENDATION: [specific action user should take]"""
-                        
-                        response = groq_client.chat.completions.create(
-                            model="llama-3.3-70b-versatile",
-                            messages=[{"role": "user", "content": analysis_prompt}],
-                            temperature=0.3,
-                            max_tokens=1500
-                        )
-                        result_text = response.choices[0].message.content
-                        model_name = "llama-3.3-70b-versatile (Groq)"
-                        
-                        # Parse response
-                        lines = result_text.strip().split('\n')
-                        verdict = "UNKNOWN"
-                        confidence = 0
-                        reasoning = ""
-                        red_flags = ""
-                        recommendation = ""
+                        if analysis is None:
+                            response = groq_client.chat.completions.create(
+                                model=ANALYSIS_MODEL,
+                                messages=[{"role": "user", "content": build_analysis_prompt(article_text)}],
+                                temperature=ANALYSIS_TEMPERATURE,
+                                max_tokens=ANALYSIS_MAX_TOKENS
+                            )
+                            analysis = parse_analysis(response.choices[0].message.content)
+                            if analysis_cache is not None:
+                                analysis_cache.put(analysis_key, analysis)
+                        else:
+                            st.caption(f"Result from the analysis cache ({analysis_cache.stats_text()})")
+                        model_name = f"{ANALYSIS_MODEL} (Groq)"
                         
-                        for line in lines:
-                            if line.startswith("VERDICT:"):
-                                verdict = line.replace("VERDICT:", "").strip()
-                            elif line.startswith("CONFIDENCE:"):
-                                try:
-                                    confidence = int(line.replace("CONFIDENCE:", "").strip().replace("%", ""))
-                                except:
-                                    confidence = 0
-                            elif line.startswith("REASONING:"):
-                                reasoning = line.replace("REASONING:", "").strip()
-                            elif line.startswith("RED_FLAGS:"):
-                                red_flags = line.replace("RED_FLAGS:", "").strip()
-                            elif line.startswith("RECOMMENDATION:"):
-                                recommendation = line.replace("RECOMMENDATION:", "").strip()
+                        result_text = analysis['result_text']
+                        verdict = analysis['verdict']
+                        confidence = analysis['confidence']
+                        reasoning = analysis['reasoning']
+                        red_flags = analysis['red_flags']
+                        recommendation = analysis['recommendation']
                         
                         # Display results
                         st.divider()
@@ -1276,7 +1545,15 @@ with tab7:
     
     """)
     
-    if image_model_loaded:
+    image_model_status = load_status('image')
+    if image_model_status is None and image_model_available():
+        st.info("""
+        **Status: Available**
+        
+        The AI image detection model is loaded when the first image is analyzed.
+        Upload images in the Image Detection tab to begin analysis.
+        """)
+    elif image_model_status and not image_model_status['error']:
         st.success("""
         **Status: Active**
         
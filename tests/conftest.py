@@ -0,0 +1,15 @@
+"""
+Shared fixtures: keep on-disk caches out of the working tree
+"""
+import pytest
+
+from utils import sqlite_cache, webscraper
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(tmp_path, monkeypatch):
+    cache_dir = tmp_path / 'cache'
+    monkeypatch.setattr(sqlite_cache, 'CACHE_DIR', str(cache_dir))
+    monkeypatch.setattr(webscraper, '_whois_cache', None)
+    monkeypatch.setattr(webscraper, '_page_cache', None)
+    return cache_dir
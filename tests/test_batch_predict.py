@@ -0,0 +1,42 @@
+"""
+Chunked batch prediction must match scoring the whole file at once
+"""
+import joblib
+import numpy as np
+import pandas as pd
+
+from utils.batch_predict import predict_csv_in_chunks
+from utils.feature_encoder import load_feature_encoder
+
+model = joblib.load('models/stacking_model.joblib')
+encoder = load_feature_encoder('models/feature_names.joblib', model.n_features_in_)
+EXAMPLES = 'data/website_metadata_examples.csv'
+
+
+def test_chunked_matches_full_file(tmp_path):
+    output_path = tmp_path / 'predictions.csv'
+    progress = list(predict_csv_in_chunks(EXAMPLES, output_path, model, encoder, chunksize=64))
+
+    full = pd.read_csv(EXAMPLES)
+    probabilities = model.predict_proba(encoder.encode_batch(full))
+    results = pd.read_csv(output_path)
+
+    assert progress[-1]['rows'] == len(full) == len(results)
+    assert progress[-1]['trusted'] + progress[-1]['untrusted'] == len(full)
+    assert list(results.columns[:len(full.columns)]) == list(full.columns)
+    np.testing.assert_allclose(results['Trust_Probability'], probabilities[:, 1] * 100, rtol=1e-6)
+
+
+def test_cancel_stops_after_current_chunk(tmp_path):
+    output_path = tmp_path / 'predictions.csv'
+    calls = []
+
+    def should_cancel():
+        calls.append(1)
+        return len(calls) > 2
+
+    progress = list(predict_csv_in_chunks(EXAMPLES, output_path, model, encoder, chunksize=100,
+                                          should_cancel=should_cancel))
+    assert progress[-1]['cancelled']
+    assert progress[-1]['rows'] == 200
+    assert len(pd.read_csv(output_path)) == 200
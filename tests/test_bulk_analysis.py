@@ -0,0 +1,38 @@
+"""
+Bulk URL analysis: input parsing and concurrency limits
+"""
+import asyncio
+from collections import Counter
+
+from utils import bulk_analysis, webscraper
+
+
+def test_parse_url_list():
+    text = "url\nhttps://a.com\n\n# comment\nb.org, c.net\nhttps://a.com\n"
+    assert bulk_analysis.parse_url_list(text) == ['https://a.com', 'b.org', 'c.net']
+
+
+def test_global_and_per_host_limits(monkeypatch):
+    in_flight = Counter()
+    peak = Counter()
+
+    async def fake_scrape(url, timeout=10, head_only=False):
+        host = bulk_analysis._host_key(url)
+        in_flight['all'] += 1
+        in_flight[host] += 1
+        peak['all'] = max(peak['all'], in_flight['all'])
+        peak[host] = max(peak[host], in_flight[host])
+        await asyncio.sleep(0.01)
+        in_flight['all'] -= 1
+        in_flight[host] -= 1
+        return {'domain': host}
+
+    monkeypatch.setattr(webscraper, 'scrape_website_metadata_async', fake_scrape)
+    urls = [f"https://www.busy.com/{i}" for i in range(10)] + [f"site{i}.org" for i in range(10)]
+    results = []
+    bulk_analysis.run_bulk_analysis(urls, lambda url, metadata: results.append(url),
+                                    max_concurrency=4, per_host_limit=2)
+
+    assert sorted(results) == sorted(urls)
+    assert peak['all'] <= 4
+    assert peak['busy.com'] <= 2
@@ -0,0 +1,80 @@
+"""
+Bulk image detection: ZIP expansion, ordering and fixed-size batches
+"""
+import io
+import zipfile
+
+import numpy as np
+from PIL import Image
+
+from utils import bulk_images
+
+
+class MeanBrightnessModel:
+    """Stands in for the ResNet: 'AI probability' is the mean pixel value"""
+
+    def __init__(self):
+        self.batch_shapes = []
+
+    def predict(self, batch, verbose=0):
+        self.batch_shapes.append(batch.shape)
+        return batch.mean(axis=(1, 2, 3))[:, np.newaxis]
+
+
+def _image(value, fmt='PNG', size=(40, 30)):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, (value, value, value)).save(buffer, fmt)
+    return buffer.getvalue()
+
+
+def _zip(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        for name, data in members:
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+
+def test_results_stay_in_order_with_fixed_size_batches():
+    values = list(range(0, 250, 10))
+    uploads = [(f'{value}.png', _image(value)) for value in values] + [('broken.jpg', b'not an image')]
+    model = MeanBrightnessModel()
+
+    rows = list(bulk_images.iter_image_predictions(bulk_images.iter_image_files(uploads), model,
+                                                   batch_size=4, workers=3, prefetch=2))
+
+    assert [row['File'] for row in rows] == [name for name, _ in uploads]
+    for value, row in zip(values, rows):
+        assert abs(row['AI_Probability'] - value / 255 * 100) < 1e-3
+        assert row['Prediction'] == ('AI-Generated' if value / 255 > 0.5 else 'Authentic')
+        assert (row['Width'], row['Height'], row['Format']) == (40, 30, 'PNG')
+    assert rows[-1]['Prediction'] == 'Error' and rows[-1]['Error'].startswith('Could not decode image')
+    assert set(model.batch_shapes) == {(4, 224, 224, 3)}
+    assert len(model.batch_shapes) == 7
+
+
+def test_zip_uploads_expand_to_their_images(monkeypatch):
+    monkeypatch.setattr(bulk_images, 'MAX_IMAGE_BYTES', 5000)
+    archive = _zip([
+        ('photos/a.png', _image(10)),
+        ('photos/', b''),
+        ('__MACOSX/photos/._a.png', b'resource fork'),
+        ('notes.txt', b'skip me'),
+        ('photos/big.bmp', _image(20, 'BMP', size=(100, 100))),
+        ('b.JPG', _image(30, 'JPEG')),
+    ])
+    uploads = [('batch.zip', archive), ('bad.zip', b'not a zip'), ('single.png', _image(40))]
+
+    images = list(bulk_images.iter_image_files(uploads))
+    assert [(name, error is None) for name, _, error in images] == [
+        ('batch.zip/photos/a.png', True),
+        ('batch.zip/photos/big.bmp', False),
+        ('batch.zip/b.JPG', True),
+        ('bad.zip', False),
+        ('single.png', True),
+    ]
+    assert bulk_images.count_images(uploads) == len(images)
+
+    rows = list(bulk_images.iter_image_predictions(images, MeanBrightnessModel(), batch_size=8, workers=2))
+    assert [row['Prediction'] == 'Error' for row in rows] == [False, True, False, True, False]
+    assert rows[1]['Error'].startswith('Skipped')
@@ -0,0 +1,77 @@
+"""
+Local content-type check: confident verdicts for news, code and data, LLM fallback for the rest
+"""
+from utils.content_classifier import CONTENT_MIN_CONFIDENCE, classify_content
+
+NEWS = """WASHINGTON - The Senate on Tuesday passed a bill that would expand funding for rural broadband, \
+sending the measure to the House where its prospects remain uncertain. The legislation, which was approved \
+by a vote of 68 to 32, would provide $12 billion over five years to connect households in areas that lack \
+high-speed internet service.
+
+Supporters said the bill was long overdue. "Families in my state have been waiting for a decade," said one \
+senator who co-sponsored the measure. Critics argued that previous programs had wasted money on projects \
+that were never completed."""
+
+PYTHON = """import os
+
+def load(path):
+    with open(path) as f:
+        data = f.read()
+    return data.split(',')
+"""
+
+JAVASCRIPT = """const app = express();
+app.get('/', (req, res) => {
+  res.send('Hello World!');
+});
+"""
+
+
+def _confident(text):
+    label, confidence, _ = classify_content(text)
+    return label if confidence >= CONTENT_MIN_CONFIDENCE else None
+
+
+def test_confident_labels():
+    assert _confident(NEWS) == 'NEWS'
+    assert _confident(PYTHON) == 'CODE'
+    assert _confident(JAVASCRIPT) == 'CODE'
+    assert _confident('{"name": "Alice", "tags": ["a", "b"]}') == 'DATA'
+    assert _confident('[{"id": 1, "title": "x"}, {"id": 2, "title": "' + 'y' * 3000 + '"}]') == 'DATA'
+    assert _confident("name,age,city\nAlice,30,Paris\nBob,25,London\nCarol,41,Berlin\n") == 'DATA'
+    assert _confident("id\tscore\n1\t0.5\n2\t0.7\n") == 'DATA'
+
+
+def test_sql_statements_are_code_not_a_table():
+    sql = ("SELECT id, name FROM users WHERE active = 1;\n"
+           "INSERT INTO logs (id, msg) VALUES (1, 'x');\n"
+           "UPDATE users SET name = 'b' WHERE id = 2;")
+    assert _confident(sql) == 'CODE'
+    assert _confident("select * from orders;\nselect count(*) from items;\ndelete from temp;") == 'CODE'
+    # Semicolon-separated values without statement terminators are still a table
+    assert _confident("a;b;c\n1;2;3\n4;5;6\n") == 'DATA'
+
+
+def test_unclear_text_is_left_to_the_llm():
+    poem = "Roses are red\nviolets are blue\nsugar is sweet\nand so are you"
+    tweet = "BREAKING: Scientists confirm the moon is made of cheese, NASA hiding the truth!!!"
+    for text in (poem, tweet, "", "   \n "):
+        assert _confident(text) is None
+
+
+def test_prose_with_commas_is_not_a_table():
+    paragraphs = "\n".join(["Officials said on Monday that the plan, which was delayed, would go ahead, "
+                            "and that the costs had been covered by the state and federal budgets."] * 4)
+    assert _confident(paragraphs) == 'NEWS'
+
+
+def test_mentions_and_fact_lists_are_not_confident_code():
+    thread = ("@CDCgov is hiding the real numbers [thread below]\n"
+              "@joe_biden signed the order without telling anyone\n"
+              "@WHO confirmed it last week, sources say\n"
+              "@nytimes won't report this")
+    facts = "Death toll = 120 (officials)\nInjured = 400 (hospital sources)"
+    for text in (thread, facts):
+        assert _confident(text) is None
+    # Decorators still count when a def or class follows
+    assert _confident("@app.route('/')\ndef index():\n    return 'hi'\n") == 'CODE'
@@ -0,0 +1,19 @@
+"""
+Host normalization and registrable-domain extraction
+"""
+from utils.domains import normalize_host, registrable_domain
+
+
+def test_normalize_host():
+    assert normalize_host('https://WWW.NYTimes.com/section/world?x=1') == 'nytimes.com'
+    assert normalize_host('bbc.co.uk:443') == 'bbc.co.uk'
+    assert normalize_host('example.org.') == 'example.org'
+    assert normalize_host('') == ''
+
+
+def test_registrable_domain():
+    assert registrable_domain('https://edition.cnn.com/politics') == 'cnn.com'
+    assert registrable_domain('news.bbc.co.uk') == 'bbc.co.uk'
+    assert registrable_domain('www.abc.net.au') == 'abc.net.au'
+    assert registrable_domain('127.0.0.1:8501') is None
+    assert registrable_domain('localhost') is None
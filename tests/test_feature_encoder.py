@@ -0,0 +1,57 @@
+"""
+Parity check: FeatureEncoder vs the pd.get_dummies + column loop it replaces
+"""
+import joblib
+import numpy as np
+import pandas as pd
+
+from utils.feature_encoder import DOMAIN_AGE_LABELS, FeatureEncoder, load_feature_encoder
+
+features = joblib.load('models/feature_names.joblib')
+encoder = load_feature_encoder('models/feature_names.joblib')
+examples = pd.read_csv('data/website_metadata_examples.csv')
+
+
+def get_dummies_reference(df):
+    """The encoding app.py used before FeatureEncoder"""
+    df_encoded = pd.get_dummies(df)
+    df_final = pd.DataFrame(0, index=range(len(df)), columns=features)
+    for col in df_encoded.columns:
+        if col in features:
+            df_final[col] = df_encoded[col].values
+    return df_final.to_numpy(dtype=np.float32)
+
+
+def test_single_record_matches_get_dummies():
+    for record in examples.head(50).to_dict(orient='records'):
+        # Object columns keep their original string values for a one-row frame
+        expected = get_dummies_reference(pd.DataFrame([record]))[0]
+        np.testing.assert_array_equal(encoder.encode(record), expected)
+
+
+def test_batch_matches_get_dummies():
+    np.testing.assert_array_equal(encoder.encode_batch(examples), get_dummies_reference(examples))
+
+
+def test_batch_age_buckets_match_pd_cut_at_edges():
+    ages = [0.0, 0.5, 1.0, 1.01, 4.99, 5.0, 10.0, 15.0, 20.0, 20.5, np.nan]
+    bucket_encoder = FeatureEncoder([f'domain_age_bucket_{label}' for label in DOMAIN_AGE_LABELS])
+    encoded = bucket_encoder.encode_batch(pd.DataFrame({'domain_age_years': ages}))
+
+    expected = pd.cut(ages, bins=[-np.inf, 1, 5, 10, 20, np.inf], labels=DOMAIN_AGE_LABELS)
+    assert [DOMAIN_AGE_LABELS[row.argmax()] if row.any() else None for row in encoded] == [
+        None if pd.isna(label) else label for label in expected]
+
+
+def test_manual_entry_record():
+    record = {
+        'has_https': 'Yes', 'ssl_valid': 'Yes', 'ssl_issuer': 'DigiCert', 'tls_version': 'TLS 1.3',
+        'certificate_type': 'EV', 'domain_age_years': 20.0, 'domain_registrar': 'MarkMonitor',
+        'whois_privacy_enabled': False, 'page_load_time_sec': 1.0, 'redirect_count': 0,
+        'server_response_code': 200, 'ads_density_score': 0.0, 'external_links_count': 10,
+        'server_location': 'USA', 'hosting_type': '', 'contact_info_available': True,
+        'social_media_presence': 'medium', 'content_update_frequency': 'hourly', 'mobile_responsive': 'Yes'
+    }
+    expected = get_dummies_reference(pd.DataFrame([record]))[0]
+    np.testing.assert_array_equal(encoder.encode(record), expected)
+    np.testing.assert_array_equal(encoder.encode_batch([record])[0], expected)
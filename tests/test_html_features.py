@@ -0,0 +1,157 @@
+"""
+Parity of the single-pass HTML extractor with the BeautifulSoup tree queries it replaced
+"""
+import random
+import re
+
+from bs4 import BeautifulSoup
+
+from utils import html_features
+from utils.html_features import _numeric_reference, extract_html_features
+
+CONTACT_KEYWORDS = ['contact', 'email', 'phone', 'address', 'reach us', 'get in touch']
+PRIVACY_KEYWORDS = ['privacy policy', 'privacy notice', 'data protection']
+TERMS_KEYWORDS = ['terms of service', 'terms and conditions', 'terms of use', 'user agreement']
+SOCIAL_PLATFORMS = ['facebook.com', 'twitter.com', 'x.com', 'linkedin.com', 'instagram.com',
+                    'youtube.com', 'tiktok.com', 'pinterest.com']
+CDN_INDICATORS = ['cloudflare', 'cloudfront', 'akamai', 'fastly', 'cdn.', 'maxcdn', 'cloudimg', 'jsdelivr', 'cdnjs']
+
+
+def reference_features(content, netloc):
+    """The per-feature BeautifulSoup queries previously run by the scraper"""
+    soup = BeautifulSoup(content, 'html.parser')
+    text_content = soup.get_text()
+    features = {}
+
+    all_links = soup.find_all('a', href=True)
+    features['external_links_count'] = sum(
+        1 for link in all_links if link['href'].startswith('http') and netloc not in link['href']
+    )
+
+    ad_indicators = soup.find_all(class_=re.compile(r'ad|advertisement|banner|sponsor', re.I))
+    ad_indicators += soup.find_all(id=re.compile(r'ad|advertisement|banner|sponsor', re.I))
+    iframe_ads = soup.find_all('iframe', src=re.compile(r'ad|doubleclick|adsense', re.I))
+    total_elements = len(soup.find_all())
+    ad_elements = len(ad_indicators) + len(iframe_ads)
+    features['ads_density_score'] = round(min(ad_elements / max(total_elements, 1), 1.0), 2)
+
+    popup_indicators = soup.find_all(class_=re.compile(r'popup|pop-up|popover', re.I))
+    popup_indicators += soup.find_all(id=re.compile(r'popup|pop-up', re.I))
+    popup_indicators = [p for p in popup_indicators
+                        if not any(word in str(p.get('class', [])).lower() + str(p.get('id', '')).lower()
+                                   for word in ['cookie', 'consent', 'gdpr', 'privacy'])]
+    features['popups_present'] = 'Yes' if len(popup_indicators) > 3 else 'No'
+
+    viewport = soup.find('meta', attrs={'name': 'viewport'})
+    if viewport and 'content' in viewport.attrs:
+        features['mobile_responsive'] = 'Yes'
+    else:
+        responsive_classes = soup.find_all(class_=re.compile(r'responsive|mobile|col-', re.I))
+        features['mobile_responsive'] = 'Partial' if len(responsive_classes) > 5 else 'No'
+
+    for name, keywords, href_word in [('contact_info_available', CONTACT_KEYWORDS, 'contact'),
+                                      ('privacy_policy_exists', PRIVACY_KEYWORDS, 'privacy'),
+                                      ('terms_of_service_exists', TERMS_KEYWORDS, 'terms')]:
+        features[name] = (any(keyword in text_content.lower() for keyword in keywords) or
+                          any(href_word in str(link.get('href', '')).lower() for link in all_links))
+
+    social_links = sum(1 for link in all_links
+                       if any(platform in str(link.get('href', '')).lower() for platform in SOCIAL_PLATFORMS))
+    features['social_media_presence'] = 'medium' if social_links >= 2 else 'low' if social_links else 'none'
+
+    tags = soup.find_all('script', src=True) + soup.find_all('link', href=True) + soup.find_all('img', src=True)
+    features['cdn_in_resources'] = any(
+        any(cdn in str(tag.get('src', '') + tag.get('href', '')).lower() for cdn in CDN_INDICATORS)
+        for tag in tags
+    )
+    features['modified_meta'] = bool(soup.find('meta', attrs={'property': 'article:modified_time'}) or
+                                     soup.find('meta', attrs={'name': 'last-modified'}))
+    return features
+
+
+EDGE_CASES = [
+    b'',
+    b'<p>plain</p>',
+    # Keywords split across nodes, entities and whitespace-only strings
+    b'<p>Privacy</p> <p>Policy</p><span>privacy</span>\n  <span>notice</span><b>reach</b>&#32;<i>us</i>',
+    b'<div>terms &amp; conditions</div><div>terms&nbsp;of use</div><p>user&unknown;agreement &#x41;&#99999999;</p>',
+    # Text in script/style/template/textarea/comments/CDATA
+    b'<script>var contact = "email";</script><style>.privacy-policy{}</style>'
+    b'<template><p>terms of service</p></template><!-- get in touch --><![CDATA[data protection]]>',
+    b'<pre>terms\n  of use</pre><textarea> </textarea><p>terms</p>\n\n<p>of use</p>',
+    # Void elements, stray end tags, self-closing tags
+    b'<br></br><img src="https://cdn.example.com/a.png"><p>get in</br> touch</p></div><div/><span/>',
+    # Attribute quirks: duplicates, valueless, whitespace in class lists
+    b'<div class="x" class="ad-slot">a</div><div id>b</div><div class=" popup\t cookie ">c</div>'
+    b'<a href>empty</a><a href="HTTP://Other.com/Contact">x</a><meta name="viewport">',
+    b'<meta name="viewport" content="w"><meta name="viewport"><div class="col-1"></div>',
+    b'<META NAME="last-modified"><LINK HREF="https://fastly.net/x.css"><SCRIPT SRC="/a.js"></SCRIPT>',
+    # Numeric references: hex, Windows-1252 range, invalid code points, unterminated with trailing text
+    b'<p>&#x63;ontact &#150; &#0; &#38abc priv&#97;cy&#X20;policy &#xD800;</p>',
+    '<p>café contact</p>'.encode('utf-16'),
+    b'<html><head><meta charset="windows-1252"></head><body>\x93privacy policy\x94</body></html>',
+]
+
+_TAGS = ['div', 'span', 'p', 'a', 'iframe', 'meta', 'script', 'style', 'template', 'pre', 'textarea',
+         'br', 'img', 'link', 'rt']
+_CLASSES = ['ad', 'banner', 'popup', 'pop-up cookie', 'popover', 'responsive', 'col-6', 'mobile nav',
+            'sponsored gdpr', 'plain']
+_TEXT = ['privacy', 'policy', 'privacy policy', 'terms', ' of service', 'contact', 'reach us', ' ', '\n ',
+         '&amp;', '&#32;', '&nbsp;', 'news', '<!-- email -->', '<![CDATA[ phone ]]>']
+
+
+def _random_document(rng):
+    parts = []
+    for _ in range(rng.randint(0, 60)):
+        roll = rng.random()
+        tag = rng.choice(_TAGS)
+        if roll < 0.45:
+            attrs = []
+            if rng.random() < 0.5:
+                attrs.append(f'class="{rng.choice(_CLASSES)}"')
+            if rng.random() < 0.3:
+                attrs.append(f'id="{rng.choice(["ad1", "popup", "popup-consent", "main"])}"')
+            if tag in ('a', 'link'):
+                attrs.append(f'href="{rng.choice(["/contact", "https://facebook.com/x", "http://x.com/terms", "https://cdnjs.com/a"])}"')
+            if tag in ('iframe', 'img', 'script'):
+                attrs.append(f'src="{rng.choice(["https://doubleclick.net/a", "/img.png", "https://cloudfront.net/x"])}"')
+            if tag == 'meta':
+                attrs.append(rng.choice(['name="viewport" content="x"', 'name="viewport"',
+                                         'property="article:modified_time"', 'name="author"']))
+            parts.append(f"<{tag} {' '.join(attrs)}{'/' if rng.random() < 0.1 else ''}>")
+        elif roll < 0.7:
+            parts.append(f'</{tag}>')
+        else:
+            parts.append(rng.choice(_TEXT))
+    return ''.join(parts).encode()
+
+
+def test_edge_cases_match_beautifulsoup():
+    for document in EDGE_CASES:
+        assert extract_html_features(document, 'example.com') == reference_features(document, 'example.com'), document
+
+
+def test_random_documents_match_beautifulsoup():
+    rng = random.Random(1234)
+    for _ in range(400):
+        document = _random_document(rng)
+        assert extract_html_features(document, 'x.com') == reference_features(document, 'x.com'), document
+
+
+def test_numeric_references():
+    assert _numeric_reference('38') == ('&', '')
+    assert _numeric_reference('x41') == ('A', '')
+    assert _numeric_reference('150') == ('\u2013', '')
+    assert _numeric_reference('1114112') == ('\ufffd', '')
+    assert _numeric_reference('38abc') == ('&', 'abc')
+    assert _numeric_reference('abc') == ('', 'abc')
+
+
+def test_tag_rules_match_installed_beautifulsoup():
+    # Older bs4 releases do not expose these on the builder; the local sets are what the extractor uses
+    from bs4.builder import HTMLParserTreeBuilder
+    for attribute, local in [('DEFAULT_EMPTY_ELEMENT_TAGS', html_features._VOID_TAGS),
+                             ('DEFAULT_STRING_CONTAINERS', html_features._STRING_CONTAINER_TAGS),
+                             ('DEFAULT_PRESERVE_WHITESPACE_TAGS', html_features._PRESERVE_WHITESPACE_TAGS)]:
+        if hasattr(HTMLParserTreeBuilder, attribute):
+            assert set(getattr(HTMLParserTreeBuilder, attribute)) == local, attribute
@@ -0,0 +1,81 @@
+"""
+Image result cache: exact and perceptual keys, model versions, eviction and persistence
+"""
+import io
+
+import numpy as np
+from PIL import Image
+
+from utils.bulk_images import iter_image_files, iter_image_predictions
+from utils.image_cache import ImageResultCache, image_digest, model_version, perceptual_hash
+from utils.image_preprocess import preprocess_image
+
+
+def _photo(fmt, **kwargs):
+    y, x = np.mgrid[0:120, 0:160]
+    pixels = np.stack([x * 1.5, y * 2, (x + y) % 256], axis=-1).astype(np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, fmt, **kwargs)
+    return buffer.getvalue()
+
+
+def test_exact_hits_are_per_model_version_and_persist(tmp_path):
+    path = str(tmp_path / 'images.sqlite3')
+    data = _photo('PNG')
+    cache = ImageResultCache('v1', path=path)
+    assert cache.get(digest=image_digest(data)) is None
+    cache.put(0.83, digest=image_digest(data))
+
+    assert ImageResultCache('v1', path=path).get(digest=image_digest(data)) == 0.83
+    assert ImageResultCache('v2', path=path).get(digest=image_digest(data)) is None
+    assert cache.get(digest=image_digest(data)) == 0.83
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ImageResultCache('v1', path=str(tmp_path / 'images.sqlite3'), max_entries=2)
+    cache.put(0.1, digest='a')
+    cache.put(0.2, digest='b')
+    cache.get(digest='a')
+    cache.put(0.3, digest='c')
+    assert [cache.get(digest=key) for key in 'abc'] == [0.1, None, 0.3]
+
+
+def test_perceptual_key_matches_reencoded_copies(tmp_path):
+    png, jpeg = _photo('PNG'), _photo('JPEG', quality=70)
+    png_hash = perceptual_hash(preprocess_image(png)[0].copy())
+    assert png_hash == perceptual_hash(preprocess_image(jpeg)[0].copy())
+
+    exact_only = ImageResultCache('v1', path=str(tmp_path / 'a.sqlite3'), perceptual=False)
+    exact_only.put(0.9, digest=image_digest(png), phash=png_hash)
+    assert exact_only.get(digest=image_digest(jpeg), phash=png_hash) is None
+
+    perceptual = ImageResultCache('v1', path=str(tmp_path / 'b.sqlite3'), perceptual=True)
+    perceptual.put(0.9, digest=image_digest(png), phash=png_hash)
+    assert perceptual.get(digest=image_digest(jpeg), phash=png_hash) == 0.9
+
+
+def test_bulk_run_skips_inference_for_known_images(tmp_path):
+    calls = []
+
+    class Model:
+        def predict(self, batch, verbose=0):
+            calls.append(len(batch))
+            return batch.mean(axis=(1, 2, 3))[:, np.newaxis]
+
+    cache = ImageResultCache('v1', path=str(tmp_path / 'images.sqlite3'))
+    uploads = [('a.png', _photo('PNG')), ('b.jpg', _photo('JPEG'))]
+    first = list(iter_image_predictions(iter_image_files(uploads), Model(), batch_size=2, cache=cache))
+    second = list(iter_image_predictions(iter_image_files(uploads), Model(), batch_size=2, cache=cache))
+
+    assert calls == [2]
+    assert [row['AI_Probability'] for row in second] == [row['AI_Probability'] for row in first]
+    assert second[0]['Width'] == 160 and cache.hit_rate == 0.5
+
+
+def test_model_version_tracks_file_contents(tmp_path):
+    model_file = tmp_path / 'model.keras'
+    model_file.write_bytes(b'weights v1')
+    first = model_version(str(model_file))
+    model_file.write_bytes(b'weights v2!')
+    assert model_version(str(model_file)) != first
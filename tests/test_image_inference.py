@@ -0,0 +1,81 @@
+"""
+Image inference wrapper: call path selection, warmup and latency percentiles
+"""
+import numpy as np
+
+from utils.image_inference import ImageInferenceModel, LatencyStats, latency_report
+
+
+class _CallableModel:
+    """Keras-like model: the wrapper should call it directly, not through predict()"""
+
+    input_shape = (None, 8, 8, 3)
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, x, training=False):
+        assert training is False
+        self.calls.append(x.shape)
+        return x.mean(axis=(1, 2, 3))[:, np.newaxis]
+
+    def predict(self, x, verbose=0):
+        raise AssertionError("predict() should not be used for callable models")
+
+
+class _PredictOnlyModel:
+    """TFLite-like model without __call__"""
+
+    input_shape = (None, 8, 8, 3)
+
+    def __init__(self):
+        self.calls = []
+
+    def predict(self, x, verbose=0):
+        self.calls.append(x.shape)
+        return np.full((len(x), 1), 0.25, dtype=np.float32)
+
+
+def test_warmup_runs_each_batch_size_before_first_request():
+    model = _CallableModel()
+    wrapper = ImageInferenceModel(model, warmup_batch_sizes=[1, 4])
+
+    assert model.calls == [(1, 8, 8, 3), (4, 8, 8, 3)]
+    assert wrapper.latency.cold_ms is not None
+    assert len(wrapper.latency.warmup_ms) == 1
+    # Warmup calls are not counted as requests
+    assert wrapper.latency.count == 0
+
+
+def test_predict_uses_direct_call_and_records_single_image_latency():
+    model = _CallableModel()
+    wrapper = ImageInferenceModel(model, warmup_batch_sizes=[])
+    x = np.full((1, 8, 8, 3), 0.5, dtype=np.float64)
+
+    output = wrapper.predict(x, verbose=0)
+    wrapper.predict(np.zeros((3, 8, 8, 3)))
+
+    assert output.shape == (1, 1) and abs(output[0][0] - 0.5) < 1e-6
+    assert wrapper.latency.count == 1
+    assert wrapper.latency.percentile(50) is not None
+    assert any(row['model'] == '_CallableModel' for row in latency_report())
+
+
+def test_models_without_call_keep_their_predict():
+    model = _PredictOnlyModel()
+    wrapper = ImageInferenceModel(model, warmup_batch_sizes=[1])
+    assert wrapper.predict(np.zeros((2, 8, 8, 3)))[:, 0].tolist() == [0.25, 0.25]
+    assert model.calls == [(1, 8, 8, 3), (2, 8, 8, 3)]
+
+
+def test_latency_percentiles_over_rolling_window():
+    stats = LatencyStats(window=100)
+    assert stats.percentile(50) is None and stats.text() == "no calls yet"
+    for ms in range(1, 201):
+        stats.record(ms / 1000)
+
+    # Only the last 100 samples (101..200 ms) are kept
+    assert stats.count == 200
+    assert abs(stats.percentile(50) - 150.5) < 1e-6
+    assert abs(stats.percentile(99) - 199.01) < 1e-6
+    assert stats.text() == "p50 150 ms, p99 199 ms over 100 calls"
@@ -0,0 +1,148 @@
+"""
+Image model runtime: quantized-model selection, held-out set loading and the parity report
+"""
+import io
+import os
+import sys
+import types
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from utils import image_model_runtime
+from utils.image_model_runtime import image_model_path, load_holdout_images, parity_report, quantized_model_path
+
+
+class _MeanModel:
+    """Predicts the mean pixel value, optionally shifted, as the AI probability"""
+
+    def __init__(self, shift=0.0):
+        self.shift = shift
+        self.batch_sizes = []
+
+    def predict(self, batch, verbose=0):
+        self.batch_sizes.append(len(batch))
+        return np.clip(batch.mean(axis=(1, 2, 3)) + self.shift, 0, 1)[:, np.newaxis]
+
+
+def _image(level):
+    buffer = io.BytesIO()
+    Image.new('RGB', (64, 48), (level, level, level)).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+def test_quantized_model_is_used_only_when_configured_and_present(tmp_path):
+    keras_path = str(tmp_path / 'resnet.keras')
+    assert quantized_model_path(keras_path, 'int8') == str(tmp_path / 'resnet.int8.tflite')
+    assert image_model_path(keras_path, runtime='tflite', mode='int8') == keras_path
+
+    (tmp_path / 'resnet.int8.tflite').write_bytes(b'tflite')
+    assert image_model_path(keras_path, runtime='tflite', mode='int8') == str(tmp_path / 'resnet.int8.tflite')
+    assert image_model_path(keras_path, runtime='tflite', mode='float16') == keras_path
+    assert image_model_path(keras_path, runtime='keras', mode='int8') == keras_path
+
+
+def test_holdout_labels_come_from_ai_and_real_folders(tmp_path):
+    for folder, name in [('ai', 'a.png'), ('real', 'b.png'), ('misc', 'c.png')]:
+        (tmp_path / folder).mkdir()
+        (tmp_path / folder / name).write_bytes(_image(10))
+    (tmp_path / 'real' / 'notes.txt').write_text('not an image')
+
+    images = load_holdout_images(str(tmp_path))
+    assert [(name.replace('\\', '/'), label) for name, label, _ in images] == [
+        ('ai/a.png', 1), ('misc/c.png', None), ('real/b.png', 0)]
+
+
+def test_parity_report_compares_probabilities_classes_and_accuracy():
+    # Mean pixel values 0.2, 0.45, 0.55, 0.9; the shifted model flips 0.45 across the threshold
+    images = [('dark.png', 0, _image(51)), ('mid-low.png', 1, _image(115)),
+              ('mid-high.png', None, _image(140)), ('bright.png', 1, _image(230))]
+    reference, candidate = _MeanModel(), _MeanModel(shift=0.08)
+
+    report = parity_report(reference, candidate, images, batch_size=3)
+
+    assert reference.batch_sizes == candidate.batch_sizes == [3, 1]
+    assert report['images'] == 4
+    assert report['class_agreement'] == 0.75
+    assert report['disagreements'] == ['mid-low.png']
+    assert abs(report['max_abs_diff'] - 0.08) < 1e-5
+    assert report['labelled_images'] == 3
+    assert abs(report['reference_accuracy'] - 2 / 3) < 1e-9
+    assert report['candidate_accuracy'] == 1.0
+
+
+def test_identical_models_have_full_parity():
+    images = [(f'{level}.png', None, _image(level)) for level in (0, 128, 255)]
+    report = parity_report(_MeanModel(), _MeanModel(), images)
+    assert report['class_agreement'] == 1.0
+    assert report['max_abs_diff'] == 0.0
+    assert 'reference_accuracy' not in report
+
+
+def test_export_converts_through_a_saved_model(tmp_path, monkeypatch):
+    exported = []
+
+    class _KerasModel:
+        def export(self, directory):
+            assert os.path.isdir(directory)
+            exported.append(directory)
+
+    class _Converter:
+        def __init__(self, directory):
+            assert directory == exported[0]
+            self.optimizations = []
+            self.target_spec = types.SimpleNamespace(supported_types=[])
+
+        def convert(self):
+            return b'flatbuffer:' + b','.join(str(t).encode() for t in self.target_spec.supported_types)
+
+    keras = types.SimpleNamespace(models=types.SimpleNamespace(load_model=lambda path: _KerasModel()))
+    lite = types.SimpleNamespace(TFLiteConverter=types.SimpleNamespace(from_saved_model=_Converter),
+                                 Optimize=types.SimpleNamespace(DEFAULT='default'))
+    monkeypatch.setitem(sys.modules, 'keras', keras)
+    monkeypatch.setitem(sys.modules, 'tensorflow', types.SimpleNamespace(lite=lite, float16='float16'))
+
+    out_path = image_model_runtime.export_quantized(str(tmp_path / 'resnet.keras'), 'float16')
+    assert out_path == str(tmp_path / 'resnet.float16.tflite')
+    assert (tmp_path / 'resnet.float16.tflite').read_bytes() == b'flatbuffer:float16'
+    # The intermediate SavedModel is removed
+    assert not os.path.exists(exported[0])
+
+
+def _run_main(monkeypatch, tmp_path, *args):
+    keras_path = tmp_path / 'resnet.keras'
+    keras_path.write_bytes(b'keras')
+
+    def fake_export(model, mode, out_path=None):
+        with open(out_path, 'wb') as f:
+            f.write(b'tflite')
+        return out_path
+    monkeypatch.setattr(image_model_runtime, 'export_quantized', fake_export)
+    monkeypatch.setattr(sys, 'argv', ['image_model_runtime', '--model', str(keras_path),
+                                      '--holdout', str(tmp_path / 'holdout'), *args])
+    image_model_runtime.main()
+
+
+def test_export_without_holdout_images_is_refused(tmp_path, monkeypatch):
+    with pytest.raises(SystemExit, match='parity check'):
+        _run_main(monkeypatch, tmp_path)
+    assert list(tmp_path.glob('*.tflite*')) == []
+    assert image_model_path(str(tmp_path / 'resnet.keras'), runtime='tflite', mode='int8').endswith('.keras')
+
+
+def test_unchecked_export_needs_skip_parity(tmp_path, monkeypatch):
+    _run_main(monkeypatch, tmp_path, '--skip-parity')
+    assert [path.name for path in tmp_path.glob('*.tflite*')] == ['resnet.int8.tflite']
+
+
+def test_export_failing_parity_is_discarded(tmp_path, monkeypatch):
+    (tmp_path / 'holdout').mkdir()
+    (tmp_path / 'holdout' / 'a.png').write_bytes(_image(140))
+    monkeypatch.setattr(image_model_runtime, 'load_image_model_file', lambda path: _MeanModel())
+    monkeypatch.setattr(image_model_runtime, 'TFLiteImageModel', lambda path: _MeanModel(shift=-0.2))
+
+    with pytest.raises(SystemExit, match='below'):
+        _run_main(monkeypatch, tmp_path)
+    assert list(tmp_path.glob('*.tflite*')) == []
+    assert (tmp_path / 'resnet.int8.parity.json').exists()
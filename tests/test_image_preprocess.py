@@ -0,0 +1,63 @@
+"""
+Image preprocessing: parity with the full-resolution pipeline and buffer reuse
+"""
+import io
+
+import numpy as np
+from PIL import Image
+
+from utils.image_preprocess import decode_resized, open_image, preprocess_image
+
+rng = np.random.default_rng(0)
+
+
+def _encode(array, fmt, **kwargs):
+    buffer = io.BytesIO()
+    Image.fromarray(array).save(buffer, fmt, **kwargs)
+    return buffer.getvalue()
+
+
+def _reference(data):
+    """The previous app pipeline: full decode, RGB, resize, float64 / 255"""
+    image = Image.open(io.BytesIO(data))
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    return np.expand_dims(np.array(image.resize((224, 224))) / 255.0, axis=0)
+
+
+def _photo(height, width):
+    y, x = np.mgrid[0:height, 0:width]
+    base = np.stack([x / width * 255, y / height * 255, (x + y) % 256], axis=-1)
+    return (base + rng.normal(0, 10, (height, width, 3))).clip(0, 255).astype(np.uint8)
+
+
+def test_small_images_match_the_full_resolution_pipeline():
+    png = _encode(_photo(300, 400), 'PNG')
+    result = preprocess_image(png)
+    assert result.shape == (1, 224, 224, 3) and result.dtype == np.float32
+    np.testing.assert_allclose(result, _reference(png), rtol=0, atol=1e-6)
+
+    rgba = np.dstack([_photo(240, 260), np.full((240, 260), 128, np.uint8)])
+    data = _encode(rgba, 'PNG')
+    np.testing.assert_allclose(preprocess_image(data), _reference(data), rtol=0, atol=1e-6)
+
+
+def test_large_jpeg_is_decoded_at_reduced_size():
+    data = _encode(_photo(2400, 3200), 'JPEG', quality=90)
+    image = open_image(data)
+    decode_resized(image)
+    assert image.size == (800, 600)
+
+    result = preprocess_image(data)
+    assert np.abs(result - _reference(data)).mean() < 0.01
+
+
+def test_buffer_is_reused_per_thread():
+    data = _encode(_photo(50, 60), 'PNG')
+    first = preprocess_image(data)
+    assert preprocess_image(data) is first
+
+    out = np.zeros((224, 224, 3), dtype=np.float32)
+    batch = preprocess_image(open_image(data), out=out)
+    assert batch.base is out or np.shares_memory(batch, out)
+    np.testing.assert_array_equal(batch[0], first[0])
@@ -0,0 +1,152 @@
+"""
+Inference server: micro-batching, HTTP / Unix socket round trips and the in-process fallback
+"""
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from utils.inference_client import (InferenceClient, InferenceServerError, RemoteWebsiteModel, ServerConnection,
+                                    connect)
+from utils.inference_server import MicroBatcher, make_server, serve_website_model
+from utils.tree_engine import load_website_forest, predict_with_proba
+
+model = load_website_forest('models/stacking_model.joblib', engine='compiled')
+rng = np.random.default_rng(0)
+X = rng.uniform(0, 1, size=(20, model.n_features_in_)).astype(np.float32)
+
+
+def _serve(**kwargs):
+    server = make_server({'website': serve_website_model(model, max_wait=0.01)}, **kwargs)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def test_concurrent_requests_share_batches():
+    sizes = []
+
+    def predict(rows):
+        sizes.append(len(rows))
+        return rows * 2
+
+    batcher = MicroBatcher(predict, max_batch_size=64, max_wait=0.2)
+    start = threading.Barrier(8)
+    results = {}
+
+    def call(i):
+        start.wait()
+        results[i] = batcher.predict(np.full((i + 1, 2), i, dtype=np.float32), timeout=5)
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    batcher.close()
+
+    assert sum(sizes) == sum(range(1, 9)) and len(sizes) < 8
+    for i, output in results.items():
+        np.testing.assert_array_equal(output, np.full((i + 1, 2), 2 * i))
+    assert batcher.stats()['requests'] == 8
+
+
+def test_batches_never_exceed_max_batch_size():
+    sizes = []
+    release = threading.Event()
+
+    def predict(rows):
+        release.wait(5)
+        sizes.append(len(rows))
+        return rows + 1
+
+    batcher = MicroBatcher(predict, max_batch_size=4, max_wait=0.5)
+    # The first request fills a batch and holds the worker until every other request is queued
+    futures = [batcher.submit(np.full((n, 2), n, dtype=np.float32)) for n in (4, 3, 3, 3, 1, 5, 6)]
+    release.set()
+    outputs = [future.result(timeout=5) for future in futures]
+    batcher.close()
+
+    # Oversized requests run on their own; the rest are never merged past the limit
+    assert sizes == [4, 3, 3, 4, 5, 6]
+    for n, output in zip((4, 3, 3, 3, 1, 5, 6), outputs):
+        np.testing.assert_array_equal(output, np.full((n, 2), n + 1))
+
+
+def test_batch_errors_reach_every_caller():
+    def predict(rows):
+        raise RuntimeError('model exploded')
+
+    batcher = MicroBatcher(predict, max_batch_size=4, max_wait=0.01)
+    with pytest.raises(RuntimeError, match='model exploded'):
+        batcher.predict(np.zeros((1, 2)), timeout=5)
+    batcher.close()
+
+
+def test_http_round_trip_matches_in_process():
+    server = _serve(port=0)
+    try:
+        client, models = connect(f"http://127.0.0.1:{server.server_address[1]}")
+        remote = RemoteWebsiteModel(client, models['website'], fallback=lambda: None)
+        labels, proba = remote.predict_with_proba(X)
+        expected_labels, expected_proba = predict_with_proba(model, X)
+        np.testing.assert_allclose(proba, expected_proba, rtol=0, atol=1e-12)
+        np.testing.assert_array_equal(labels, expected_labels)
+
+        with pytest.raises(InferenceServerError) as error:
+            client.predict('website', X[:, :5])
+        assert error.value.status == 400
+        with pytest.raises(InferenceServerError):
+            client.predict('image', X)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_unix_socket_round_trip(tmp_path):
+    path = str(tmp_path / 'inference.sock')
+    server = _serve(socket_path=path)
+    try:
+        client = InferenceClient(f"unix://{path}")
+        assert client.health()['models']['website']['n_features_in'] == model.n_features_in_
+        np.testing.assert_allclose(client.predict('website', X[:3]), predict_with_proba(model, X[:3])[1],
+                                   rtol=0, atol=1e-12)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_unreachable_server_falls_back_to_in_process_model():
+    server = _serve(port=0)
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    client, models = connect(url)
+    server.shutdown()
+    server.server_close()
+
+    remote = RemoteWebsiteModel(client, models['website'], fallback=lambda: model)
+    np.testing.assert_array_equal(remote.predict(X), predict_with_proba(model, X)[0])
+    assert connect(url) == (None, {})
+    assert connect('') == (None, {})
+
+
+def test_failed_connect_is_retried_after_the_retry_interval():
+    server = _serve(port=0)
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+    connection = ServerConnection(url, retry_seconds=0.2)
+    assert connection.get() == (None, {})
+    server = _serve(port=server.server_address[1])
+    try:
+        # Still inside the retry interval: no new connect attempt
+        assert connection.get() == (None, {})
+        time.sleep(0.25)
+        client, models = connection.get()
+        assert client is not None and 'website' in models
+        assert connection.get()[0] is client
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert ServerConnection('').get() == (None, {})
@@ -0,0 +1,33 @@
+"""
+Keyword family matching
+"""
+from utils.keywords import KeywordMatcher, SCRAPER_KEYWORDS
+
+
+def test_find_reports_each_matching_family():
+    matcher = KeywordMatcher({'a': ['Alpha', 'beta'], 'b': ['gamma'], 'c': ['delta']})
+    assert matcher.keywords('a') == ('alpha', 'beta')
+    assert matcher.find('xx beta gamma') == {'a', 'b'}
+    assert matcher.find('xx beta gamma', ('b', 'c')) == {'b'}
+    assert matcher.find_in_any(['alp', 'ha', 'delta']) == {'c'}
+
+
+def test_count_items():
+    links = ['https://facebook.com/page', 'https://example.com', 'https://x.com/user', 'https://x.com/other']
+    assert SCRAPER_KEYWORDS.count_items(links, 'social') == 3
+    assert SCRAPER_KEYWORDS.count_items(links[1:2], 'social') == 0
+    assert SCRAPER_KEYWORDS.count_items([], 'social') == 0
+
+
+def test_first_follows_keyword_order():
+    matcher = KeywordMatcher({'a': ['tube', 'you']})
+    assert matcher.first('youtube.com', 'a') == 'tube'
+    assert matcher.first('example.com', 'a') is None
+
+
+def test_known_site_families_match_like_the_lists_they_replaced():
+    assert SCRAPER_KEYWORDS.matches('docs.stackoverflow.com', 'major_tech_site')
+    assert not SCRAPER_KEYWORDS.matches('example.org', 'major_tech_site')
+    # The earliest entry of KNOWN_SITE_AGES wins, as in the dict loop it replaced
+    assert SCRAPER_KEYWORDS.first('youtube.google.com', 'known_age_site') == 'google'
+    assert SCRAPER_KEYWORDS.first('en.wikipedia.org', 'known_age_site') == 'wikipedia'
@@ -0,0 +1,35 @@
+"""
+Lookups against the curated trusted / untrusted source lists
+"""
+from utils.known_domains import KnownDomainIndex, load_known_domains
+
+
+def test_curated_lists_resolve_hosts_to_their_listed_domain():
+    index = load_known_domains()
+
+    assert index.lookup('https://www.nytimes.com/section/world')['verdict'] == 'Trusted'
+    assert index.lookup('edition.NYTimes.com')['domain'] == 'nytimes.com'
+    assert index.lookup('http://naturalnews.com/')['verdict'] == 'Untrusted'
+    assert index.lookup('https://not-a-listed-site.example/') is None
+
+
+def test_subdomain_entries_do_not_cover_the_parent_domain():
+    index = KnownDomainIndex()
+    index.add('abcnews.go.com', 'Trusted', {'domain': 'abcnews.go.com'})
+    index.add('cnn.com.de', 'Trusted', {'domain': 'cnn.com.de'})
+
+    assert index.lookup('https://abcnews.go.com/US')['domain'] == 'abcnews.go.com'
+    assert index.lookup('https://video.abcnews.go.com/')['domain'] == 'abcnews.go.com'
+    assert index.lookup('https://disney.go.com/') is None
+    assert index.lookup('https://www.cnn.com.de/')['domain'] == 'cnn.com.de'
+    assert index.lookup('https://other.com.de/') is None
+
+
+def test_first_entry_wins_and_malformed_domains_are_skipped():
+    index = KnownDomainIndex()
+    assert index.add('www.example.com', 'Trusted', {}, source='a.csv')
+    assert not index.add('example.com', 'Untrusted', {}, source='b.csv')
+    assert not index.add('inccom', 'Trusted', {})
+
+    assert len(index) == 1
+    assert index.lookup('example.com')['source'] == 'a.csv'
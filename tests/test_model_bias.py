@@ -3,10 +3,11 @@ Test what the model considers TRUSTED
 """
 import pandas as pd
 import joblib
+from utils.feature_encoder import load_feature_encoder
 
 # Load model
-model = joblib.load('stacking_model.joblib')
-features = joblib.load('feature_names.joblib')[:model.n_features_in_]
+model = joblib.load('models/stacking_model.joblib')
+encoder = load_feature_encoder('models/feature_names.joblib', model.n_features_in_)
 
 print("TESTING: What does model consider TRUSTED?\n")
 
@@ -39,12 +40,7 @@ perfect_trusted = {
     'mobile_responsive': 'Yes'
 }
 
-df1 = pd.DataFrame([perfect_trusted])
-df1_enc = pd.get_dummies(df1)
-df1_final = pd.DataFrame(0, index=[0], columns=features)
-for col in df1_enc.columns:
-    if col in features:
-        df1_final[col] = df1_enc[col].values[0]
+df1_final = encoder.encode(perfect_trusted)[None, :]
 
 pred1 = model.predict(df1_final)[0]
 prob1 = model.predict_proba(df1_final)[0]
@@ -82,12 +78,7 @@ github_improved = {
     'mobile_responsive': 'Yes'
 }
 
-df2 = pd.DataFrame([github_improved])
-df2_enc = pd.get_dummies(df2)
-df2_final = pd.DataFrame(0, index=[0], columns=features)
-for col in df2_enc.columns:
-    if col in features:
-        df2_final[col] = df2_enc[col].values[0]
+df2_final = encoder.encode(github_improved)[None, :]
 
 pred2 = model.predict(df2_final)[0]
 prob2 = model.predict_proba(df2_final)[0]
@@ -103,17 +94,12 @@ print("=" * 80)
 
 # Load one of the trusted sources
 import pandas as pd
-trusted_df = pd.read_csv('trusted_sources_original.csv')
+trusted_df = pd.read_csv('data/trusted_sources_original.csv')
 if len(trusted_df) > 0:
     print(f"Sample trusted site from training:</n{trusted_df.iloc[0].to_dict()}\n")
     
     sample = trusted_df.iloc[0].to_dict()
-    df3 = pd.DataFrame([sample])
-    df3_enc = pd.get_dummies(df3)
-    df3_final = pd.DataFrame(0, index=[0], columns=features)
-    for col in df3_enc.columns:
-        if col in features:
-            df3_final[col] = df3_enc[col].values[0]
+    df3_final = encoder.encode(sample)[None, :]
     
     pred3 = model.predict(df3_final)[0]
     prob3 = model.predict_proba(df3_final)[0]
@@ -0,0 +1,61 @@
+"""
+News analysis: response parsing, cache keys and the persistent verdict cache
+"""
+from utils.news_analysis import AnalysisCache, analysis_cache_key, build_analysis_prompt, parse_analysis
+
+RESPONSE = """VERDICT: MISLEADING
+CONFIDENCE: 72%
+REASONING: The headline overstates the findings of the cited study.
+RED_FLAGS: sensational headline, no link to the study
+RECOMMENDATION: Read the original study before sharing."""
+
+
+def test_parse_analysis_fields():
+    analysis = parse_analysis(RESPONSE)
+    assert analysis['verdict'] == "MISLEADING"
+    assert analysis['confidence'] == 72
+    assert analysis['red_flags'] == "sensational headline, no link to the study"
+    assert analysis['recommendation'] == "Read the original study before sharing."
+    assert analysis['result_text'] == RESPONSE
+
+    assert parse_analysis("VERDICT: FAKE\nCONFIDENCE: high")['confidence'] == 0
+    assert parse_analysis("I cannot help with that.")['verdict'] == "UNKNOWN"
+
+
+def test_prompt_keeps_braces_in_article_text():
+    assert 'x = {"a": 1}' in build_analysis_prompt('x = {"a": 1}')
+
+
+def test_cache_key_ignores_whitespace_but_not_content_or_settings():
+    key = analysis_cache_key("Breaking news:  the  river\nflooded.")
+    assert analysis_cache_key("  Breaking news: the river flooded. ") == key
+    assert analysis_cache_key("Breaking news: the river flooded!") != key
+    assert analysis_cache_key("Breaking news: the river flooded.", temperature=0.0) != key
+    assert analysis_cache_key("Breaking news: the river flooded.", model="other-model") != key
+    assert analysis_cache_key("Breaking news: the river flooded.", prompt_version=999) != key
+
+
+def test_verdicts_persist_across_instances_and_count_hits(tmp_path):
+    path = str(tmp_path / 'analysis.sqlite3')
+    key = analysis_cache_key("Some article")
+    cache = AnalysisCache(path=path)
+    assert cache.get(key) is None
+    cache.put(key, parse_analysis(RESPONSE))
+
+    shared = AnalysisCache(path=path)
+    assert shared.get(key)['verdict'] == "MISLEADING"
+    assert shared.get(key)['confidence'] == 72
+    assert (shared.hits, shared.misses, shared.hit_rate) == (2, 0, 1.0)
+    assert cache.stats_text() == "hit rate 0% over 1 lookups"
+
+
+def test_unparsed_responses_are_not_cached(tmp_path):
+    cache = AnalysisCache(path=str(tmp_path / 'analysis.sqlite3'))
+    cache.put('key', parse_analysis("Sorry, something went wrong."))
+    assert len(cache) == 0
+
+
+def test_expired_verdicts_are_not_served(tmp_path):
+    cache = AnalysisCache(path=str(tmp_path / 'analysis.sqlite3'), ttl=-1)
+    cache.put('key', parse_analysis(RESPONSE))
+    assert cache.get('key') is None
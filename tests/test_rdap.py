@@ -0,0 +1,142 @@
+"""
+RDAP and port-43 lookups against local stand-in servers
+"""
+import json
+import socketserver
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from utils import rdap, sqlite_cache
+
+DOMAIN_OBJECT = {
+    'objectClassName': 'domain',
+    'ldhName': 'example.test',
+    'events': [
+        {'eventAction': 'last changed', 'eventDate': '2023-02-01T10:00:00Z'},
+        {'eventAction': 'registration', 'eventDate': '1999-07-14T04:00:00.123Z'},
+    ],
+    'entities': [
+        {'roles': ['registrar'], 'vcardArray': ['vcard', [['version', {}, 'text', '4.0'],
+                                                          ['fn', {}, 'text', 'MarkMonitor Inc.']]]},
+        {'roles': ['registrant'], 'remarks': [{'title': 'REDACTED FOR PRIVACY'}]},
+    ],
+}
+
+
+class RDAPHandler(BaseHTTPRequestHandler):
+    bootstrap_requests = 0
+
+    def do_GET(self):
+        if self.path == '/bootstrap.json':
+            RDAPHandler.bootstrap_requests += 1
+            base = f"http://127.0.0.1:{self.server.server_address[1]}/rdap/"
+            body = json.dumps({'services': [[['test', 'example'], [base]]]}).encode()
+        elif self.path == '/rdap/domain/example.test':
+            body = json.dumps(DOMAIN_OBJECT).encode()
+        elif self.path == '/rdap/domain/huge.test':
+            body = json.dumps({'events': [], 'notices': ['x' * 4096] * 64}).encode()
+        else:
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/rdap+json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class WhoisHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        query = self.rfile.readline().strip().decode()
+        self.wfile.write(f"Domain Name: {query.upper()}\r\nRegistrar: Example Registrar\r\n"
+                         "Creation Date: 2004-03-09T00:00:00Z\r\n".encode())
+        self.wfile.write(b'% filler\r\n' * 20000)
+
+
+@pytest.fixture
+def rdap_server(tmp_path, monkeypatch):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), RDAPHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(sqlite_cache, 'CACHE_DIR', str(tmp_path))
+    monkeypatch.setattr(rdap, 'BOOTSTRAP_URL', f"http://127.0.0.1:{server.server_address[1]}/bootstrap.json")
+    monkeypatch.setattr(rdap, '_bootstrap', None)
+    RDAPHandler.bootstrap_requests = 0
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture
+def whois_server():
+    server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), WhoisHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server.server_address
+    server.shutdown()
+
+
+def test_rdap_lookup_and_cached_bootstrap(rdap_server, tmp_path, monkeypatch):
+    record, debug_info = rdap.lookup_domain('example.test', timeout=2)
+    assert record == {
+        'creation_date': datetime(1999, 7, 14, 4, 0, 0, 123000),
+        'domain_registrar': 'MarkMonitor Inc.',
+        'whois_privacy_enabled': True,
+    }
+    assert 'RDAP' in debug_info[0]
+    assert (tmp_path / rdap.BOOTSTRAP_FILE).exists()
+
+    # A fresh process (empty memory copy) reads the cached file instead of refetching
+    monkeypatch.setattr(rdap, '_bootstrap', None)
+    assert rdap.lookup_domain('missing.example', timeout=2)[0] == {}
+    assert RDAPHandler.bootstrap_requests == 1
+
+
+def test_failed_bootstrap_is_retried_soon(rdap_server, monkeypatch):
+    good_url = rdap.BOOTSTRAP_URL
+    monkeypatch.setattr(rdap, 'BOOTSTRAP_URL', good_url.replace('bootstrap.json', 'missing.json'))
+    assert rdap.load_bootstrap(timeout=2) == {}
+    # An empty registry is kept for BOOTSTRAP_RETRY, not the full day
+    assert rdap._bootstrap_expires_at - time.time() <= rdap.BOOTSTRAP_RETRY
+
+    monkeypatch.setattr(rdap, 'BOOTSTRAP_URL', good_url)
+    monkeypatch.setattr(rdap, '_bootstrap_expires_at', 0.0)
+    assert 'test' in rdap.load_bootstrap(timeout=2)
+    assert rdap._bootstrap_expires_at - time.time() > rdap.BOOTSTRAP_RETRY
+
+
+def test_lookups_use_previous_bootstrap_during_refresh(rdap_server, monkeypatch):
+    previous = {'old': ['http://old/']}
+    monkeypatch.setattr(rdap, '_bootstrap', previous)
+    monkeypatch.setattr(rdap, '_bootstrap_expires_at', 0.0)
+    # Another thread is downloading: return at once instead of waiting on it
+    with rdap._bootstrap_refresh_lock:
+        assert rdap.load_bootstrap(timeout=2) is previous
+    assert RDAPHandler.bootstrap_requests == 0
+    assert 'test' in rdap.load_bootstrap(timeout=2)
+
+
+def test_rdap_response_size_is_capped(rdap_server, monkeypatch):
+    monkeypatch.setattr(rdap, 'MAX_RESPONSE_BYTES', 64 * 1024)
+    with pytest.raises(ConnectionError, match='byte limit'):
+        rdap.lookup_domain('huge.test', timeout=2)
+
+
+def test_port43_fallback_is_bounded(whois_server, monkeypatch):
+    monkeypatch.setattr(rdap, 'MAX_RESPONSE_BYTES', 16 * 1024)
+    record = rdap.lookup_port43('example.zz', timeout=2, server=whois_server)
+    assert record == {'creation_date': datetime(2004, 3, 9)}
+    assert rdap.rdap_base_urls('example.zz', {'test': ['http://x/']}) == []
+
+
+def test_parse_rdap_date():
+    assert rdap.parse_rdap_date('2001-05-01T00:00:00+02:00') == datetime(2001, 4, 30, 22, 0)
+    assert rdap.parse_rdap_date('2001-05-01T00:00:00.5Z') == datetime(2001, 5, 1, 0, 0, 0, 500000)
+    assert rdap.parse_rdap_date('not a date') is None
@@ -0,0 +1,49 @@
+"""
+Load bookkeeping, background prewarming and the import cost report
+"""
+import threading
+import time
+
+from utils import startup
+
+
+def test_prewarm_runs_only_the_selected_loaders(monkeypatch):
+    monkeypatch.setattr(startup, '_loads', {})
+    called = []
+
+    def loader(name, fail=False):
+        def load():
+            started = time.perf_counter()
+            called.append(name)
+            startup.record_load(name, started, error='boom' if fail else None)
+            if fail:
+                raise RuntimeError('boom')
+        return load
+
+    loaders = {'website': loader('website', fail=True), 'image': loader('image'), 'groq': loader('groq')}
+    assert startup.start_prewarm(loaders, names='') is None
+
+    startup.start_prewarm(loaders, names='website, image').join(5)
+    assert called == ['website', 'image']
+    assert startup.load_status('groq') is None
+    assert startup.load_status('image')['thread'] == 'model-prewarm'
+    assert [(row['name'], row['status']) for row in startup.load_report()] == [('image', 'Loaded'),
+                                                                               ('website', 'Failed')]
+
+    called.clear()
+    startup.start_prewarm(loaders, names='all').join(5)
+    assert called == ['website', 'image', 'groq']
+
+
+def test_record_load_from_the_foreground(monkeypatch):
+    monkeypatch.setattr(startup, '_loads', {})
+    startup.record_load('website', time.perf_counter() - 1.5)
+    status = startup.load_status('website')
+    assert status['seconds'] >= 1.5 and status['error'] is None
+    assert status['thread'] == threading.current_thread().name
+
+
+def test_import_cost():
+    assert startup.import_cost('json') > 0
+    assert startup.import_cost('no_such_module_xyz') is None
+    assert [row['module'] for row in startup.import_report(['json'])] == ['json']
@@ -0,0 +1,86 @@
+"""
+Parity check: CompiledForest vs the sklearn ExtraTreesClassifier it was built from
+"""
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.feature_encoder import load_feature_encoder
+from utils.tree_engine import CompiledForest, load_compiled_forest, predict_with_proba
+
+model = joblib.load('models/stacking_model.joblib')
+encoder = load_feature_encoder('models/feature_names.joblib', model.n_features_in_)
+compiled = CompiledForest(model, block_size=128)
+# Force the NumPy node-array walk for every block size
+vectorized = CompiledForest(model, block_size=128, vectorized_max_rows=128)
+X = encoder.encode_batch(pd.read_csv('data/website_metadata_examples.csv'))
+
+
+def test_proba_matches_sklearn():
+    expected = model.predict_proba(X)
+    np.testing.assert_allclose(compiled.predict_proba(X), expected, rtol=0, atol=1e-12)
+    np.testing.assert_allclose(vectorized.predict_proba(X), expected, rtol=0, atol=1e-12)
+
+
+def test_leaves_match_sklearn_apply():
+    expected = model.apply(X) + vectorized.roots
+    np.testing.assert_array_equal(vectorized.apply(X), expected)
+    np.testing.assert_array_equal(compiled.apply(X), expected)
+
+
+def test_labels_match_sklearn():
+    labels, proba = compiled.predict_with_proba(X)
+    np.testing.assert_array_equal(labels, model.predict(X))
+    assert proba.shape == (len(X), len(model.classes_))
+
+
+def test_random_inputs_match_sklearn():
+    rng = np.random.default_rng(0)
+    X_random = rng.uniform(-1, 30, size=(500, model.n_features_in_)).astype(np.float32)
+    expected = model.predict_proba(X_random)
+    np.testing.assert_allclose(compiled.predict_proba(X_random), expected, rtol=0, atol=1e-12)
+    np.testing.assert_allclose(vectorized.predict_proba(X_random), expected, rtol=0, atol=1e-12)
+
+
+def test_non_finite_inputs_are_rejected_like_sklearn():
+    for value, message in [(np.nan, 'NaN'), (np.inf, 'infinity')]:
+        X_bad = np.array(X, dtype=np.float64)
+        X_bad[0, 0] = value
+        with pytest.raises(ValueError, match=message):
+            model.predict_proba(X_bad)
+        for forest in (compiled, vectorized):
+            with pytest.raises(ValueError, match=message):
+                forest.predict_proba(X_bad)
+            with pytest.raises(ValueError, match=message):
+                forest.apply(X_bad[:1])
+
+
+def test_single_row_and_sklearn_fallback():
+    labels, proba = predict_with_proba(compiled, X[:1])
+    sk_labels, sk_proba = predict_with_proba(model, X[:1])
+    np.testing.assert_array_equal(labels, sk_labels)
+    np.testing.assert_allclose(proba, sk_proba, rtol=0, atol=1e-12)
+
+
+def test_memory_mapped_arrays_match_sklearn(tmp_path):
+    source = tmp_path / 'model.joblib'
+    joblib.dump(model, source)
+    compiled.save(tmp_path / 'arrays', source_path=str(source))
+
+    loaded = load_compiled_forest(str(tmp_path / 'arrays'), source_path=str(source))
+    assert isinstance(loaded.children, np.memmap) and not loaded.children.flags.writeable
+    assert loaded.n_features_in_ == model.n_features_in_
+    labels, proba = loaded.predict_with_proba(X)
+    np.testing.assert_allclose(proba, model.predict_proba(X), rtol=0, atol=1e-12)
+    np.testing.assert_array_equal(labels, model.predict(X))
+
+
+def test_stale_or_incomplete_conversion_is_ignored(tmp_path):
+    source = tmp_path / 'model.joblib'
+    source.write_bytes(b'original')
+    compiled.save(tmp_path / 'arrays', source_path=str(source))
+
+    source.write_bytes(b'retrained')
+    assert load_compiled_forest(str(tmp_path / 'arrays'), source_path=str(source)) is None
+    assert load_compiled_forest(str(tmp_path / 'missing')) is None
@@ -0,0 +1,316 @@
+"""
+Scraper checks against a local HTTP server (no external network needed)
+"""
+import asyncio
+import shutil
+import ssl
+import subprocess
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from utils import webscraper
+from utils.sqlite_cache import SQLiteCache
+
+PAGE = b"""<html><head><meta name="viewport" content="width=device-width">
+<script src="https://cdnjs.cloudflare.com/lib.js"></script></head>
+<body><div class="ad-banner" id="sponsor1">Ad</div><div class="popup">Sign up</div>
+<a href="/contact">Contact us</a><a href="https://facebook.com/site">fb</a>
+<a href="https://twitter.com/site">tw</a><a href="/privacy">Privacy Policy</a>
+<a href="/terms">Terms of Service</a><iframe src="https://doubleclick.net/ad"></iframe>
+</body></html>"""
+
+LONG_PAGE = (b'<html><head><meta name="viewport" content="width=device-width"></head><body>'
+             + b'<p>filler paragraph</p>' * 50000 + b'<a href="/privacy">Privacy Policy</a></body></html>')
+
+
+class PageHandler(SimpleHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    connections = 0
+    not_modified = 0
+
+    def setup(self):
+        super().setup()
+        PageHandler.connections += 1
+
+    def do_GET(self):
+        if self.path.startswith('/binary'):
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/octet-stream')
+            self.send_header('Content-Length', str(len(LONG_PAGE)))
+            self.end_headers()
+            self.wfile.write(LONG_PAGE)
+            return
+        if self.path.startswith('/long'):
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(LONG_PAGE)))
+            self.end_headers()
+            try:
+                self.wfile.write(LONG_PAGE)
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+            return
+        # /cached carries an ETag and answers conditional requests with 304
+        etag = '"v1"' if self.path.startswith('/cached') else None
+        if etag and self.headers.get('If-None-Match') == etag:
+            PageHandler.not_modified += 1
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(len(PAGE)))
+        if etag:
+            self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(PAGE)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope='module')
+def server_url():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), PageHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/"
+    server.shutdown()
+
+
+@pytest.fixture(autouse=True)
+def isolated_whois_cache(tmp_path, monkeypatch):
+    cache = SQLiteCache(str(tmp_path / 'whois.sqlite3'), default_ttl=webscraper.WHOIS_CACHE_TTL)
+    monkeypatch.setattr(webscraper, '_whois_cache', cache)
+    return cache
+
+
+@pytest.fixture
+def slow_whois(monkeypatch):
+    def lookup(domain, delay=0.5):
+        time.sleep(delay)
+        created = datetime.now() - timedelta(days=int(12 * 365.25) + 1)
+        return {'creation_date': created, 'domain_registrar': 'MarkMonitor'}, ['WHOIS stub']
+    monkeypatch.setattr(webscraper, '_lookup_whois', lookup)
+
+
+def test_async_matches_sync(server_url, slow_whois):
+    sync_result = webscraper.scrape_website_metadata(server_url)
+    async_result = asyncio.run(webscraper.scrape_website_metadata_async(server_url))
+
+    for result in (sync_result, async_result):
+        result.pop('page_load_time_sec')
+    assert async_result == sync_result
+    assert sync_result['domain_age_years'] == 12.0
+    assert sync_result['cdn_used'] == 'yes'
+    assert sync_result['social_media_presence'] == 'medium'
+
+
+def test_async_stages_overlap(server_url, monkeypatch, slow_whois):
+    original_fetch = webscraper._fetch_page
+
+    def slow_fetch(url, timeout, head_only=False):
+        time.sleep(0.5)
+        return original_fetch(url, timeout, head_only=head_only)
+    monkeypatch.setattr(webscraper, '_fetch_page', slow_fetch)
+
+    start = time.time()
+    result = asyncio.run(webscraper.scrape_website_metadata_async(server_url))
+    assert time.time() - start < 0.9
+    # Both stages really ran: page features and the WHOIS age are filled in
+    assert 'error' not in result
+    assert result['domain_age_years'] == 12.0
+    assert result['cdn_used'] == 'yes'
+    assert result['social_media_presence'] == 'medium'
+
+
+def test_pooled_session_reuses_connections(server_url, slow_whois):
+    webscraper.scrape_website_metadata(server_url)
+    before = PageHandler.connections
+    for _ in range(3):
+        webscraper.scrape_website_metadata(server_url)
+    assert PageHandler.connections == before
+
+
+def test_connection_error_returns_error_dict():
+    result = asyncio.run(webscraper.scrape_website_metadata_async('http://127.0.0.1:9/'))
+    assert 'error' in result
+
+
+@pytest.fixture(scope='module')
+def tls_server(tmp_path_factory):
+    """HTTPS server whose certificate is signed by a throwaway local CA"""
+    if shutil.which('openssl') is None:
+        pytest.skip('openssl binary not available')
+    certs = tmp_path_factory.mktemp('certs')
+
+    def openssl(*args):
+        subprocess.run(['openssl', *args], cwd=certs, check=True, capture_output=True)
+
+    openssl('req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1', '-keyout', 'ca.key',
+            '-out', 'ca.pem', '-subj', '/O=Test Root/CN=Test Root CA')
+    openssl('req', '-newkey', 'rsa:2048', '-nodes', '-keyout', 'server.key', '-out', 'server.csr',
+            '-subj', '/O=Example Org/L=Springfield/CN=localhost')
+    (certs / 'ext.cnf').write_text('subjectAltName=DNS:localhost,IP:127.0.0.1\n')
+    openssl('x509', '-req', '-in', 'server.csr', '-CA', 'ca.pem', '-CAkey', 'ca.key', '-CAcreateserial',
+            '-days', '1', '-out', 'server.pem', '-extfile', 'ext.cnf')
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), PageHandler)
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(certs / 'server.pem', certs / 'server.key')
+    server.socket = context.wrap_socket(server.socket, server_side=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"https://localhost:{server.server_address[1]}/", str(certs / 'ca.pem')
+    server.shutdown()
+
+
+def test_tls_details_come_from_page_connection(tls_server, monkeypatch, slow_whois):
+    url, ca_bundle = tls_server
+    monkeypatch.setenv('REQUESTS_CA_BUNDLE', ca_bundle)
+
+    def no_second_handshake(hostname):
+        raise AssertionError('second TLS handshake should not be needed')
+    monkeypatch.setattr(webscraper, '_fetch_tls_info', no_second_handshake)
+
+    result = webscraper.scrape_website_metadata(url)
+    assert result['ssl_valid'] == 'Yes'
+    assert result['tls_version'].startswith('TLS')
+    assert result['ssl_issuer'] == 'Test Root'
+    assert result['certificate_type'] == 'OV'
+
+
+def test_untrusted_certificate_is_invalid_but_page_scraped(tls_server, slow_whois):
+    url, _ = tls_server
+    result = webscraper.scrape_website_metadata(url)
+    assert result['ssl_valid'] == 'No'
+    assert result['server_response_code'] == 200
+    assert result['contact_info_available']
+
+
+
+def test_whois_cache_hits_and_negative_entries(monkeypatch, isolated_whois_cache):
+    calls = []
+
+    def lookup(domain):
+        calls.append(domain)
+        if domain.endswith('good.com'):
+            return {'creation_date': datetime(2001, 5, 1), 'domain_registrar': 'MarkMonitor',
+                    'whois_privacy_enabled': False}, []
+        return {}, ['python-whois failed: timeout']
+    monkeypatch.setattr(webscraper, '_lookup_whois', lookup)
+
+    first, _ = webscraper._cached_whois_lookup('www.good.com')
+    second, debug_info = webscraper._cached_whois_lookup('news.good.com:443')
+    assert calls == ['www.good.com']
+    assert second == first
+    assert 'WHOIS cache hit for good.com' in debug_info[0]
+    assert isolated_whois_cache.hit_rate == 0.5
+
+    webscraper._cached_whois_lookup('bad.org')
+    webscraper._cached_whois_lookup('bad.org')
+    assert calls.count('bad.org') == 1
+
+    monkeypatch.setattr(webscraper, 'WHOIS_NEGATIVE_TTL', -1)
+    webscraper._cached_whois_lookup('other-bad.org')
+    webscraper._cached_whois_lookup('other-bad.org')
+    assert calls.count('other-bad.org') == 2
+
+
+def test_whois_strategies_race_under_one_deadline(monkeypatch):
+    def slow_library(domain, timeout, cancelled):
+        cancelled.wait(2)
+        return {'creation_date': datetime(1995, 1, 1)}, []
+
+    def fast_api(domain, timeout, cancelled):
+        time.sleep(0.05)
+        return {'creation_date': datetime(2001, 5, 1), 'domain_registrar': 'MarkMonitor'}, []
+
+    def broken_socket(domain, timeout, cancelled):
+        raise OSError('connection refused')
+
+    monkeypatch.setattr(webscraper, 'WHOIS_STRATEGIES', [
+        ('python-whois', slow_library), ('whoisxmlapi', fast_api), ('port 43', broken_socket),
+    ])
+    started = time.monotonic()
+    record, debug_info = webscraper._lookup_whois('example.com', deadline=3)
+    assert time.monotonic() - started < 1
+    assert record['creation_date'] == datetime(2001, 5, 1)
+    assert record['domain_registrar'] == 'MarkMonitor'
+    assert any('answered by whoisxmlapi' in line for line in debug_info)
+
+    # Nobody finds a creation date: bounded by the deadline, partial fields merged
+    def registrar_only(domain, timeout, cancelled):
+        return {'domain_registrar': 'GoDaddy'}, []
+
+    def hangs(domain, timeout, cancelled):
+        cancelled.wait(5)
+        return {}, []
+
+    monkeypatch.setattr(webscraper, 'WHOIS_STRATEGIES', [
+        ('python-whois', hangs), ('whoisxmlapi', registrar_only), ('port 43', hangs),
+    ])
+    started = time.monotonic()
+    record, debug_info = webscraper._lookup_whois('example.com', deadline=0.3)
+    assert time.monotonic() - started < 0.6
+    assert record == {'domain_registrar': 'GoDaddy'}
+    assert any('deadline' in line for line in debug_info)
+
+
+def test_page_cache_revalidates_with_etag(server_url, slow_whois, monkeypatch):
+    url = server_url + 'cached'
+    first = webscraper.scrape_website_metadata(url)
+    assert len(webscraper._page_cache) == 1
+
+    # A 304 must skip both the download and the HTML parse
+    def no_parse(*args, **kwargs):
+        raise AssertionError('page was parsed again')
+    monkeypatch.setattr(webscraper, 'extract_html_features', no_parse)
+    PageHandler.not_modified = 0
+    second = webscraper.scrape_website_metadata(url)
+
+    assert PageHandler.not_modified == 1
+    assert second == first
+    assert webscraper._page_cache.hits == 1
+
+    # Pages without a validator are not stored
+    webscraper.scrape_website_metadata(server_url + 'plain')
+    assert len(webscraper._page_cache) == 1
+
+
+def test_page_cache_evicts_least_recently_used(tmp_path):
+    from types import SimpleNamespace
+    from utils.page_cache import PageCache
+
+    cache = PageCache(str(tmp_path / 'pages.sqlite3'), max_bytes=250)
+    for name in ('a', 'b', 'c'):
+        response = SimpleNamespace(url=f'https://{name}.com/', status_code=200, history=[],
+                                   headers={'ETag': name}, content=b'x' * 100)
+        cache.put(f'https://{name}.com', response, {})
+        if name == 'b':
+            cache.get('https://A.com/#top')
+    assert cache.get('https://b.com/') is None
+    assert cache.get('https://a.com/').conditional_headers() == {'If-None-Match': 'a'}
+    assert cache.total_bytes() == 200
+
+
+def test_download_is_capped_and_gated(server_url, slow_whois, monkeypatch):
+    monkeypatch.setattr(webscraper, 'PAGE_MAX_BYTES', 100_000)
+    response, _, _ = webscraper._fetch_page(server_url + 'long', timeout=5)
+    assert len(response.content) == 100_000 and response.partial
+
+    full = webscraper.scrape_website_metadata(server_url + 'binary')
+    assert 'Not an HTML page' in full['error']
+
+    # Head-only mode stops shortly after </head>; the footer privacy link is never seen
+    monkeypatch.setattr(webscraper, 'PAGE_MAX_BYTES', 5 * 1024 * 1024)
+    response, _, _ = webscraper._fetch_page(server_url + 'long', timeout=5, head_only=True)
+    assert len(response.content) < 200_000 and response.partial
+    quick = webscraper.scrape_website_metadata(server_url + 'long', head_only=True)
+    assert quick['mobile_responsive'] == 'Yes'
+    assert quick['privacy_policy_exists'] is False
+    assert webscraper.scrape_website_metadata(server_url + 'long')['privacy_policy_exists'] is True
@@ -0,0 +1,70 @@
+"""
+Streaming Batch Prediction
+Scores arbitrarily large metadata CSVs chunk by chunk with flat memory use
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from utils.tree_engine import predict_with_proba
+
+DEFAULT_CHUNK_SIZE = 20_000
+# Largest results CSV offered for download; Streamlit keeps a download's whole content in memory
+MAX_DOWNLOAD_BYTES = int(os.getenv('BATCH_MAX_DOWNLOAD_BYTES', 200 * 1024 * 1024))
+RESULT_COLUMNS = ['Prediction', 'Confidence', 'Trust_Probability']
+
+
+def predict_csv_in_chunks(source, output_path, model, encoder, chunksize=DEFAULT_CHUNK_SIZE,
+                          should_cancel=None):
+    """
+    Score a metadata CSV in bounded chunks and append results to an output CSV
+
+    Only the columns the model knows are encoded; every other column (e.g. the
+    free-text `domain`) is passed through untouched instead of being one-hot
+    encoded. Each chunk's feature matrix is written into one reused buffer.
+
+    Args:
+        source: Path or binary file object of the input CSV
+        output_path: Path of the CSV the scored rows are appended to
+        model: Fitted website credibility classifier
+        encoder: FeatureEncoder for the model's feature layout
+        chunksize: Rows per chunk
+        should_cancel: Optional callable; scoring stops when it returns True
+
+    Yields:
+        dict: Running totals after each chunk (rows, trusted, untrusted,
+        bytes_read, cancelled)
+    """
+    progress = {'rows': 0, 'trusted': 0, 'untrusted': 0, 'bytes_read': 0, 'cancelled': False}
+    buffer = np.zeros((chunksize, encoder.n_features), dtype=np.float32)
+    trusted_class = list(model.classes_).index(1)
+
+    with pd.read_csv(source, chunksize=chunksize) as reader:
+        for chunk in reader:
+            if should_cancel is not None and should_cancel():
+                progress['cancelled'] = True
+                break
+
+            X = encoder.encode_batch(chunk, out=buffer[:len(chunk)])
+
+            predictions, probabilities = predict_with_proba(model, X)
+
+            chunk['Prediction'] = np.where(predictions == 1, 'Trusted', 'Untrusted')
+            chunk['Confidence'] = probabilities.max(axis=1) * 100
+            chunk['Trust_Probability'] = probabilities[:, trusted_class] * 100
+
+            chunk.to_csv(output_path, mode='w' if progress['rows'] == 0 else 'a',
+                         header=progress['rows'] == 0, index=False)
+
+            n_trusted = int((predictions == 1).sum())
+            progress['rows'] += len(chunk)
+            progress['trusted'] += n_trusted
+            progress['untrusted'] += len(chunk) - n_trusted
+            if hasattr(source, 'tell'):
+                progress['bytes_read'] = source.tell()
+            yield dict(progress)
+
+    if progress['cancelled']:
+        yield dict(progress)
@@ -0,0 +1,102 @@
+"""
+Bulk URL Analysis
+Scrapes many URLs concurrently with a global concurrency limit and a per-host limit
+"""
+
+import asyncio
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_PER_HOST_LIMIT = 2
+
+# Worker threads a single scrape can occupy at once (HTTP, TLS and WHOIS stages)
+THREADS_PER_SCRAPE = 3
+
+
+def parse_url_list(text):
+    """
+    Split pasted text or file contents into a de-duplicated list of URLs
+
+    Accepts one URL per line or comma-separated values; blank lines, a
+    leading 'url' header and '#' comments are skipped.
+    """
+    urls = []
+    seen = set()
+    for line in text.splitlines():
+        for value in line.split(','):
+            value = value.strip().strip('"').strip()
+            if not value or value.startswith('#') or value.lower() in ('url', 'urls', 'domain'):
+                continue
+            if value not in seen:
+                seen.add(value)
+                urls.append(value)
+    return urls
+
+
+def _host_key(url):
+    if not url.startswith(('http://', 'https://')):
+        url = 'https://' + url
+    parsed = urlparse(url)
+    host = (parsed.hostname or parsed.path).lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+async def iter_bulk_analysis(urls, max_concurrency=DEFAULT_MAX_CONCURRENCY,
+                             per_host_limit=DEFAULT_PER_HOST_LIMIT, timeout=10, head_only=False):
+    """
+    Scrape URLs concurrently and yield results in completion order
+
+    Args:
+        urls: List of URLs or bare domains
+        max_concurrency: Maximum scrapes in flight overall
+        per_host_limit: Maximum scrapes in flight against the same host
+        timeout: Per-request timeout in seconds
+        head_only: Only download each page's head and first few KB
+
+    Yields:
+        tuple: (url, metadata dict from scrape_website_metadata_async)
+    """
+    # Imported here so reading the defaults above does not load the scraper and its dependencies
+    from utils.webscraper import scrape_website_metadata_async
+
+    global_slots = asyncio.Semaphore(max_concurrency)
+    host_slots = defaultdict(lambda: asyncio.Semaphore(per_host_limit))
+
+    async def analyze(url):
+        # Take the host slot first so URLs queued behind a busy host don't hold global slots
+        async with host_slots[_host_key(url)]:
+            async with global_slots:
+                return url, await scrape_website_metadata_async(url, timeout=timeout, head_only=head_only)
+
+    tasks = [asyncio.ensure_future(analyze(url)) for url in urls]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def run_bulk_analysis(urls, on_result, max_concurrency=DEFAULT_MAX_CONCURRENCY,
+                      per_host_limit=DEFAULT_PER_HOST_LIMIT, timeout=10, head_only=False):
+    """
+    Blocking wrapper around iter_bulk_analysis for Streamlit
+
+    Args:
+        urls: List of URLs or bare domains
+        on_result: Callback(url, metadata) invoked as each scrape completes
+        max_concurrency: Maximum scrapes in flight overall
+        per_host_limit: Maximum scrapes in flight against the same host
+        timeout: Per-request timeout in seconds
+        head_only: Only download each page's head and first few KB
+    """
+    async def run():
+        # The default executor is sized for the CPU count, which would cap concurrency
+        executor = ThreadPoolExecutor(max_workers=max_concurrency * THREADS_PER_SCRAPE)
+        asyncio.get_running_loop().set_default_executor(executor)
+        async for url, metadata in iter_bulk_analysis(urls, max_concurrency, per_host_limit, timeout, head_only):
+            on_result(url, metadata)
+
+    asyncio.run(run())
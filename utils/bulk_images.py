@@ -0,0 +1,190 @@
+"""
+Bulk Image Detection
+Decodes many uploads in a thread pool and feeds the image model fixed-size, prefetched batches
+"""
+
+import io
+import itertools
+import os
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from utils.image_cache import image_digest, perceptual_hash
+from utils.image_preprocess import MODEL_INPUT_SIZE, open_image, preprocess_image
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.webp')
+
+DEFAULT_BATCH_SIZE = int(os.getenv('IMAGE_BATCH_SIZE', 32))
+# Batches decoded ahead of the one the model is working on
+DEFAULT_PREFETCH = 2
+# Limits on ZIP contents, checked against the archive directory before anything is extracted
+MAX_ZIP_MEMBERS = int(os.getenv('IMAGE_ZIP_MAX_MEMBERS', 10000))
+MAX_IMAGE_BYTES = int(os.getenv('IMAGE_MAX_BYTES', 50 * 1024 * 1024))
+
+RESULT_COLUMNS = ['File', 'Prediction', 'AI_Probability', 'Confidence', 'Width', 'Height', 'Format', 'Error']
+
+
+def _image_members(archive):
+    return [info for info in archive.infolist()
+            if not info.is_dir() and not info.filename.startswith('__MACOSX/')
+            and info.filename.lower().endswith(IMAGE_EXTENSIONS)]
+
+
+def count_images(uploads):
+    """Number of results iter_image_files will yield, read from ZIP directories without extracting"""
+    total = 0
+    for name, data in uploads:
+        if not name.lower().endswith('.zip'):
+            total += 1
+            continue
+        try:
+            with zipfile.ZipFile(io.BytesIO(data)) as archive:
+                members = len(_image_members(archive))
+        except zipfile.BadZipFile:
+            members = 1
+        total += members if members <= MAX_ZIP_MEMBERS else 1
+    return total
+
+
+def iter_image_files(uploads):
+    """
+    Expand uploads into individual images
+
+    ZIP archives contribute every member with an image extension (folders
+    and macOS resource forks are skipped). Members over the size limit are
+    reported instead of extracted.
+
+    Args:
+        uploads: Iterable of (file name, bytes)
+
+    Yields:
+        tuple: (name, bytes or None, error message or None)
+    """
+    for name, data in uploads:
+        if not name.lower().endswith('.zip'):
+            yield name, data, None
+            continue
+        try:
+            archive = zipfile.ZipFile(io.BytesIO(data))
+        except zipfile.BadZipFile:
+            yield name, None, "Not a valid ZIP archive"
+            continue
+        with archive:
+            members = _image_members(archive)
+            if len(members) > MAX_ZIP_MEMBERS:
+                yield name, None, f"ZIP has {len(members)} images; the limit is {MAX_ZIP_MEMBERS}"
+                continue
+            for info in members:
+                member_name = f"{name}/{info.filename}"
+                if info.file_size > MAX_IMAGE_BYTES:
+                    yield member_name, None, f"Skipped: larger than {MAX_IMAGE_BYTES // (1024 * 1024)} MB"
+                    continue
+                try:
+                    yield member_name, archive.read(info), None
+                except (zipfile.BadZipFile, OSError, RuntimeError) as e:
+                    # Corrupt or encrypted member
+                    yield member_name, None, f"Could not extract: {e}"
+
+
+def _decode_into(data, error, out, cache=None):
+    """
+    Preprocess one image into its batch slot
+
+    Returns header info, plus 'cached' (the AI probability) when the result
+    cache already knows the image, or an 'error'.
+    """
+    if error:
+        return {'error': error}
+    try:
+        image = open_image(data)
+        info = {'width': image.size[0], 'height': image.size[1], 'format': image.format}
+        if cache is not None:
+            info['digest'] = image_digest(data)
+            info['cached'] = cache.get(digest=info['digest'])
+            if info['cached'] is not None:
+                return info
+        preprocess_image(image, out=out)
+        if cache is not None and cache.perceptual:
+            info['phash'] = perceptual_hash(out)
+            info['cached'] = cache.get(phash=info['phash'])
+        return info
+    except Exception as e:
+        return {'error': f"Could not decode image: {e}"}
+
+
+def iter_image_predictions(images, model, batch_size=DEFAULT_BATCH_SIZE, workers=None,
+                           prefetch=DEFAULT_PREFETCH, cache=None):
+    """
+    Run the image model over many images, yielding results in input order
+
+    Images are decoded and resized by a thread pool (PIL releases the GIL,
+    so this scales with cores) straight into a ring of preallocated batch
+    buffers. While the model works on one batch, the next `prefetch`
+    batches are being decoded. Every batch passed to the model has exactly
+    batch_size rows; unused slots of the last batch are ignored.
+
+    Args:
+        images: Iterable of (name, bytes, error) from iter_image_files
+        model: Object with predict(batch, verbose=0) returning (n, 1) AI probabilities
+        batch_size: Images per model call
+        workers: Decode threads (default: CPU count)
+        prefetch: Batches decoded ahead of the model
+        cache: Optional ImageResultCache; known images skip preprocessing and inference
+
+    Yields:
+        dict: One result row per image (see RESULT_COLUMNS)
+    """
+    width, height = MODEL_INPUT_SIZE
+    buffers = [np.zeros((batch_size, height, width, 3), dtype=np.float32) for _ in range(prefetch + 1)]
+    images = iter(images)
+    pending = deque()
+    submitted = itertools.count()
+
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        def submit_batch():
+            chunk = list(itertools.islice(images, batch_size))
+            if not chunk:
+                return
+            # Buffers are used round-robin, so this one's previous batch has already been predicted
+            buffer = buffers[next(submitted) % len(buffers)]
+            jobs = [(name, pool.submit(_decode_into, data, error, buffer[slot], cache))
+                    for slot, (name, data, error) in enumerate(chunk)]
+            pending.append((buffer, jobs))
+
+        for _ in range(prefetch + 1):
+            submit_batch()
+
+        while pending:
+            buffer, jobs = pending.popleft()
+            decoded = [(name, job.result()) for name, job in jobs]
+            probabilities = None
+            if any('error' not in info and info.get('cached') is None for _, info in decoded):
+                output = np.asarray(model.predict(buffer, verbose=0), dtype=np.float64)
+                probabilities = output.reshape(batch_size, -1)[:, 0]
+            submit_batch()
+
+            for slot, (name, info) in enumerate(decoded):
+                if 'error' in info:
+                    yield _result_row(name, error=info['error'])
+                elif info.get('cached') is not None:
+                    yield _result_row(name, info['cached'], info)
+                else:
+                    ai_probability = float(probabilities[slot])
+                    if cache is not None:
+                        cache.put(ai_probability, digest=info['digest'], phash=info.get('phash'))
+                    yield _result_row(name, ai_probability, info)
+
+
+def _result_row(name, ai_probability=None, info=None, error=''):
+    row = dict.fromkeys(RESULT_COLUMNS)
+    row.update({'File': name, 'Prediction': 'Error', 'Error': error})
+    if ai_probability is not None:
+        # Model output is the probability of AI-generated (0=Real, 1=AI)
+        row['Prediction'] = 'AI-Generated' if ai_probability > 0.5 else 'Authentic'
+        row['AI_Probability'] = ai_probability * 100
+        row['Confidence'] = max(ai_probability, 1 - ai_probability) * 100
+        row['Width'], row['Height'], row['Format'] = info['width'], info['height'], info['format']
+    return row
@@ -0,0 +1,52 @@
+"""
+Model Conversion
+Writes the website model as memory-mappable node arrays shared by every app process on a host
+
+Usage:
+    python -m utils.convert_models [--model models/stacking_model.joblib] [--out models/website_model_arrays]
+"""
+
+import argparse
+import os
+
+import joblib
+
+from utils.tree_engine import COMPILED_MODEL_DIR, CompiledForest, load_compiled_forest
+
+WEBSITE_MODEL_PATH = os.path.join('models', 'stacking_model.joblib')
+
+
+def convert_website_model(model_path=WEBSITE_MODEL_PATH, out_dir=COMPILED_MODEL_DIR):
+    """
+    Compile the joblib forest and save its scoring arrays
+
+    Args:
+        model_path: Fitted sklearn forest saved with joblib
+        out_dir: Directory for the .npy arrays and manifest
+
+    Returns:
+        dict: Node count and bytes written
+    """
+    forest = CompiledForest(joblib.load(model_path))
+    forest.save(out_dir, source_path=model_path)
+
+    # Read back through the memory-mapped loader so a broken conversion fails here, not in the app
+    if load_compiled_forest(out_dir, source_path=model_path) is None:
+        raise RuntimeError(f"Converted model in {out_dir} could not be loaded back")
+
+    size = sum(os.path.getsize(os.path.join(out_dir, name)) for name in os.listdir(out_dir))
+    return {'nodes': int(forest.feature.shape[0]), 'trees': forest.n_estimators, 'bytes': size}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument('--model', default=WEBSITE_MODEL_PATH, help='joblib forest to convert')
+    parser.add_argument('--out', default=COMPILED_MODEL_DIR, help='output directory for the node arrays')
+    args = parser.parse_args()
+
+    stats = convert_website_model(args.model, args.out)
+    print(f"Wrote {stats['trees']} trees / {stats['nodes']} nodes ({stats['bytes'] / 1024:.0f} KB) to {args.out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+Domain Normalization
+Host cleanup and registrable-domain (eTLD+1) extraction shared by the caches and lookups
+"""
+
+import ipaddress
+from urllib.parse import urlparse
+
+# Public suffixes with more than one label that commonly appear in news/credibility data.
+# Used when the optional `tldextract` package (full Public Suffix List) is not installed.
+MULTI_LABEL_SUFFIXES = {
+    'co.uk', 'org.uk', 'ac.uk', 'gov.uk', 'me.uk', 'ltd.uk', 'plc.uk', 'net.uk', 'sch.uk', 'nhs.uk',
+    'com.au', 'net.au', 'org.au', 'edu.au', 'gov.au', 'asn.au', 'id.au',
+    'co.nz', 'org.nz', 'net.nz', 'govt.nz', 'ac.nz',
+    'co.jp', 'ne.jp', 'or.jp', 'ac.jp', 'go.jp',
+    'co.in', 'org.in', 'net.in', 'gov.in', 'ac.in', 'nic.in',
+    'com.br', 'org.br', 'net.br', 'gov.br', 'jus.br',
+    'com.cn', 'org.cn', 'net.cn', 'gov.cn', 'edu.cn',
+    'com.hk', 'org.hk', 'gov.hk', 'edu.hk',
+    'com.tw', 'org.tw', 'gov.tw', 'edu.tw',
+    'co.kr', 'or.kr', 'go.kr', 'ac.kr',
+    'com.sg', 'org.sg', 'gov.sg', 'edu.sg',
+    'com.my', 'org.my', 'gov.my',
+    'co.id', 'or.id', 'go.id', 'ac.id',
+    'com.ph', 'org.ph', 'gov.ph',
+    'com.vn', 'gov.vn',
+    'co.th', 'or.th', 'go.th', 'ac.th',
+    'com.pk', 'org.pk', 'gov.pk',
+    'com.bd', 'gov.bd',
+    'co.za', 'org.za', 'gov.za', 'ac.za',
+    'com.ng', 'org.ng', 'gov.ng',
+    'co.ke', 'or.ke', 'go.ke',
+    'com.eg', 'gov.eg',
+    'co.il', 'org.il', 'gov.il', 'ac.il',
+    'com.tr', 'org.tr', 'gov.tr', 'edu.tr',
+    'com.sa', 'gov.sa',
+    'com.mx', 'org.mx', 'gob.mx',
+    'com.ar', 'org.ar', 'gob.ar',
+    'com.co', 'org.co', 'gov.co',
+    'com.pe', 'gob.pe',
+    'com.ve', 'gob.ve',
+    'com.ua', 'org.ua', 'gov.ua',
+    'com.ru', 'org.ru',
+    'com.pl', 'org.pl', 'gov.pl',
+    'co.at', 'or.at', 'gv.at',
+}
+
+try:
+    import tldextract
+    # Bundled suffix list snapshot only - never fetch the list over the network
+    _tld_extract = tldextract.TLDExtract(suffix_list_urls=())
+except ImportError:
+    _tld_extract = None
+
+
+def normalize_host(value):
+    """
+    Reduce a URL, netloc or bare domain to a lowercase hostname
+
+    Strips the scheme, path, port, trailing dot and a leading 'www.'.
+    """
+    value = (value or '').strip().lower()
+    if not value:
+        return ''
+    if '://' not in value:
+        value = '//' + value
+    host = urlparse(value).hostname or ''
+    host = host.rstrip('.')
+    return host[4:] if host.startswith('www.') else host
+
+
+def _is_ip_address(host):
+    try:
+        ipaddress.ip_address(host)
+        return True
+    except ValueError:
+        return False
+
+
+def registrable_domain(value):
+    """
+    Registrable domain (eTLD+1) for a URL or host, e.g. 'news.bbc.co.uk' -> 'bbc.co.uk'
+
+    Returns None for IP addresses, single-label hosts and empty input.
+    """
+    host = normalize_host(value)
+    if not host or '.' not in host or _is_ip_address(host):
+        return None
+
+    if _tld_extract is not None:
+        extracted = _tld_extract(host)
+        if extracted.domain and extracted.suffix:
+            return f"{extracted.domain}.{extracted.suffix}"
+
+    labels = host.split('.')
+    if len(labels) >= 3 and '.'.join(labels[-2:]) in MULTI_LABEL_SUFFIXES:
+        return '.'.join(labels[-3:])
+    return '.'.join(labels[-2:])
@@ -0,0 +1,181 @@
+"""
+Feature Encoder
+Maps raw website metadata straight into the model's one-hot feature layout
+"""
+
+import numbers
+
+import joblib
+import numpy as np
+import pandas as pd
+
+# Base metadata columns the website model was trained on (before one-hot encoding)
+BASE_COLUMNS = [
+    'has_https', 'ssl_valid', 'ssl_issuer', 'tls_version', 'certificate_type',
+    'domain_age_years', 'domain_age_bucket', 'domain_registrar', 'whois_privacy_enabled',
+    'page_load_time_sec', 'redirect_count', 'server_response_code', 'ads_density_score',
+    'external_links_count', 'popups_present', 'server_location', 'hosting_type', 'cdn_used',
+    'contact_info_available', 'privacy_policy_exists', 'terms_of_service_exists',
+    'social_media_presence', 'content_update_frequency', 'mobile_responsive'
+]
+
+# Values used for scraped metadata when the scraper could not fill a field
+SCRAPED_DEFAULTS = {
+    'has_https': 'No',
+    'ssl_valid': 'No',
+    'ssl_issuer': 'Unknown',
+    'tls_version': 'none',
+    'certificate_type': 'none',
+    'domain_age_years': 0.0,
+    'domain_registrar': 'Unknown',
+    'whois_privacy_enabled': False,
+    'page_load_time_sec': 0.0,
+    'redirect_count': 0,
+    'server_response_code': 404,
+    'ads_density_score': 0.0,
+    'external_links_count': 0,
+    'popups_present': 'No',
+    'server_location': 'Unknown',
+    'hosting_type': 'shared',
+    'cdn_used': 'no',
+    'contact_info_available': False,
+    'privacy_policy_exists': False,
+    'terms_of_service_exists': False,
+    'social_media_presence': 'low',
+    'content_update_frequency': 'irregular',
+    'mobile_responsive': 'No'
+}
+
+DOMAIN_AGE_BINS = [1, 5, 10, 20]
+DOMAIN_AGE_LABELS = ['0-1y', '1-5y', '5-10y', '10-20y', '20y+']
+
+
+def domain_age_bucket(domain_age):
+    """Return the domain age bucket label for an age in years"""
+    for upper, label in zip(DOMAIN_AGE_BINS, DOMAIN_AGE_LABELS):
+        if domain_age < upper:
+            return label
+    return DOMAIN_AGE_LABELS[-1]
+
+
+class FeatureEncoder:
+    """
+    Precompiled replacement for pd.get_dummies + column copy loop
+
+    Builds a (column, value) -> index table once from the model's feature
+    names so records can be written directly into a float32 NumPy row.
+    Encoding follows pd.get_dummies semantics: string values are one-hot
+    encoded, numeric and boolean values are copied into the column of the
+    same name, and anything the model has no column for is dropped.
+    """
+
+    def __init__(self, feature_names):
+        self.feature_names = list(feature_names)
+        self.n_features = len(self.feature_names)
+        self.numeric_index = {}
+        self.onehot_index = {}
+
+        # Longest prefix first so e.g. 'ssl_valid_Yes' never matches a shorter column
+        prefixes = sorted(BASE_COLUMNS, key=len, reverse=True)
+        for idx, name in enumerate(self.feature_names):
+            if name in BASE_COLUMNS:
+                self.numeric_index[name] = idx
+                continue
+            for column in prefixes:
+                if name.startswith(column + '_'):
+                    self.onehot_index.setdefault(column, {})[name[len(column) + 1:]] = idx
+                    break
+
+    def _prepare(self, record, defaults):
+        if defaults:
+            record = {**defaults, **{k: v for k, v in record.items() if v is not None}}
+        if 'domain_age_bucket' not in record and 'domain_age_years' in record:
+            record = dict(record)
+            record['domain_age_bucket'] = domain_age_bucket(record['domain_age_years'])
+        return record
+
+    def encode_into(self, record, out, defaults=None):
+        """
+        Write one metadata record into a preallocated row
+
+        Args:
+            record: Dict of raw metadata values keyed by base column
+            out: 1-D float32 array of length n_features (overwritten)
+            defaults: Optional dict of fallback values for missing keys
+
+        Returns:
+            np.ndarray: The filled row (same object as out)
+        """
+        out.fill(0.0)
+        record = self._prepare(record, defaults)
+
+        for column, value in record.items():
+            if isinstance(value, str):
+                idx = self.onehot_index.get(column, {}).get(value)
+                if idx is not None:
+                    out[idx] = 1.0
+            elif isinstance(value, (numbers.Number, np.bool_)) and column in self.numeric_index:
+                out[self.numeric_index[column]] = value
+        return out
+
+    def encode(self, record, defaults=None):
+        """Encode one metadata record into a (n_features,) float32 row"""
+        return self.encode_into(record, np.empty(self.n_features, dtype=np.float32), defaults)
+
+    def encode_batch(self, data, out=None):
+        """
+        Vectorized multi-row encoding
+
+        Args:
+            data: DataFrame (or list of dicts) of raw metadata, one row per website
+            out: Optional preallocated (n_rows, n_features) float32 matrix
+
+        Returns:
+            np.ndarray: (n_rows, n_features) float32 feature matrix
+        """
+        if not isinstance(data, pd.DataFrame):
+            data = pd.DataFrame(list(data))
+
+        n_rows = len(data)
+        if out is None:
+            out = np.zeros((n_rows, self.n_features), dtype=np.float32)
+        else:
+            out.fill(0.0)
+
+        if 'domain_age_bucket' not in data.columns and 'domain_age_years' in data.columns:
+            ages = pd.to_numeric(data['domain_age_years'], errors='coerce').to_numpy()
+            # Right-closed like the pd.cut batch bucketing this replaces: exactly 5 years is '1-5y'
+            buckets = np.array(DOMAIN_AGE_LABELS, dtype=object)[np.digitize(ages, DOMAIN_AGE_BINS, right=True)]
+            buckets[np.isnan(ages)] = None
+            data = data.assign(domain_age_bucket=buckets)
+
+        rows = np.arange(n_rows)
+        for column in data.columns:
+            series = data[column]
+            if series.dtype == object or isinstance(series.dtype, (pd.CategoricalDtype, pd.StringDtype)):
+                table = self.onehot_index.get(column)
+                if not table:
+                    continue
+                idx = series.astype(object).map(table).to_numpy(dtype=np.float64, na_value=np.nan)
+                hit = ~np.isnan(idx)
+                out[rows[hit], idx[hit].astype(np.intp)] = 1.0
+            elif column in self.numeric_index:
+                out[:, self.numeric_index[column]] = series.to_numpy(dtype=np.float32)
+        return out
+
+
+def load_feature_encoder(path='models/feature_names.joblib', n_features=None):
+    """
+    Build a FeatureEncoder from the saved feature name list
+
+    Args:
+        path: Path to feature_names.joblib
+        n_features: Truncate to the number of features the model expects
+
+    Returns:
+        FeatureEncoder
+    """
+    features = joblib.load(path)
+    if n_features is not None:
+        features = features[:n_features]
+    return FeatureEncoder(features)
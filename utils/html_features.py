@@ -0,0 +1,277 @@
+"""
+HTML Feature Extraction
+Computes every page-content feature in one streaming pass over the HTML
+"""
+
+import html
+import re
+from html.parser import HTMLParser
+
+from bs4.dammit import EntitySubstitution, UnicodeDammit
+
+from utils.keywords import SCRAPER_KEYWORDS
+
+AD_PATTERN = re.compile(r'ad|advertisement|banner|sponsor', re.I)
+AD_IFRAME_PATTERN = re.compile(r'ad|doubleclick|adsense', re.I)
+POPUP_CLASS_PATTERN = re.compile(r'popup|pop-up|popover', re.I)
+POPUP_ID_PATTERN = re.compile(r'popup|pop-up', re.I)
+RESPONSIVE_PATTERN = re.compile(r'responsive|mobile|col-', re.I)
+
+
+# Tree-building rules of BeautifulSoup's html.parser builder, so the text and
+# tag counts below match what soup.get_text() / soup.find_all() would give.
+# Kept here rather than read from bs4, whose builder attributes vary between releases.
+_VOID_TAGS = frozenset({
+    'area', 'base', 'basefont', 'bgsound', 'br', 'col', 'command', 'embed', 'frame', 'hr', 'image', 'img',
+    'input', 'isindex', 'keygen', 'link', 'menuitem', 'meta', 'nextid', 'param', 'source', 'spacer',
+    'track', 'wbr',
+})
+# Text inside these is not part of get_text()
+_STRING_CONTAINER_TAGS = frozenset({'rp', 'rt', 'script', 'style', 'template'})
+_PRESERVE_WHITESPACE_TAGS = frozenset({'pre', 'textarea'})
+_ASCII_SPACES = '\x20\x0a\x09\x0c\x0d'
+_NON_WHITESPACE = re.compile(r'\S+')
+_DECIMAL_REFERENCE = re.compile(r'([0-9]+)(.*)', re.S)
+_HEX_REFERENCE = re.compile(r'([0-9a-f]+)(.*)', re.S | re.I)
+
+
+def _numeric_reference(name):
+    """
+    Character for a numeric reference as html.parser reports it ('38', 'x26')
+
+    A reference without a terminating semicolon can arrive with ordinary
+    text attached ('38abc'); that text is returned separately.
+
+    Returns:
+        tuple: (character or '', trailing text)
+    """
+    hexadecimal = name[:1] in ('x', 'X')
+    match = (_HEX_REFERENCE if hexadecimal else _DECIMAL_REFERENCE).match(name[1:] if hexadecimal else name)
+    if match is None:
+        return '', name[1:] if hexadecimal else name
+    digits, extra = match.groups()
+    # html.unescape maps C1 controls to their Windows-1252 characters and invalid code points to U+FFFD
+    return html.unescape(f"&#{'x' if hexadecimal else ''}{digits};"), extra
+
+
+class _PageScanner(HTMLParser):
+    """
+    Collects the raw signals for the page features from html.parser events
+
+    No tree is built. A stack of open tag names is kept only to know when
+    text sits inside script/style/template (excluded from the visible text)
+    or pre/textarea (whitespace kept as-is).
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.tag_count = 0
+        self.ad_elements = 0
+        self.popups = 0
+        self.responsive_classes = 0
+        self.viewport = None
+        self.modified_meta = False
+        self.hrefs = []
+        self.resources = []
+        self.text = []
+
+        self._open = []
+        self._open_counts = {}
+        self._containers = []
+        self._preserve = []
+        self._pending = []
+        self._already_closed = {}
+
+    # -- text -------------------------------------------------------------
+
+    def _flush(self, cdata=False):
+        if not self._pending:
+            return
+        data = ''.join(self._pending)
+        self._pending = []
+        if not self._preserve and not data.strip(_ASCII_SPACES):
+            data = '\n' if '\n' in data else ' '
+        if cdata or not self._containers:
+            self.text.append(data)
+
+    def handle_data(self, data):
+        self._pending.append(data)
+
+    def handle_charref(self, name):
+        character, extra_data = _numeric_reference(name)
+        self._pending.append(character)
+        self._pending.append(extra_data)
+
+    def handle_entityref(self, name):
+        character = EntitySubstitution.HTML_ENTITY_TO_CHARACTER.get(name)
+        self._pending.append(character if character is not None else '&' + name)
+
+    def handle_comment(self, data):
+        self._flush()
+
+    def handle_decl(self, decl):
+        self._flush()
+
+    def handle_pi(self, data):
+        self._flush()
+
+    def unknown_decl(self, data):
+        self._flush()
+        if data.upper().startswith('CDATA['):
+            self._pending.append(data[len('CDATA['):])
+            self._flush(cdata=True)
+
+    # -- tags -------------------------------------------------------------
+
+    def handle_starttag(self, tag, attrs, self_closing=False):
+        self._flush()
+        attributes = {}
+        for key, value in attrs:
+            attributes[key] = '' if value is None else value
+        self._scan_tag(tag, attributes)
+
+        if self_closing:
+            # <tag/> is opened and closed at once
+            return
+        if tag in _VOID_TAGS:
+            self._already_closed[tag] = self._already_closed.get(tag, 0) + 1
+            return
+        depth = len(self._open)
+        self._open.append(tag)
+        self._open_counts[tag] = self._open_counts.get(tag, 0) + 1
+        if tag in _STRING_CONTAINER_TAGS:
+            self._containers.append(depth)
+        if tag in _PRESERVE_WHITESPACE_TAGS:
+            self._preserve.append(depth)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs, self_closing=True)
+        self._flush()
+
+    def handle_endtag(self, tag):
+        if self._already_closed.get(tag):
+            # </br> after <br>: the element was closed when it opened
+            self._already_closed[tag] -= 1
+            return
+        self._flush()
+        if not self._open_counts.get(tag):
+            return
+        while self._open:
+            name = self._open.pop()
+            self._open_counts[name] -= 1
+            depth = len(self._open)
+            if self._containers and self._containers[-1] == depth:
+                self._containers.pop()
+            if self._preserve and self._preserve[-1] == depth:
+                self._preserve.pop()
+            if name == tag:
+                break
+
+    def _scan_tag(self, tag, attributes):
+        self.tag_count += 1
+        css_class = attributes.get('class')
+        element_id = attributes.get('id')
+
+        if css_class is not None and AD_PATTERN.search(css_class):
+            self.ad_elements += 1
+        if element_id is not None and AD_PATTERN.search(element_id):
+            self.ad_elements += 1
+
+        popup_class = css_class is not None and POPUP_CLASS_PATTERN.search(css_class)
+        popup_id = element_id is not None and POPUP_ID_PATTERN.search(element_id)
+        if popup_class or popup_id:
+            label = (str(_NON_WHITESPACE.findall(css_class or '')) + (element_id or '')).lower()
+            # Cookie/consent modals are legitimate and not counted as popups
+            if not SCRAPER_KEYWORDS.matches(label, 'popup_exempt'):
+                # Matching on both class and id counts twice, as the two separate searches did
+                self.popups += bool(popup_class) + bool(popup_id)
+
+        if css_class is not None and RESPONSIVE_PATTERN.search(css_class):
+            self.responsive_classes += 1
+
+        if tag == 'a':
+            if 'href' in attributes:
+                self.hrefs.append(attributes['href'])
+        elif tag == 'iframe':
+            if 'src' in attributes and AD_IFRAME_PATTERN.search(attributes['src']):
+                self.ad_elements += 1
+        elif tag == 'meta':
+            name = attributes.get('name')
+            if self.viewport is None and name == 'viewport':
+                self.viewport = 'content' in attributes
+            if name == 'last-modified' or attributes.get('property') == 'article:modified_time':
+                self.modified_meta = True
+
+        if (tag in ('script', 'img') and 'src' in attributes) or (tag == 'link' and 'href' in attributes):
+            self.resources.append(attributes.get('src', '') + attributes.get('href', ''))
+
+    def close(self):
+        super().close()
+        self._flush()
+
+
+def _decode(content):
+    if isinstance(content, str):
+        return content
+    markup = UnicodeDammit(content, is_html=True).unicode_markup
+    if markup is None:
+        raise ValueError('Could not convert page content to Unicode')
+    return markup
+
+
+def extract_html_features(content, netloc):
+    """
+    Page-content features from raw HTML in a single pass
+
+    Gives the same values as building a BeautifulSoup tree with html.parser
+    and querying it per feature, without building the tree.
+
+    Args:
+        content: Page body (bytes, decoded like BeautifulSoup does, or str)
+        netloc: Host of the analysed URL, for telling external links apart
+
+    Returns:
+        dict: external_links_count, ads_density_score, popups_present,
+        mobile_responsive, contact_info_available, privacy_policy_exists,
+        terms_of_service_exists, social_media_presence, plus the flags
+        cdn_in_resources and modified_meta for the header-based checks
+    """
+    scanner = _PageScanner()
+    scanner.feed(_decode(content))
+    scanner.close()
+
+    text = ''.join(scanner.text).lower()
+    hrefs = [href.lower() for href in scanner.hrefs]
+    text_hits = SCRAPER_KEYWORDS.find(text, ('contact', 'privacy', 'terms'))
+    link_hits = SCRAPER_KEYWORDS.find_in_any(hrefs, ('contact_link', 'privacy_link', 'terms_link'))
+    features = {}
+
+    features['external_links_count'] = sum(
+        1 for href in scanner.hrefs if href.startswith('http') and netloc not in href
+    )
+    features['ads_density_score'] = round(min(scanner.ad_elements / max(scanner.tag_count, 1), 1.0), 2)
+    features['popups_present'] = 'Yes' if scanner.popups > 3 else 'No'
+
+    if scanner.viewport:
+        features['mobile_responsive'] = 'Yes'
+    else:
+        features['mobile_responsive'] = 'Partial' if scanner.responsive_classes > 5 else 'No'
+
+    features['contact_info_available'] = 'contact' in text_hits or 'contact_link' in link_hits
+    features['privacy_policy_exists'] = 'privacy' in text_hits or 'privacy_link' in link_hits
+    features['terms_of_service_exists'] = 'terms' in text_hits or 'terms_link' in link_hits
+
+    # Model only knows: low, medium, none (NOT high!)
+    social_links = SCRAPER_KEYWORDS.count_items(hrefs, 'social')
+    if social_links >= 2:
+        features['social_media_presence'] = 'medium'
+    elif social_links >= 1:
+        features['social_media_presence'] = 'low'
+    else:
+        features['social_media_presence'] = 'none'
+
+    features['cdn_in_resources'] = SCRAPER_KEYWORDS.matches(
+        '\n'.join(scanner.resources).lower(), 'cdn'
+    )
+    features['modified_meta'] = scanner.modified_meta
+    return features
@@ -0,0 +1,125 @@
+"""
+Shared HTTP Session
+Process-wide connection pooling for the scraper and WHOIS API lookups
+"""
+
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPSConnection
+from urllib3.connectionpool import HTTPSConnectionPool
+
+# Pool sizing - number of hosts with cached pools, and keep-alive connections kept per host
+POOL_CONNECTIONS = int(os.getenv('SCRAPER_POOL_CONNECTIONS', '64'))
+POOL_MAXSIZE = int(os.getenv('SCRAPER_POOL_MAXSIZE', '8'))
+
+# Seconds to establish a connection; the read timeout is passed per request
+CONNECT_TIMEOUT = float(os.getenv('SCRAPER_CONNECT_TIMEOUT', '5'))
+MAX_REDIRECTS = int(os.getenv('SCRAPER_MAX_REDIRECTS', '10'))
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+
+def _accept_encoding():
+    """Advertise brotli only when urllib3 can decode it"""
+    try:
+        import brotli  # noqa: F401
+        return 'gzip, deflate, br'
+    except ImportError:
+        try:
+            import brotlicffi  # noqa: F401
+            return 'gzip, deflate, br'
+        except ImportError:
+            return 'gzip, deflate'
+
+
+class _CertRecordingHTTPSConnection(HTTPSConnection):
+    """HTTPS connection that keeps the peer certificate and TLS version after the handshake"""
+
+    peer_certificate = None
+    tls_version = None
+
+    def connect(self):
+        super().connect()
+        try:
+            self.peer_certificate = self.sock.getpeercert()
+            self.tls_version = self.sock.version()
+        except (AttributeError, ValueError, OSError):
+            pass
+
+
+class _CertRecordingHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _CertRecordingHTTPSConnection
+
+
+class PeerCertificateAdapter(HTTPAdapter):
+    """
+    Transport adapter that records the TLS details of the connection serving each response
+
+    The certificate and negotiated version are captured from the socket that
+    carries the request, so no second handshake is needed. Responses get
+    `peer_certificate` and `tls_version` attributes (None for plain HTTP or
+    when nothing could be captured, e.g. behind a proxy).
+    """
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            **self.poolmanager.pool_classes_by_scheme,
+            'https': _CertRecordingHTTPSConnectionPool,
+        }
+
+    def build_response(self, req, resp):
+        response = super().build_response(req, resp)
+        connection = getattr(resp, 'connection', None)
+        response.peer_certificate = getattr(connection, 'peer_certificate', None)
+        response.tls_version = getattr(connection, 'tls_version', None)
+        return response
+
+
+_adapter = None
+_adapter_lock = threading.Lock()
+_local = threading.local()
+
+
+def get_adapter():
+    """The process-wide adapter; its connection pools are shared by every thread"""
+    global _adapter
+    if _adapter is None:
+        with _adapter_lock:
+            if _adapter is None:
+                _adapter = PeerCertificateAdapter(pool_connections=POOL_CONNECTIONS,
+                                                  pool_maxsize=POOL_MAXSIZE)
+    return _adapter
+
+
+def get_session():
+    """
+    Session for the current thread backed by the shared connection pools
+
+    requests.Session keeps cookies and other per-request state that is not
+    safe to share between threads, so each thread gets its own session while
+    all of them mount the same pooled adapter. Connections to hosts seen
+    before (including the WHOIS API) are reused via keep-alive.
+    """
+    session = getattr(_local, 'session', None)
+    if session is None:
+        session = requests.Session()
+        session.headers.update({
+            'User-Agent': USER_AGENT,
+            'Accept-Encoding': _accept_encoding(),
+            'Connection': 'keep-alive',
+        })
+        session.max_redirects = MAX_REDIRECTS
+        adapter = get_adapter()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        _local.session = session
+    return session
+
+
+def get_timeout(read_timeout):
+    """(connect, read) timeout tuple; connecting never waits longer than reading"""
+    return min(CONNECT_TIMEOUT, read_timeout), read_timeout
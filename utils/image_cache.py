@@ -0,0 +1,133 @@
+"""
+Image Result Cache
+Persistent AI-image verdicts keyed by content hash (and optionally a perceptual hash) per model version
+"""
+
+import hashlib
+import os
+import threading
+
+import numpy as np
+from PIL import Image
+
+from utils.sqlite_cache import SQLiteCache, cache_path
+from utils.tree_engine import file_sha256
+
+IMAGE_CACHE_MAX_ENTRIES = int(os.getenv('IMAGE_CACHE_MAX_ENTRIES', 50000))
+IMAGE_CACHE_TTL = int(os.getenv('IMAGE_CACHE_TTL', 30 * 86400))
+# Also match re-encoded copies of an image by a 64-bit difference hash of its pixels
+IMAGE_CACHE_PERCEPTUAL = os.getenv('IMAGE_CACHE_PERCEPTUAL', 'false').lower() in ('1', 'true', 'yes')
+
+_versions = {}
+_versions_lock = threading.Lock()
+
+
+def model_version(path):
+    """Short content hash of a model file, recomputed only when the file changes"""
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    with _versions_lock:
+        if key not in _versions:
+            _versions[key] = file_sha256(path)[:16]
+        return _versions[key]
+
+
+def image_digest(data):
+    """SHA-256 of the uploaded bytes"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def perceptual_hash(pixels):
+    """
+    64-bit difference hash (dHash) of a decoded image
+
+    Args:
+        pixels: (height, width, 3) array scaled to [0, 1], e.g. one preprocessed model input
+
+    Returns:
+        str: 16 hex digits; resized or re-compressed copies usually hash the same
+    """
+    gray = np.asarray(pixels, dtype=np.float32).mean(axis=2)
+    small = Image.fromarray(np.round(gray * 255).astype(np.uint8)).resize((9, 8), Image.Resampling.BILINEAR)
+    cells = np.asarray(small, dtype=np.int16)
+    bits = (cells[:, 1:] > cells[:, :-1]).ravel()
+    return f"{int(''.join('1' if bit else '0' for bit in bits), 2):016x}"
+
+
+class ImageResultCache:
+    """
+    AI probabilities of previously analyzed images
+
+    Entries are keyed by model version plus either the SHA-256 of the file
+    or its perceptual hash, so a new model never serves old verdicts. The
+    store is a SQLiteCache file shared by every session and replica on the
+    host, evicting least recently used entries beyond max_entries.
+
+    hits counts results served from the cache and misses counts results
+    computed and stored, so the hit rate is the share of inference skipped.
+    """
+
+    def __init__(self, version, path=None, max_entries=IMAGE_CACHE_MAX_ENTRIES, ttl=IMAGE_CACHE_TTL,
+                 perceptual=IMAGE_CACHE_PERCEPTUAL):
+        """
+        Args:
+            version: Model version the cached probabilities came from
+            path: SQLite file (default: image_results.sqlite3 in the cache directory)
+            max_entries: Entries kept before LRU eviction
+            ttl: Seconds an entry stays valid
+            perceptual: Also look up and store perceptual hashes
+        """
+        self.version = version
+        self.perceptual = perceptual
+        self.hits = 0
+        self.misses = 0
+        self._store = SQLiteCache(path or cache_path('image_results.sqlite3'), default_ttl=ttl,
+                                  max_entries=max_entries)
+        self._lock = threading.Lock()
+
+    def _key(self, kind, value):
+        return f"{self.version}:{kind}:{value}"
+
+    def get(self, digest=None, phash=None):
+        """
+        Cached AI probability for an image
+
+        Args:
+            digest: image_digest of the file
+            phash: perceptual_hash of its pixels (ignored unless perceptual matching is on)
+
+        Returns:
+            float or None
+        """
+        entry = None
+        if digest:
+            entry = self._store.get(self._key('sha256', digest))
+        if entry is None and phash and self.perceptual:
+            entry = self._store.get(self._key('phash', phash))
+        if entry is None:
+            return None
+        with self._lock:
+            self.hits += 1
+        return entry['ai_probability']
+
+    def put(self, ai_probability, digest=None, phash=None):
+        """Store a model result under the file hash and, if enabled, the perceptual hash"""
+        # Every stored result is an image the cache could not answer, however many keys were tried
+        with self._lock:
+            self.misses += 1
+        entry = {'ai_probability': float(ai_probability), 'model_version': self.version}
+        if digest:
+            self._store.set(self._key('sha256', digest), entry)
+        if phash and self.perceptual:
+            self._store.set(self._key('phash', phash), entry)
+
+    def __len__(self):
+        return len(self._store)
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats_text(self):
+        return f"hit rate {self.hit_rate:.0%} over {self.hits + self.misses} lookups"
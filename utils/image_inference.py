@@ -0,0 +1,191 @@
+"""
+Image Inference
+Low-latency predict() for the image model: compiled call path, warmup at load, thread tuning and latency percentiles
+
+Usage:
+    python -m utils.image_inference [--runs 200] [--model models/resnet50_best_fixed.keras]
+"""
+
+import argparse
+import os
+import threading
+import time
+import weakref
+from collections import deque
+
+import numpy as np
+
+from utils.image_model_runtime import IMAGE_MODEL_PATH, image_model_path, load_image_model_file
+from utils.image_preprocess import MODEL_INPUT_SIZE
+
+# 0 keeps the framework default (one thread per core for intra-op work)
+IMAGE_INTRA_OP_THREADS = int(os.getenv('IMAGE_INTRA_OP_THREADS', 0))
+IMAGE_INTER_OP_THREADS = int(os.getenv('IMAGE_INTER_OP_THREADS', 0))
+# Batch sizes run once at load so the first real request does not pay for tracing and allocation
+IMAGE_WARMUP_BATCH_SIZES = [int(size) for size in os.getenv('IMAGE_WARMUP_BATCH_SIZES', '1').split(',') if size.strip()]
+# Single-image latencies kept for the percentiles
+LATENCY_WINDOW = 1000
+
+_models = weakref.WeakSet()
+
+
+def configure_threads(intra_op=IMAGE_INTRA_OP_THREADS, inter_op=IMAGE_INTER_OP_THREADS):
+    """
+    Set TensorFlow's thread pools before the first model is loaded
+
+    Returns:
+        bool: False if TensorFlow is not installed or its runtime was
+        already initialized (the settings are then fixed for the process)
+    """
+    if not intra_op and not inter_op:
+        return True
+    try:
+        import tensorflow as tf
+        if intra_op:
+            tf.config.threading.set_intra_op_parallelism_threads(intra_op)
+        if inter_op:
+            tf.config.threading.set_inter_op_parallelism_threads(inter_op)
+        return True
+    except (ImportError, RuntimeError):
+        return False
+
+
+def _compiled_call(model):
+    """
+    Forward pass without predict()'s per-call data adapter and step function
+
+    With the TensorFlow backend the call is a tf.function traced once for
+    any batch size; other backends call the model eagerly.
+    """
+    try:
+        import keras
+        if keras.config.backend() == 'tensorflow':
+            import tensorflow as tf
+            signature = [tf.TensorSpec((None, *model.input_shape[1:]), tf.float32)]
+            return tf.function(lambda x: model(x, training=False), input_signature=signature,
+                               reduce_retracing=True)
+    except ImportError:
+        pass
+    return lambda x: model(x, training=False)
+
+
+class LatencyStats:
+    """Cold-start and rolling warm latencies of single-image calls"""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self.cold_ms = None
+        self.warmup_ms = []
+        self.count = 0
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        with self._lock:
+            self.count += 1
+            self._samples.append(seconds * 1000)
+
+    def percentile(self, q):
+        with self._lock:
+            samples = list(self._samples)
+        return float(np.percentile(samples, q)) if samples else None
+
+    def summary(self):
+        return {'cold_ms': self.cold_ms, 'warmup_ms': self.warmup_ms, 'calls': self.count,
+                'p50_ms': self.percentile(50), 'p99_ms': self.percentile(99)}
+
+    def text(self):
+        if not self.count:
+            return "no calls yet"
+        return f"p50 {self.percentile(50):.0f} ms, p99 {self.percentile(99):.0f} ms over {min(self.count, self._samples.maxlen)} calls"
+
+
+class ImageInferenceModel:
+    """
+    Image model wrapper with the Keras predict() call used by the app
+
+    Keras models go through a compiled forward pass instead of predict();
+    models that are not callable (the TFLite runtime) keep their own
+    predict(). The configured warmup batches run at construction, the
+    first of them timed as the cold-start latency.
+    """
+
+    def __init__(self, model, warmup_batch_sizes=IMAGE_WARMUP_BATCH_SIZES):
+        """
+        Args:
+            model: Keras model, or any object with predict(x, verbose=0) and input_shape
+            warmup_batch_sizes: Batch sizes of zero images run once before returning
+        """
+        self.model = model
+        self.input_shape = tuple(model.input_shape)
+        self.latency = LatencyStats()
+        self._call = _compiled_call(model) if callable(model) else (lambda x: model.predict(x, verbose=0))
+        self.warmup(warmup_batch_sizes)
+        _models.add(self)
+
+    def _forward(self, x):
+        return np.asarray(self._call(x))
+
+    def warmup(self, batch_sizes):
+        for batch_size in batch_sizes:
+            started = time.perf_counter()
+            self._forward(np.zeros((batch_size, *self.input_shape[1:]), dtype=np.float32))
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            if self.latency.cold_ms is None:
+                self.latency.cold_ms = elapsed_ms
+            else:
+                self.latency.warmup_ms.append(elapsed_ms)
+
+    def predict(self, x, verbose=0):
+        x = np.ascontiguousarray(x, dtype=np.float32)
+        started = time.perf_counter()
+        output = self._forward(x)
+        if len(x) == 1:
+            self.latency.record(time.perf_counter() - started)
+        return output
+
+
+def load_fast_image_model(path=None, warmup_batch_sizes=IMAGE_WARMUP_BATCH_SIZES):
+    """
+    Load the configured image model (see image_model_path) tuned and warmed up for serving
+
+    Thread counts are applied before loading: to TensorFlow's pools for the
+    Keras model and to the interpreter for a TFLite export.
+    """
+    path = path or image_model_path(IMAGE_MODEL_PATH)
+    configure_threads()
+    model = load_image_model_file(path, num_threads=IMAGE_INTRA_OP_THREADS or None)
+    return ImageInferenceModel(model, warmup_batch_sizes)
+
+
+def latency_report():
+    """Latency summary of every image model loaded in this process"""
+    return [dict(model.latency.summary(), model=type(model.model).__name__) for model in list(_models)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument('--model', help='model file (default: the configured runtime\'s model)')
+    parser.add_argument('--runs', type=int, default=200, help='single-image calls to time after warmup')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    model = load_fast_image_model(args.model)
+    print(f"Loaded and warmed up in {time.perf_counter() - started:.2f} s; cold call {model.latency.cold_ms:.1f} ms")
+
+    width, height = MODEL_INPUT_SIZE
+    image = np.random.default_rng(0).random((1, height, width, 3), dtype=np.float32)
+    for _ in range(args.runs):
+        model.predict(image)
+    print(f"Warm: {model.latency.text()}")
+
+    if callable(model.model):
+        baseline = LatencyStats()
+        for _ in range(min(args.runs, 50)):
+            call_started = time.perf_counter()
+            model.model.predict(image, verbose=0)
+            baseline.record(time.perf_counter() - call_started)
+        print(f"Keras predict() for comparison: {baseline.text()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,253 @@
+"""
+Image Model Runtime
+Quantized TFLite export of the ResNet50 detector, a predict()-compatible loader and an accuracy-parity report
+
+Usage:
+    python -m utils.image_model_runtime [--mode int8|float16] [--holdout data/holdout_images] [--skip-parity]
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from utils.image_preprocess import preprocess_image
+
+IMAGE_MODEL_PATH = os.path.join('models', 'resnet50_best_fixed.keras')
+
+# 'keras' runs the original float32 model; 'tflite' the quantized export if it exists
+IMAGE_MODEL_RUNTIME = os.getenv('IMAGE_MODEL_RUNTIME', 'keras')
+# int8: weights stored as int8, dequantized on the fly (dynamic range); float16: weights halved in size
+IMAGE_MODEL_QUANTIZATION = os.getenv('IMAGE_MODEL_QUANTIZATION', 'int8')
+QUANTIZATION_MODES = ('int8', 'float16')
+
+HOLDOUT_DIR = os.path.join('data', 'holdout_images')
+# Exported models predicting a different class than the original on more images than this are rejected
+MIN_AGREEMENT = 0.99
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.webp')
+
+
+def quantized_model_path(keras_path=IMAGE_MODEL_PATH, mode=IMAGE_MODEL_QUANTIZATION):
+    """models/resnet50_best_fixed.keras -> models/resnet50_best_fixed.int8.tflite"""
+    return f"{os.path.splitext(keras_path)[0]}.{mode}.tflite"
+
+
+def image_model_path(keras_path=IMAGE_MODEL_PATH, runtime=None, mode=None):
+    """
+    Model file the app should load
+
+    The quantized export is used when IMAGE_MODEL_RUNTIME=tflite and the
+    file exists; otherwise the original Keras model.
+    """
+    runtime = runtime or IMAGE_MODEL_RUNTIME
+    if runtime == 'tflite':
+        path = quantized_model_path(keras_path, mode or IMAGE_MODEL_QUANTIZATION)
+        if os.path.exists(path):
+            return path
+    return keras_path
+
+
+def _tflite_interpreter_class():
+    try:
+        # Standalone runtime: a few MB instead of all of TensorFlow
+        from tflite_runtime.interpreter import Interpreter
+    except ImportError:
+        import tensorflow as tf
+        Interpreter = tf.lite.Interpreter
+    return Interpreter
+
+
+class TFLiteImageModel:
+    """
+    TFLite model with the Keras predict() call used by the app
+
+    The interpreter is resized to each batch size it sees (kept until the
+    size changes) and is not thread-safe, so calls are serialized.
+    """
+
+    def __init__(self, path, num_threads=None):
+        """
+        Args:
+            path: .tflite file
+            num_threads: Interpreter threads (default: CPU count)
+        """
+        Interpreter = _tflite_interpreter_class()
+        self.path = path
+        self._interpreter = Interpreter(model_path=path, num_threads=num_threads or os.cpu_count() or 1)
+        self._interpreter.allocate_tensors()
+        self._input = self._interpreter.get_input_details()[0]
+        self._output = self._interpreter.get_output_details()[0]
+        self._batch_shape = tuple(self._input['shape'])
+        self.input_shape = (None, *self._batch_shape[1:])
+        self._lock = threading.Lock()
+
+    def predict(self, x, verbose=0):
+        x = np.ascontiguousarray(x, dtype=self._input['dtype'])
+        with self._lock:
+            if x.shape != self._batch_shape:
+                self._interpreter.resize_tensor_input(self._input['index'], x.shape)
+                self._interpreter.allocate_tensors()
+                self._batch_shape = x.shape
+            self._interpreter.set_tensor(self._input['index'], x)
+            self._interpreter.invoke()
+            return self._interpreter.get_tensor(self._output['index']).copy()
+
+
+def load_image_model_file(path, num_threads=None):
+    """Load a .tflite export as TFLiteImageModel, anything else with Keras"""
+    if path.endswith('.tflite'):
+        return TFLiteImageModel(path, num_threads=num_threads)
+    import keras  # Keras 3.x is standalone, not from tensorflow
+    return keras.models.load_model(path)
+
+
+def export_quantized(keras_path=IMAGE_MODEL_PATH, mode=IMAGE_MODEL_QUANTIZATION, out_path=None):
+    """
+    Convert the Keras model to a weight-quantized TFLite file
+
+    The model is exported as a SavedModel first and converted from that;
+    the converter's from_keras_model() path does not handle Keras 3 models.
+    Inputs and outputs stay float32, so the exported model takes the same
+    preprocessed batches as the original.
+
+    Returns:
+        str: Path of the written .tflite file
+    """
+    if mode not in QUANTIZATION_MODES:
+        raise ValueError(f"Unknown quantization mode {mode!r}; expected one of {QUANTIZATION_MODES}")
+    import keras
+    import tensorflow as tf
+
+    with tempfile.TemporaryDirectory() as saved_model_dir:
+        keras.models.load_model(keras_path).export(saved_model_dir)
+        converter = tf.lite.TFLiteConverter.from_saved_model(saved_model_dir)
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        if mode == 'float16':
+            converter.target_spec.supported_types = [tf.float16]
+        flatbuffer = converter.convert()
+    out_path = out_path or quantized_model_path(keras_path, mode)
+    with open(out_path, 'wb') as f:
+        f.write(flatbuffer)
+    return out_path
+
+
+def load_holdout_images(directory=HOLDOUT_DIR):
+    """
+    Images of the held-out parity set
+
+    Files inside an 'ai' or 'real' folder are labelled 1 / 0 for the
+    accuracy columns; other files are compared between models only.
+
+    Returns:
+        list: (relative path, label or None, bytes)
+    """
+    images = []
+    for root, _, files in os.walk(directory):
+        folder = os.path.basename(root).lower()
+        label = {'ai': 1, 'real': 0}.get(folder)
+        for name in sorted(files):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                with open(os.path.join(root, name), 'rb') as f:
+                    images.append((os.path.relpath(os.path.join(root, name), directory), label, f.read()))
+    return sorted(images, key=lambda image: image[0])
+
+
+def _predict_all(model, batches):
+    outputs = []
+    started = time.perf_counter()
+    for batch in batches:
+        outputs.append(np.asarray(model.predict(batch, verbose=0), dtype=np.float64).reshape(len(batch), -1)[:, 0])
+    elapsed = time.perf_counter() - started
+    return np.concatenate(outputs), elapsed
+
+
+def parity_report(reference, candidate, images, batch_size=16):
+    """
+    Compare a converted model against the original on the same images
+
+    Args:
+        reference: Original model (predict(batch, verbose=0) -> AI probabilities)
+        candidate: Converted model with the same call
+        images: (name, label or None, bytes) from load_holdout_images
+        batch_size: Images per predict call
+
+    Returns:
+        dict: Probability differences, class agreement, accuracy of each
+        model on the labelled images and mean latency per image
+    """
+    if not images:
+        raise ValueError("No images to compare")
+    pixels = np.stack([preprocess_image(data)[0].copy() for _, _, data in images])
+    batches = [pixels[start:start + batch_size] for start in range(0, len(pixels), batch_size)]
+
+    reference_proba, reference_seconds = _predict_all(reference, batches)
+    candidate_proba, candidate_seconds = _predict_all(candidate, batches)
+    reference_class = reference_proba > 0.5
+    candidate_class = candidate_proba > 0.5
+    difference = np.abs(reference_proba - candidate_proba)
+
+    report = {
+        'images': len(images),
+        'max_abs_diff': float(difference.max()),
+        'mean_abs_diff': float(difference.mean()),
+        'class_agreement': float((reference_class == candidate_class).mean()),
+        'disagreements': [name for (name, _, _), same in zip(images, reference_class == candidate_class)
+                          if not same],
+        'reference_ms_per_image': reference_seconds / len(images) * 1000,
+        'candidate_ms_per_image': candidate_seconds / len(images) * 1000,
+    }
+    labels = np.array([label if label is not None else -1 for _, label, _ in images])
+    labelled = labels >= 0
+    if labelled.any():
+        report['labelled_images'] = int(labelled.sum())
+        report['reference_accuracy'] = float((reference_class[labelled] == labels[labelled]).mean())
+        report['candidate_accuracy'] = float((candidate_class[labelled] == labels[labelled]).mean())
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument('--model', default=IMAGE_MODEL_PATH, help='Keras model to export')
+    parser.add_argument('--mode', default=IMAGE_MODEL_QUANTIZATION, choices=QUANTIZATION_MODES)
+    parser.add_argument('--holdout', default=HOLDOUT_DIR, help="held-out images (optionally in ai/ and real/ folders)")
+    parser.add_argument('--min-agreement', type=float, default=MIN_AGREEMENT,
+                        help='reject the export if fewer predictions match the original')
+    parser.add_argument('--skip-parity', action='store_true',
+                        help='keep the export without a parity check (no held-out images)')
+    args = parser.parse_args()
+
+    images = load_holdout_images(args.holdout) if os.path.isdir(args.holdout) else []
+    if not images and not args.skip_parity:
+        raise SystemExit(f"No held-out images in {args.holdout}; the export needs a parity check "
+                         f"(pass --skip-parity to keep an unchecked export)")
+
+    # Written under a temporary name, so image_model_path() never picks up an unchecked export
+    out_path = quantized_model_path(args.model, args.mode)
+    candidate_path = export_quantized(args.model, args.mode, out_path=out_path + '.partial')
+    print(f"Exported {args.mode} model ({os.path.getsize(candidate_path) / 1e6:.1f} MB, "
+          f"original {os.path.getsize(args.model) / 1e6:.1f} MB)")
+
+    if images:
+        report = parity_report(load_image_model_file(args.model), TFLiteImageModel(candidate_path), images)
+        report_path = f"{os.path.splitext(out_path)[0]}.parity.json"
+        with open(report_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(json.dumps({k: v for k, v in report.items() if k != 'disagreements'}, indent=2))
+        if report['class_agreement'] < args.min_agreement:
+            os.remove(candidate_path)
+            raise SystemExit(f"Class agreement {report['class_agreement']:.2%} is below {args.min_agreement:.2%}; "
+                             f"export discarded (see {report_path})")
+        print(f"Parity report: {report_path}")
+    else:
+        print("Parity was not checked (--skip-parity)")
+
+    os.replace(candidate_path, out_path)
+    print(f"Wrote {out_path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+Image Preprocessing
+Decodes an upload once, close to the model's input size, straight into a float32 batch buffer
+"""
+
+import io
+import threading
+
+import numpy as np
+from PIL import Image
+
+MODEL_INPUT_SIZE = (224, 224)
+
+# JPEGs are decoded with libjpeg's DCT scaling to at least this multiple of the
+# input size, which keeps the final resize close to a full-resolution one
+DRAFT_OVERSAMPLE = 2
+# Other formats are shrunk by an integer factor with Image.reduce before the
+# final resample once they are this many times larger than the target
+REDUCING_GAP = 3.0
+
+_buffers = threading.local()
+
+
+def open_image(data):
+    """
+    Open image bytes without decoding the pixels
+
+    Size, format and mode are read from the header; pixels are only decoded
+    when the image is preprocessed (or displayed by PIL).
+    """
+    return Image.open(io.BytesIO(data))
+
+
+def batch_buffer(batch_size=1, size=MODEL_INPUT_SIZE):
+    """
+    Reusable float32 (batch_size, height, width, 3) buffer for the calling thread
+
+    The same array is returned on every call from a thread, so its contents
+    are only valid until the next preprocessing call on that thread.
+    """
+    shape = (batch_size, size[1], size[0], 3)
+    buffer = getattr(_buffers, 'array', None)
+    if buffer is None or buffer.shape != shape:
+        buffer = np.empty(shape, dtype=np.float32)
+        _buffers.array = buffer
+    return buffer
+
+
+def decode_resized(image, size=MODEL_INPUT_SIZE):
+    """
+    Decode an opened image as RGB at the model input size
+
+    Args:
+        image: PIL image from open_image (not yet decoded)
+        size: (width, height) to resize to
+
+    Returns:
+        PIL.Image in RGB mode
+    """
+    if image.format == 'JPEG':
+        # Must run before the first pixel access; decodes at 1/2, 1/4 or 1/8 scale
+        image.draft('RGB', (size[0] * DRAFT_OVERSAMPLE, size[1] * DRAFT_OVERSAMPLE))
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    return image.resize(size, Image.Resampling.BICUBIC, reducing_gap=REDUCING_GAP)
+
+
+def preprocess_image(image, out=None, size=MODEL_INPUT_SIZE):
+    """
+    Model input for one image, scaled to [0, 1]
+
+    Args:
+        image: PIL image from open_image, or raw image bytes
+        out: float32 array of shape (height, width, 3) to write into
+            (default: the thread's reusable batch buffer)
+        size: (width, height) of the model input
+
+    Returns:
+        np.ndarray: float32 array of shape (1, height, width, 3), or `out`
+        with a leading batch axis when one was given
+    """
+    if isinstance(image, (bytes, bytearray, memoryview)):
+        image = open_image(bytes(image))
+    pixels = np.asarray(decode_resized(image, size), dtype=np.uint8)
+    if out is None:
+        batch = batch_buffer(1, size)
+        out = batch[0]
+    else:
+        batch = out[np.newaxis]
+    np.divide(pixels, np.float32(255.0), out=out, dtype=np.float32)
+    return batch
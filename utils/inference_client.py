@@ -0,0 +1,223 @@
+"""
+Inference Client
+Calls the local model server (utils/inference_server.py) and falls back to in-process models
+"""
+
+import http.client
+import io
+import json
+import os
+import socket
+import threading
+import time
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from utils.tree_engine import predict_with_proba
+
+# http://127.0.0.1:8600 or unix:///path/to/socket; empty runs every model in-process
+INFERENCE_SERVER_URL = os.getenv('INFERENCE_SERVER_URL', '')
+INFERENCE_TIMEOUT = float(os.getenv('INFERENCE_TIMEOUT', 30))
+# Seconds before a server that did not answer is tried again
+INFERENCE_RETRY_SECONDS = float(os.getenv('INFERENCE_RETRY_SECONDS', 60))
+
+
+class InferenceServerError(Exception):
+    """The server answered, but with an error status"""
+
+    def __init__(self, status, message):
+        super().__init__(f"{status}: {message}")
+        self.status = status
+
+
+def encode_array(array):
+    """Serialize an array as .npy bytes (no pickles)"""
+    buffer = io.BytesIO()
+    np.save(buffer, np.ascontiguousarray(array), allow_pickle=False)
+    return buffer.getvalue()
+
+
+def decode_array(data):
+    return np.load(io.BytesIO(data), allow_pickle=False)
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTPConnection over a Unix domain socket"""
+
+    def __init__(self, path, timeout):
+        super().__init__('localhost', timeout=timeout)
+        self.socket_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+class InferenceClient:
+    """
+    Minimal client for the inference server
+
+    A connection is opened per request (local and cheap), so one client can
+    be shared by every Streamlit session thread.
+    """
+
+    def __init__(self, url=INFERENCE_SERVER_URL, timeout=INFERENCE_TIMEOUT):
+        """
+        Args:
+            url: http://host:port or unix:///socket/path
+            timeout: Seconds to wait for a prediction (includes the batching delay)
+        """
+        self.url = url
+        self.timeout = timeout
+        parts = urlsplit(url)
+        if parts.scheme == 'unix':
+            self._socket_path = parts.path
+        elif parts.scheme == 'http':
+            self._socket_path = None
+            self._host, self._port = parts.hostname, parts.port or 80
+        else:
+            raise ValueError(f"Unsupported inference server URL: {url}")
+
+    def _connection(self, timeout):
+        if self._socket_path:
+            return _UnixHTTPConnection(self._socket_path, timeout)
+        return http.client.HTTPConnection(self._host, self._port, timeout=timeout)
+
+    def _request(self, method, path, body=None, timeout=None):
+        connection = self._connection(timeout or self.timeout)
+        try:
+            headers = {'Content-Type': 'application/octet-stream'} if body is not None else {}
+            connection.request(method, path, body=body, headers=headers)
+            response = connection.getresponse()
+            data = response.read()
+        finally:
+            connection.close()
+        if response.status != 200:
+            raise InferenceServerError(response.status, data.decode('utf-8', errors='replace')[:200])
+        return data
+
+    def health(self, timeout=2):
+        """
+        Models the server has loaded and its batching statistics
+
+        Returns:
+            dict: {'models': {name: info}, 'stats': {name: {...}}}
+        """
+        return json.loads(self._request('GET', '/health', timeout=timeout))
+
+    def predict(self, model, X):
+        """
+        Raw model output for a batch of inputs
+
+        Raises:
+            OSError: Server unreachable
+            InferenceServerError: Server rejected the request
+        """
+        return decode_array(self._request('POST', f'/predict/{model}', body=encode_array(X)))
+
+
+def connect(url=INFERENCE_SERVER_URL):
+    """
+    Client and served model info, if a server is configured and answering
+
+    Returns:
+        tuple: (InferenceClient, models dict) or (None, {}) to run in-process
+    """
+    if not url:
+        return None, {}
+    try:
+        client = InferenceClient(url)
+        return client, client.health()['models']
+    except (OSError, ValueError, InferenceServerError, http.client.HTTPException):
+        return None, {}
+
+
+class ServerConnection:
+    """
+    Shared connect() result that does not keep a failed connect
+
+    Once the server has answered, its client is reused. After a failed
+    attempt the server is tried again retry_seconds later, so a server that
+    starts after the app is picked up without a connect (and its timeout)
+    on every rerun in between. Only one thread connects at a time; the
+    others run in-process meanwhile.
+    """
+
+    def __init__(self, url=INFERENCE_SERVER_URL, retry_seconds=INFERENCE_RETRY_SECONDS):
+        self.url = url
+        self.retry_seconds = retry_seconds
+        self._connection = None
+        self._retry_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self):
+        """(InferenceClient, models dict), or (None, {}) while no server is configured or answering"""
+        if self._connection is None and self.url and time.monotonic() >= self._retry_at:
+            if self._lock.acquire(blocking=False):
+                try:
+                    if self._connection is None:
+                        client, models = connect(self.url)
+                        if client is None:
+                            self._retry_at = time.monotonic() + self.retry_seconds
+                        else:
+                            self._connection = client, models
+                finally:
+                    self._lock.release()
+        return self._connection or (None, {})
+
+
+_FALLBACK_ERRORS = (OSError, InferenceServerError, http.client.HTTPException)
+
+
+class RemoteWebsiteModel:
+    """
+    Website model scored by the inference server
+
+    Exposes predict_with_proba / predict_proba / n_features_in_ like the
+    in-process model. If the server cannot be reached, the request is
+    scored by the model returned from `fallback` instead.
+    """
+
+    def __init__(self, client, info, fallback):
+        """
+        Args:
+            client: InferenceClient
+            info: Model info from the server's /health
+            fallback: Zero-argument callable returning the in-process model
+        """
+        self.client = client
+        self.classes_ = np.asarray(info['classes'])
+        self.n_features_in_ = info['n_features_in']
+        self._fallback = fallback
+
+    def predict_with_proba(self, X):
+        X = np.ascontiguousarray(np.atleast_2d(X), dtype=np.float32)
+        try:
+            proba = self.client.predict('website', X)
+        except _FALLBACK_ERRORS:
+            return predict_with_proba(self._fallback(), X)
+        return self.classes_[proba.argmax(axis=1)], proba
+
+    def predict_proba(self, X):
+        return self.predict_with_proba(X)[1]
+
+    def predict(self, X):
+        return self.predict_with_proba(X)[0]
+
+
+class RemoteImageModel:
+    """Image model served by the inference server, with the same predict() call as the Keras model"""
+
+    def __init__(self, client, info, fallback):
+        self.client = client
+        self.input_shape = (None, *info['input_shape'])
+        self._fallback = fallback
+
+    def predict(self, x, verbose=0):
+        x = np.ascontiguousarray(x, dtype=np.float32)
+        try:
+            return self.client.predict('image', x)
+        except _FALLBACK_ERRORS:
+            return self._fallback().predict(x, verbose=verbose)
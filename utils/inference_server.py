@@ -0,0 +1,312 @@
+"""
+Inference Server
+Owns the website and image models and scores concurrent requests in micro-batches
+
+Usage:
+    python -m utils.inference_server [--port 8600 | --socket /tmp/inference.sock] [--no-image]
+"""
+
+import argparse
+import json
+import os
+import queue
+import socketserver
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from utils.image_cache import model_version
+from utils.image_inference import load_fast_image_model
+from utils.image_model_runtime import image_model_path
+from utils.inference_client import decode_array, encode_array
+from utils.tree_engine import load_website_forest, predict_with_proba
+
+WEBSITE_MODEL_PATH = os.path.join('models', 'stacking_model.joblib')
+IMAGE_MODEL_PATH = os.path.join('models', 'resnet50_best_fixed.keras')
+
+DEFAULT_PORT = 8600
+# How long the first request of a batch waits for others to join it
+MAX_WAIT_MS = float(os.getenv('INFERENCE_MAX_WAIT_MS', 5))
+WEBSITE_MAX_BATCH = int(os.getenv('INFERENCE_WEBSITE_MAX_BATCH', 512))
+IMAGE_MAX_BATCH = int(os.getenv('INFERENCE_IMAGE_MAX_BATCH', 32))
+MAX_REQUEST_BYTES = int(os.getenv('INFERENCE_MAX_REQUEST_BYTES', 64 * 1024 * 1024))
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent predict calls into batches on one worker thread
+
+    The worker takes the first waiting request, then keeps collecting until
+    the next request would take the batch past max_batch_size rows or
+    max_wait has passed since that first request. A single request larger
+    than max_batch_size runs as a batch of its own. The concatenated rows go through predict_fn once and each
+    caller gets back its own slice of the output.
+    """
+
+    def __init__(self, predict_fn, max_batch_size, max_wait=MAX_WAIT_MS / 1000, name='batcher'):
+        """
+        Args:
+            predict_fn: Callable mapping an (n, ...) array to an (n, ...) output
+            max_batch_size: Rows per batch before it is run without waiting further
+            max_wait: Seconds the first request of a batch waits for more
+        """
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.batches = 0
+        self.rows = 0
+        self.requests = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, rows):
+        """Queue rows for the next batch; returns a Future for their output"""
+        future = Future()
+        self._queue.put((rows, future))
+        return future
+
+    def predict(self, rows, timeout=None):
+        return self.submit(rows).result(timeout)
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def stats(self):
+        return {'requests': self.requests, 'batches': self.batches, 'rows': self.rows,
+                'mean_batch_rows': round(self.rows / self.batches, 2) if self.batches else 0.0}
+
+    def _run(self):
+        carried = None
+        while True:
+            if carried is not None:
+                item, carried = carried, None
+            else:
+                item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            size = len(item[0])
+            deadline = time.monotonic() + self.max_wait
+            stopping = False
+            while size < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                if size + len(item[0]) > self.max_batch_size:
+                    # Would overflow this batch; it opens the next one instead
+                    carried = item
+                    break
+                batch.append(item)
+                size += len(item[0])
+            self._run_batch(batch, size)
+            if stopping:
+                return
+
+    def _run_batch(self, batch, size):
+        self.batches += 1
+        self.rows += size
+        self.requests += len(batch)
+        try:
+            rows = batch[0][0] if len(batch) == 1 else np.concatenate([rows for rows, _ in batch])
+            output = self.predict_fn(rows)
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        start = 0
+        for rows, future in batch:
+            future.set_result(output[start:start + len(rows)])
+            start += len(rows)
+
+
+class ServedModel:
+    """A model behind a MicroBatcher, with the info clients need and the input shape it accepts"""
+
+    def __init__(self, name, predict_fn, input_shape, info, max_batch_size, max_wait):
+        self.name = name
+        self.input_shape = tuple(input_shape)
+        self.info = dict(info, input_shape=list(self.input_shape))
+        self.batcher = MicroBatcher(predict_fn, max_batch_size, max_wait, name=f'{name}-batcher')
+
+    def check_input(self, X):
+        """Reject inputs that would break the batch they are concatenated into"""
+        if X.ndim != len(self.input_shape) + 1 or X.shape[1:] != self.input_shape:
+            raise ValueError(f"Expected input of shape (n, {', '.join(map(str, self.input_shape))}), "
+                             f"got {X.shape}")
+        if len(X) == 0:
+            raise ValueError("Empty input")
+
+
+def serve_website_model(model, max_batch_size=WEBSITE_MAX_BATCH, max_wait=MAX_WAIT_MS / 1000):
+    return ServedModel(
+        'website',
+        lambda X: predict_with_proba(model, X)[1],
+        (model.n_features_in_,),
+        {'classes': np.asarray(model.classes_).tolist(), 'n_features_in': int(model.n_features_in_)},
+        max_batch_size, max_wait,
+    )
+
+
+def serve_image_model(model, max_batch_size=IMAGE_MAX_BATCH, max_wait=MAX_WAIT_MS / 1000, version=None):
+    return ServedModel(
+        'image',
+        lambda X: np.asarray(model.predict(X, verbose=0)),
+        tuple(model.input_shape[1:]),
+        # Clients key their result caches on the model version
+        {'version': version},
+        max_batch_size, max_wait,
+    )
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """GET /health, POST /predict/<model> with an .npy body; answers with an .npy body"""
+
+    def address_string(self):
+        # Unix socket peers have no (host, port) address
+        return self.client_address[0] if isinstance(self.client_address, tuple) else 'unix'
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status, message):
+        self._send(status, message.encode('utf-8'), 'text/plain; charset=utf-8')
+
+    def do_GET(self):
+        if self.path != '/health':
+            self._send_error(404, f"Unknown path {self.path}")
+            return
+        models = self.server.models
+        body = {'models': {name: served.info for name, served in models.items()},
+                'stats': {name: served.batcher.stats() for name, served in models.items()}}
+        self._send(200, json.dumps(body).encode('utf-8'), 'application/json')
+
+    def do_POST(self):
+        prefix = '/predict/'
+        name = self.path[len(prefix):] if self.path.startswith(prefix) else None
+        served = self.server.models.get(name)
+        if served is None:
+            self._send_error(404 if not name else 503, f"Model not served: {name}")
+            return
+
+        length = int(self.headers.get('Content-Length') or 0)
+        if length <= 0 or length > MAX_REQUEST_BYTES:
+            self._send_error(413 if length > 0 else 400, f"Request body must be 1..{MAX_REQUEST_BYTES} bytes")
+            return
+        try:
+            X = decode_array(self.rfile.read(length))
+            served.check_input(X)
+        except ValueError as e:
+            self._send_error(400, str(e))
+            return
+
+        try:
+            output = served.batcher.predict(X)
+        except Exception as e:
+            self._send_error(500, f"Prediction failed: {e}")
+            return
+        self._send(200, encode_array(output), 'application/octet-stream')
+
+
+class InferenceHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Every app session may connect at once; the socketserver default backlog is 5
+    request_queue_size = 128
+
+    def __init__(self, address, models, verbose=False):
+        self.models = models
+        self.verbose = verbose
+        super().__init__(address, _Handler)
+
+
+class UnixInferenceServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, path, models, verbose=False):
+        self.models = models
+        self.verbose = verbose
+        if os.path.exists(path):
+            os.remove(path)
+        super().__init__(path, _Handler)
+
+
+def make_server(models, host='127.0.0.1', port=DEFAULT_PORT, socket_path=None, verbose=False):
+    """
+    Build the HTTP server for a set of ServedModel objects
+
+    Args:
+        models: Mapping of model name ('website', 'image') to ServedModel
+        host, port: Localhost address to listen on (port 0 picks a free port)
+        socket_path: Listen on this Unix socket instead
+
+    Returns:
+        InferenceHTTPServer or UnixInferenceServer (call serve_forever())
+    """
+    if socket_path:
+        return UnixInferenceServer(socket_path, models, verbose)
+    return InferenceHTTPServer((host, port), models, verbose)
+
+
+def load_models(website_path=WEBSITE_MODEL_PATH, image_path=IMAGE_MODEL_PATH, with_image=True):
+    """Load the models to serve; a model that fails to load is skipped with a message"""
+    models = {}
+    try:
+        models['website'] = serve_website_model(load_website_forest(website_path))
+    except Exception as e:
+        print(f"Website model not served: {e}")
+    if with_image:
+        try:
+            # IMAGE_MODEL_RUNTIME=tflite serves the quantized export when it exists
+            image_path = image_model_path(image_path)
+            models['image'] = serve_image_model(load_fast_image_model(image_path),
+                                                version=model_version(image_path))
+        except Exception as e:
+            print(f"Image model not served: {e}")
+    return models
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--socket', help='listen on a Unix socket instead of TCP')
+    parser.add_argument('--no-image', action='store_true', help='do not load the image model')
+    parser.add_argument('--verbose', action='store_true', help='log every request')
+    args = parser.parse_args()
+
+    models = load_models(with_image=not args.no_image)
+    if not models:
+        raise SystemExit("No models could be loaded")
+    server = make_server(models, args.host, args.port, args.socket, args.verbose)
+    where = f"unix://{args.socket}" if args.socket else f"http://{args.host}:{server.server_address[1]}"
+    print(f"Serving {', '.join(models)} on {where}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Known Domains
+In-memory index of the curated trusted / untrusted source lists for instant verdicts
+"""
+
+import csv
+import os
+
+from utils.domains import normalize_host, registrable_domain
+
+TRUSTED_SOURCES_PATH = os.path.join('data', 'trusted_sources_original.csv')
+UNTRUSTED_SOURCES_PATH = os.path.join('data', 'untrusted_sources.csv')
+
+
+class KnownDomainIndex:
+    """
+    Curated domains keyed by normalized host
+
+    Most entries are registrable domains (nytimes.com) and then cover every
+    subdomain (edition.nytimes.com). Entries that are themselves subdomains
+    (abcnews.go.com) only cover that host and its own subdomains, so one
+    listed site never vouches for the rest of a shared parent domain.
+    """
+
+    def __init__(self):
+        self._entries = {}
+
+    def add(self, domain, verdict, record, source=''):
+        """
+        Add a curated domain; the first entry for a host wins
+
+        Returns:
+            bool: False if the value is not a usable domain or already indexed
+        """
+        host = normalize_host(domain)
+        if '.' not in host or host in self._entries:
+            return False
+        self._entries[host] = {'domain': host, 'verdict': verdict, 'source': source, 'metadata': dict(record)}
+        return True
+
+    def lookup(self, url):
+        """
+        Curated entry for a URL, host or domain
+
+        The host is tried first, then each parent domain up to the
+        registrable domain (never the public suffix itself).
+
+        Returns:
+            dict: domain, verdict ('Trusted' / 'Untrusted'), source file and
+            the curated metadata row, or None if the domain is not listed
+        """
+        host = normalize_host(url)
+        if not host:
+            return None
+        stop = registrable_domain(host) or host
+        candidate = host
+        while True:
+            entry = self._entries.get(candidate)
+            if entry is not None:
+                return entry
+            if candidate == stop or '.' not in candidate:
+                return None
+            candidate = candidate.split('.', 1)[1]
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def load_known_domains(trusted_path=TRUSTED_SOURCES_PATH, untrusted_path=UNTRUSTED_SOURCES_PATH):
+    """
+    Build the index from the curated CSVs (each needs a `domain` column)
+
+    Returns:
+        KnownDomainIndex
+    """
+    index = KnownDomainIndex()
+    for path, verdict in ((trusted_path, 'Trusted'), (untrusted_path, 'Untrusted')):
+        with open(path, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                index.add(row['domain'], verdict, row, source=os.path.basename(path))
+    return index
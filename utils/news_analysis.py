@@ -0,0 +1,136 @@
+"""
+News Analysis
+Groq fact-check prompt, response parsing and a persistent cache of parsed verdicts keyed by article content
+"""
+
+import hashlib
+import json
+import os
+import re
+import unicodedata
+
+from utils.sqlite_cache import SQLiteCache, cache_path
+
+ANALYSIS_MODEL = "llama-3.3-70b-versatile"
+ANALYSIS_TEMPERATURE = 0.3
+ANALYSIS_MAX_TOKENS = 1500
+# Bump whenever ANALYSIS_PROMPT or parse_analysis changes, so cached verdicts from the old prompt are not served
+ANALYSIS_PROMPT_VERSION = 1
+
+ANALYSIS_CACHE_TTL = int(os.getenv('ANALYSIS_CACHE_TTL', 7 * 86400))
+ANALYSIS_CACHE_MAX_ENTRIES = int(os.getenv('ANALYSIS_CACHE_MAX_ENTRIES', 20000))
+
+ANALYSIS_PROMPT = """You are a professional fact-checker and misinformation analyst. Analyze the following article/text for signs of fake news, misinformation, or unreliable content.
+
+**Important:** Your training data may not include recent events. Focus on analyzing writing style, logical consistency, source credibility indicators, and common misinformation patterns.
+
+Consider these factors:
+1. Factual accuracy and verifiability (based on training data)
+2. Source credibility indicators
+3. Emotional manipulation or sensationalism
+4. Logical consistency and reasoning
+5. Use of credible citations or lack thereof
+6. Bias, propaganda, or misleading framing
+7. Writing quality and professionalism
+
+Article to analyze:
+{article_text}
+
+Provide your analysis in this EXACT format:
+
+VERDICT: [LEGITIMATE or FAKE or MISLEADING]
+CONFIDENCE: [percentage as number only, e.g., 85]
+REASONING: [2-3 sentence explanation of your verdict]
+RED_FLAGS: [comma-separated list of concerning elements, or "None" if legitimate]
+RECOMMENDATION: [specific action user should take]"""
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def build_analysis_prompt(article_text):
+    return ANALYSIS_PROMPT.format(article_text=article_text)
+
+
+def parse_analysis(result_text):
+    """
+    Parse the VERDICT / CONFIDENCE / REASONING / RED_FLAGS / RECOMMENDATION lines
+
+    Returns:
+        dict: verdict ('UNKNOWN' if missing), confidence (0-100), reasoning,
+        red_flags, recommendation and the full result_text
+    """
+    analysis = {'verdict': "UNKNOWN", 'confidence': 0, 'reasoning': "", 'red_flags': "",
+                'recommendation': "", 'result_text': result_text}
+    for line in result_text.strip().split('\n'):
+        if line.startswith("VERDICT:"):
+            analysis['verdict'] = line.replace("VERDICT:", "").strip()
+        elif line.startswith("CONFIDENCE:"):
+            try:
+                analysis['confidence'] = int(line.replace("CONFIDENCE:", "").strip().replace("%", ""))
+            except ValueError:
+                analysis['confidence'] = 0
+        elif line.startswith("REASONING:"):
+            analysis['reasoning'] = line.replace("REASONING:", "").strip()
+        elif line.startswith("RED_FLAGS:"):
+            analysis['red_flags'] = line.replace("RED_FLAGS:", "").strip()
+        elif line.startswith("RECOMMENDATION:"):
+            analysis['recommendation'] = line.replace("RECOMMENDATION:", "").strip()
+    return analysis
+
+
+def normalize_article(text):
+    """Unicode NFKC form with runs of whitespace collapsed, so copies pasted from different sources match"""
+    return _WHITESPACE.sub(' ', unicodedata.normalize('NFKC', text)).strip()
+
+
+def analysis_cache_key(article_text, model=ANALYSIS_MODEL, temperature=ANALYSIS_TEMPERATURE,
+                       prompt_version=ANALYSIS_PROMPT_VERSION):
+    """SHA-256 over the prompt version, model, temperature and normalized article text"""
+    payload = json.dumps([prompt_version, model, temperature, normalize_article(article_text)])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class AnalysisCache:
+    """
+    Parsed LLM verdicts of previously analyzed articles
+
+    Stored in a SQLiteCache file shared by every session and replica on the
+    host. Only complete verdicts are stored, so a malformed response is
+    retried next time. hits and misses count lookups in this process.
+    """
+
+    def __init__(self, path=None, ttl=ANALYSIS_CACHE_TTL, max_entries=ANALYSIS_CACHE_MAX_ENTRIES):
+        """
+        Args:
+            path: SQLite file (default: news_analysis.sqlite3 in the cache directory)
+            ttl: Seconds a verdict stays valid
+            max_entries: Entries kept before LRU eviction
+        """
+        self._store = SQLiteCache(path or cache_path('news_analysis.sqlite3'), default_ttl=ttl,
+                                  max_entries=max_entries)
+
+    def get(self, key):
+        """Cached analysis dict (see parse_analysis) or None"""
+        return self._store.get(key)
+
+    def put(self, key, analysis):
+        if analysis['verdict'] != "UNKNOWN":
+            self._store.set(key, analysis)
+
+    def __len__(self):
+        return len(self._store)
+
+    @property
+    def hits(self):
+        return self._store.hits
+
+    @property
+    def misses(self):
+        return self._store.misses
+
+    @property
+    def hit_rate(self):
+        return self._store.hit_rate
+
+    def stats_text(self):
+        return self._store.stats_text()
@@ -0,0 +1,155 @@
+"""
+Page Cache
+Disk-backed cache of fetched pages, revalidated with ETag / Last-Modified and bounded by total size
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from types import SimpleNamespace
+from urllib.parse import urlsplit, urlunsplit
+
+from requests.structures import CaseInsensitiveDict
+
+# Total bytes of page bodies kept on disk; least recently used pages are evicted beyond this (0 disables)
+PAGE_CACHE_MAX_BYTES = int(os.getenv('PAGE_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+
+_DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def normalize_cache_url(url):
+    """Cache key for a URL: lowercase scheme and host, no default port, no fragment, '/' for an empty path"""
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and parts.port != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    return urlunsplit((scheme, host, parts.path or '/', parts.query, ''))
+
+
+class CachedPage:
+    """
+    Stored page standing in for a requests.Response
+
+    Exposes the attributes the feature extraction reads (content, headers,
+    status_code, history, url) plus the page features computed when it was
+    first downloaded, so a revalidated page needs no HTML parse.
+    """
+
+    def __init__(self, url, status_code, headers, history, content, features):
+        self.url = url
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers)
+        self.history = [SimpleNamespace(status_code=code, url=hop_url) for code, hop_url in history]
+        self.content = content
+        self.features = features
+
+    def conditional_headers(self):
+        """If-None-Match / If-Modified-Since headers for revalidating this page"""
+        headers = {}
+        if self.headers.get('ETag'):
+            headers['If-None-Match'] = self.headers['ETag']
+        if self.headers.get('Last-Modified'):
+            headers['If-Modified-Since'] = self.headers['Last-Modified']
+        return headers
+
+
+def is_cacheable(response):
+    """Only complete 200 responses carrying a validator can be revalidated later"""
+    if response.status_code != 200:
+        return False
+    if 'no-store' in response.headers.get('Cache-Control', '').lower():
+        return False
+    return bool(response.headers.get('ETag') or response.headers.get('Last-Modified'))
+
+
+class PageCache:
+    """
+    SQLite store of page bodies, headers, status and redirect history
+
+    Same layout as SQLiteCache (WAL mode, one locked connection) but bodies
+    are kept as BLOBs and eviction is by total body size rather than count.
+    """
+
+    def __init__(self, path, max_bytes=PAGE_CACHE_MAX_BYTES):
+        """
+        Args:
+            path: SQLite database file
+            max_bytes: Total body bytes to keep before evicting least recently used pages
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5)
+        with self._lock, self._conn:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS pages ('
+                'key TEXT PRIMARY KEY, url TEXT NOT NULL, status_code INTEGER NOT NULL, '
+                'headers TEXT NOT NULL, history TEXT NOT NULL, body BLOB NOT NULL, '
+                'features TEXT NOT NULL, size INTEGER NOT NULL, accessed_at REAL NOT NULL)'
+            )
+            self._conn.execute('CREATE INDEX IF NOT EXISTS pages_accessed ON pages (accessed_at)')
+
+    def get(self, url):
+        """Stored CachedPage for the URL, or None"""
+        key = normalize_cache_url(url)
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                'SELECT url, status_code, headers, history, body, features FROM pages WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute('UPDATE pages SET accessed_at = ? WHERE key = ?', (time.time(), key))
+        page_url, status_code, headers, history, body, features = row
+        return CachedPage(page_url, status_code, json.loads(headers), json.loads(history),
+                          bytes(body), json.loads(features))
+
+    def record_hit(self):
+        """Count a successful revalidation (304) of a stored page"""
+        with self._lock:
+            self.hits += 1
+
+    def put(self, url, response, features):
+        """Store a fetched response and the page features computed from it"""
+        key = normalize_cache_url(url)
+        body = response.content
+        if len(body) > self.max_bytes:
+            return
+        history = [[hop.status_code, hop.url] for hop in response.history]
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO pages '
+                '(key, url, status_code, headers, history, body, features, size, accessed_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (key, response.url, response.status_code, json.dumps(dict(response.headers)),
+                 json.dumps(history), sqlite3.Binary(body), json.dumps(features), len(body), time.time())
+            )
+            self._evict()
+
+    def _evict(self):
+        total = 0
+        stale = []
+        for key, size in self._conn.execute('SELECT key, size FROM pages ORDER BY accessed_at DESC'):
+            total += size
+            if total > self.max_bytes:
+                stale.append((key,))
+        if stale:
+            self._conn.executemany('DELETE FROM pages WHERE key = ?', stale)
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM pages')
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM pages').fetchone()[0]
+
+    def total_bytes(self):
+        with self._lock:
+            return self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM pages').fetchone()[0]
@@ -0,0 +1,316 @@
+"""
+RDAP Domain Lookup
+Structured registration data via RDAP, with a bounded port-43 WHOIS fallback for TLDs without RDAP
+"""
+
+import json
+import os
+import re
+import socket
+import threading
+import time
+from datetime import datetime, timezone
+
+from utils.http_session import get_session, get_timeout
+from utils.sqlite_cache import cache_path
+
+# IANA registry mapping TLDs to RDAP base URLs (RFC 9224)
+BOOTSTRAP_URL = os.getenv('RDAP_BOOTSTRAP_URL', 'https://data.iana.org/rdap/dns.json')
+BOOTSTRAP_TTL = float(os.getenv('RDAP_BOOTSTRAP_TTL', 24 * 3600))
+# After a failed or stale load, IANA is asked again this soon rather than after a full TTL
+BOOTSTRAP_RETRY = float(os.getenv('RDAP_BOOTSTRAP_RETRY', 60))
+BOOTSTRAP_FILE = 'rdap_dns.json'
+
+# Largest RDAP JSON or WHOIS text accepted from a server
+MAX_RESPONSE_BYTES = int(os.getenv('RDAP_MAX_RESPONSE_BYTES', 512 * 1024))
+
+WHOIS_PORT = 43
+
+# Port-43 servers for TLDs the bootstrap registry has no RDAP service for
+WHOIS_SERVERS = {
+    'com': 'whois.verisign-grs.com',
+    'net': 'whois.verisign-grs.com',
+    'org': 'whois.pir.org',
+    'uk': 'whois.nic.uk',
+    'io': 'whois.nic.io',
+    'co': 'whois.nic.co',
+}
+
+PRIVACY_KEYWORDS = ['privacy', 'protect', 'whoisguard', 'proxy', 'redacted']
+
+_bootstrap = None
+_bootstrap_expires_at = 0.0
+_bootstrap_lock = threading.Lock()
+# Held by the one thread downloading the registry
+_bootstrap_refresh_lock = threading.Lock()
+
+
+class ResponseTooLarge(ValueError):
+    """Raised when a server sends more than MAX_RESPONSE_BYTES"""
+
+
+def _read_capped(response, limit):
+    """Read a streamed requests response, refusing bodies larger than limit bytes"""
+    declared = response.headers.get('Content-Length')
+    if declared and declared.isdigit() and int(declared) > limit:
+        response.close()
+        raise ResponseTooLarge(f"{declared} bytes exceeds the {limit} byte limit")
+
+    body = bytearray()
+    for block in response.iter_content(16384):
+        body += block
+        if len(body) > limit:
+            response.close()
+            raise ResponseTooLarge(f"response exceeds the {limit} byte limit")
+    return bytes(body)
+
+
+def _parse_bootstrap(data):
+    """Flatten the IANA services list into {tld: [base URLs]}"""
+    services = {}
+    for tlds, urls in data.get('services', []):
+        # Prefer HTTPS endpoints when a registry lists several
+        urls = sorted(urls, key=lambda url: not url.startswith('https://'))
+        for tld in tlds:
+            services[tld.lower()] = urls
+    return services
+
+
+def _read_bootstrap(timeout):
+    """
+    Registry from the cache file, refreshed from IANA when the file is old
+
+    Returns:
+        tuple: ({tld: [base URLs]}, current) where current is False when the
+        result is empty or a stale file used because IANA was unreachable
+    """
+    path = cache_path(BOOTSTRAP_FILE)
+    if os.path.exists(path) and time.time() - os.path.getmtime(path) < BOOTSTRAP_TTL:
+        try:
+            with open(path) as f:
+                services = _parse_bootstrap(json.load(f))
+            if services:
+                return services, True
+        except (OSError, ValueError):
+            pass
+
+    try:
+        response = get_session().get(BOOTSTRAP_URL, timeout=get_timeout(timeout), stream=True)
+        response.raise_for_status()
+        data = json.loads(_read_capped(response, MAX_RESPONSE_BYTES))
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+        services = _parse_bootstrap(data)
+        return services, bool(services)
+    except Exception:
+        pass
+
+    try:
+        with open(path) as f:
+            return _parse_bootstrap(json.load(f)), False
+    except (OSError, ValueError):
+        return {}, False
+
+
+def load_bootstrap(timeout=5):
+    """
+    RDAP service registry, from memory, the local cache file or IANA
+
+    The file in the cache directory is refreshed once it is older than
+    BOOTSTRAP_TTL. If IANA cannot be reached, a stale file is still used,
+    and the download is retried after BOOTSTRAP_RETRY seconds instead of
+    a full TTL. One thread downloads at a time, outside the state lock;
+    other threads keep using the previous registry meanwhile (or wait for
+    the download if there is none yet).
+
+    Returns:
+        dict: {tld: [RDAP base URLs]} (empty if nothing could be loaded)
+    """
+    global _bootstrap, _bootstrap_expires_at
+    with _bootstrap_lock:
+        if _bootstrap is not None and time.time() < _bootstrap_expires_at:
+            return _bootstrap
+        previous = _bootstrap
+
+    if not _bootstrap_refresh_lock.acquire(blocking=previous is None):
+        return previous
+    try:
+        with _bootstrap_lock:
+            # Another thread may have finished a refresh while this one waited
+            if _bootstrap is not None and time.time() < _bootstrap_expires_at:
+                return _bootstrap
+
+        services, current = _read_bootstrap(timeout)
+
+        with _bootstrap_lock:
+            if services or not _bootstrap:
+                _bootstrap = services
+            _bootstrap_expires_at = time.time() + (BOOTSTRAP_TTL if current else BOOTSTRAP_RETRY)
+            return _bootstrap
+    finally:
+        _bootstrap_refresh_lock.release()
+
+
+def rdap_base_urls(domain, bootstrap=None):
+    """RDAP base URLs serving the domain's TLD (empty list if the TLD has no RDAP service)"""
+    bootstrap = load_bootstrap() if bootstrap is None else bootstrap
+    labels = domain.lower().rstrip('.').split('.')
+    # Longest matching suffix first, in case the registry lists multi-label entries
+    for i in range(len(labels)):
+        urls = bootstrap.get('.'.join(labels[i:]))
+        if urls:
+            return urls
+    return []
+
+
+def parse_rdap_date(value):
+    """RFC 3339 timestamp from an RDAP event as a naive UTC datetime (None if unparseable)"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.endswith(('Z', 'z')):
+        value = value[:-1] + '+00:00'
+    # fromisoformat on Python 3.10 rejects fractional seconds that are not 3 or 6 digits
+    value = re.sub(r'(\.\d+)', lambda m: m.group(1)[:7].ljust(7, '0'), value, count=1)
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _vcard_values(entity, field):
+    for entry in (entity.get('vcardArray') or [None, []])[1]:
+        if len(entry) >= 4 and entry[0] == field:
+            yield str(entry[3])
+
+
+def _iter_entities(entities):
+    for entity in entities or []:
+        yield entity
+        yield from _iter_entities(entity.get('entities'))
+
+
+def parse_rdap_domain(data):
+    """
+    Registration details from an RDAP domain object
+
+    Returns:
+        dict: creation_date / domain_registrar / whois_privacy_enabled for whatever is present
+    """
+    record = {}
+    for event in data.get('events', []):
+        if event.get('eventAction') == 'registration':
+            creation_date = parse_rdap_date(event.get('eventDate'))
+            if creation_date:
+                record['creation_date'] = creation_date
+                break
+
+    privacy = None
+    for entity in _iter_entities(data.get('entities')):
+        roles = entity.get('roles', [])
+        if 'registrar' in roles and 'domain_registrar' not in record:
+            name = next(_vcard_values(entity, 'fn'), '')
+            if name:
+                record['domain_registrar'] = name[:30]
+        if 'registrant' in roles:
+            contact = ' '.join(list(_vcard_values(entity, 'fn')) + list(_vcard_values(entity, 'email')))
+            remarks = ' '.join(remark.get('title', '') for remark in entity.get('remarks', []))
+            text = f"{contact} {remarks}".lower()
+            privacy = bool(privacy) or any(kw in text for kw in PRIVACY_KEYWORDS)
+    if privacy is not None:
+        record['whois_privacy_enabled'] = privacy
+    return record
+
+
+def lookup_rdap(domain, base_urls, timeout=5):
+    """Query the RDAP servers in turn and parse the first domain object returned"""
+    errors = []
+    for base_url in base_urls:
+        url = base_url.rstrip('/') + '/domain/' + domain
+        try:
+            response = get_session().get(url, timeout=get_timeout(timeout), stream=True,
+                                         headers={'Accept': 'application/rdap+json'})
+            if response.status_code == 404:
+                response.close()
+                return {}
+            response.raise_for_status()
+            return parse_rdap_domain(json.loads(_read_capped(response, MAX_RESPONSE_BYTES)))
+        except Exception as error:
+            errors.append(f"{url}: {error}")
+    raise ConnectionError('; '.join(errors) or 'no RDAP server')
+
+
+def parse_whois_text(whois_text):
+    """Creation date (and registrar when no date was found) from free-text WHOIS output"""
+    record = {}
+    date_patterns = [
+        (r'Creation Date:\s*(\d{4}-\d{2}-\d{2})', '%Y-%m-%d'),
+        (r'Created:\s*(\d{4}-\d{2}-\d{2})', '%Y-%m-%d'),
+        (r'Registration Date:\s*(\d{4}-\d{2}-\d{2})', '%Y-%m-%d'),
+        (r'Registered on:\s*(\d{2}-\w{3}-\d{4})', '%d-%b-%Y'),  # UK format
+    ]
+    for pattern, date_format in date_patterns:
+        match = re.search(pattern, whois_text, re.IGNORECASE)
+        if match:
+            try:
+                record['creation_date'] = datetime.strptime(match.group(1), date_format)
+                break
+            except ValueError:
+                continue
+
+    if 'creation_date' not in record:
+        registrar_match = re.search(r'Registrar:\s*(.+)', whois_text, re.IGNORECASE)
+        if registrar_match:
+            record['domain_registrar'] = registrar_match.group(1).strip()[:30]
+    return record
+
+
+def lookup_port43(domain, timeout=5, server=None, cancelled=None):
+    """
+    Bounded port-43 WHOIS query
+
+    Args:
+        domain: Domain to query
+        timeout: Socket timeout in seconds
+        server: (host, port) to query; defaults to the TLD's WHOIS server
+        cancelled: Optional threading.Event that stops reading early
+
+    Returns:
+        dict: Record parsed by parse_whois_text
+    """
+    if server is None:
+        tld = domain.rsplit('.', 1)[-1]
+        server = (WHOIS_SERVERS.get(tld, f'whois.nic.{tld}'), WHOIS_PORT)
+
+    chunks = []
+    size = 0
+    with socket.create_connection(server, timeout=timeout) as sock:
+        sock.sendall(f"{domain}\r\n".encode())
+        while cancelled is None or not cancelled.is_set():
+            data = sock.recv(4096)
+            if not data:
+                break
+            chunks.append(data)
+            size += len(data)
+            if size > MAX_RESPONSE_BYTES:
+                # Registration dates sit near the top; whatever arrived so far is enough
+                break
+    return parse_whois_text(b''.join(chunks).decode('utf-8', errors='ignore'))
+
+
+def lookup_domain(domain, timeout=5, cancelled=None):
+    """
+    RDAP lookup for the domain, or port-43 WHOIS when its TLD has no RDAP service
+
+    Returns:
+        tuple: (record dict, debug messages list)
+    """
+    base_urls = rdap_base_urls(domain, load_bootstrap(timeout))
+    if base_urls:
+        return lookup_rdap(domain, base_urls, timeout), [f"RDAP query via {base_urls[0]}"]
+    return lookup_port43(domain, timeout, cancelled=cancelled), ["No RDAP service for TLD, used port 43"]
@@ -0,0 +1,106 @@
+"""
+SQLite Cache
+Small persistent key-value store with per-entry TTL, LRU eviction and hit-rate stats
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# Directory for all on-disk caches (relative to the working directory unless absolute)
+CACHE_DIR = os.getenv('APP_CACHE_DIR', '.cache')
+
+
+def cache_path(filename):
+    """Path of a cache file inside CACHE_DIR (the directory is created on demand)"""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    return os.path.join(CACHE_DIR, filename)
+
+
+class SQLiteCache:
+    """
+    Persistent TTL cache backed by one SQLite file
+
+    Values are stored as JSON. The database runs in WAL mode so several
+    Streamlit replicas on one host can share the file; within a process a
+    single connection is guarded by a lock. Hit/miss counters are kept in
+    memory for the current process.
+    """
+
+    def __init__(self, path, default_ttl, max_entries=None):
+        """
+        Args:
+            path: SQLite database file
+            default_ttl: Seconds an entry stays valid unless set() overrides it
+            max_entries: Evict least recently used entries beyond this count (None = unbounded)
+        """
+        self.path = path
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5)
+        with self._lock, self._conn:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS entries ('
+                'key TEXT PRIMARY KEY, value TEXT NOT NULL, '
+                'expires_at REAL NOT NULL, accessed_at REAL NOT NULL)'
+            )
+            self._conn.execute('CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at)')
+
+    def get(self, key):
+        """Return the cached value, or None if missing or expired"""
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                'SELECT value, expires_at FROM entries WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None or row[1] <= now:
+                if row is not None:
+                    self._conn.execute('DELETE FROM entries WHERE key = ?', (key,))
+                self.misses += 1
+                return None
+            self._conn.execute('UPDATE entries SET accessed_at = ? WHERE key = ?', (now, key))
+            self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, key, value, ttl=None):
+        """Store a JSON-serializable value for ttl seconds (default_ttl if None)"""
+        now = time.time()
+        ttl = self.default_ttl if ttl is None else ttl
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO entries (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)',
+                (key, json.dumps(value), now + ttl, now)
+            )
+            if self.max_entries is not None:
+                self._conn.execute(
+                    'DELETE FROM entries WHERE key IN ('
+                    'SELECT key FROM entries ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)',
+                    (self.max_entries,)
+                )
+
+    def delete(self, key):
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM entries WHERE key = ?', (key,))
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM entries')
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM entries').fetchone()[0]
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats_text(self):
+        """Human-readable hit rate, e.g. 'hit rate 75% over 8 lookups'"""
+        return f"hit rate {self.hit_rate:.0%} over {self.hits + self.misses} lookups"
@@ -0,0 +1,131 @@
+"""
+Startup Profiling
+Load bookkeeping for lazily loaded models, optional background prewarming and an import cost report
+"""
+
+import os
+import subprocess
+import sys
+import threading
+import time
+
+# Resources to load in a background thread as soon as the app starts:
+# comma-separated names (e.g. "website,image") or "all". Empty loads everything on first use.
+PREWARM_MODELS = os.getenv('PREWARM_MODELS', '')
+
+# Heavy dependencies of the app, in roughly the order a cold start would pull them in
+HEAVY_MODULES = ['streamlit', 'pandas', 'sklearn', 'joblib', 'bs4', 'whois', 'requests', 'openai',
+                 'PIL', 'keras', 'utils.webscraper']
+
+_loads = {}
+_lock = threading.Lock()
+
+
+def record_load(name, started, error=None):
+    """
+    Record that a resource finished loading
+
+    Args:
+        name: Resource name (e.g. 'website', 'image')
+        started: time.perf_counter() taken when the load began
+        error: Error message if the load failed
+    """
+    with _lock:
+        _loads[name] = {
+            'seconds': time.perf_counter() - started,
+            'error': error,
+            'thread': threading.current_thread().name,
+        }
+
+
+def load_status(name):
+    """Recorded load of a resource (seconds, error, thread), or None if it has not been loaded yet"""
+    with _lock:
+        status = _loads.get(name)
+        return dict(status) if status else None
+
+
+def load_report():
+    """
+    Load times of everything loaded so far
+
+    Returns:
+        list: One dict per resource with name, status, seconds and thread
+    """
+    with _lock:
+        items = sorted(_loads.items())
+    return [
+        {'name': name, 'status': 'Failed' if load['error'] else 'Loaded',
+         'seconds': round(load['seconds'], 3), 'thread': load['thread']}
+        for name, load in items
+    ]
+
+
+def start_prewarm(loaders, names=PREWARM_MODELS):
+    """
+    Call the selected loaders one after another in a daemon thread
+
+    Loaders must be safe to call again from the foreground (st.cache_resource
+    functions are: a second caller waits for the load in progress).
+
+    Args:
+        loaders: Mapping of resource name to zero-argument loader, in prewarm order
+        names: Comma-separated names to prewarm, or 'all'
+
+    Returns:
+        threading.Thread or None if nothing was selected
+    """
+    wanted = {name.strip() for name in names.split(',') if name.strip()}
+    selected = [loader for name, loader in loaders.items() if 'all' in wanted or name in wanted]
+    if not selected:
+        return None
+
+    def run():
+        for loader in selected:
+            try:
+                loader()
+            except Exception:
+                # A failed prewarm is retried (and reported) on first use
+                pass
+
+    thread = threading.Thread(target=run, name='model-prewarm', daemon=True)
+    thread.start()
+    return thread
+
+
+def import_cost(module, python=sys.executable, timeout=120):
+    """
+    Cumulative import time of a module in a fresh interpreter (python -X importtime)
+
+    Returns:
+        float: Seconds, or None if the module cannot be imported
+    """
+    try:
+        result = subprocess.run([python, '-X', 'importtime', '-c', f'import {module}'],
+                                capture_output=True, text=True, timeout=timeout)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    if result.returncode != 0:
+        return None
+    for line in reversed(result.stderr.splitlines()):
+        # import time: self [us] | cumulative | imported package
+        fields = line.split('|')
+        if len(fields) == 3 and fields[2].strip() == module:
+            return int(fields[1]) / 1e6
+    return None
+
+
+def import_report(modules=HEAVY_MODULES):
+    """
+    Cold import cost of each module
+
+    Returns:
+        list: One dict per module with module and seconds (None if not installed)
+    """
+    return [{'module': module, 'seconds': import_cost(module)} for module in modules]
+
+
+if __name__ == '__main__':
+    for row in import_report():
+        seconds = 'not installed' if row['seconds'] is None else f"{row['seconds']:.3f}s"
+        print(f"{row['module']:<20} {seconds}")
@@ -0,0 +1,290 @@
+"""
+Compiled Tree Engine
+Flattens a fitted sklearn tree ensemble into contiguous NumPy node arrays
+and evaluates every tree for a whole batch in one vectorized pass
+"""
+
+import hashlib
+import json
+import os
+
+import joblib
+import numpy as np
+
+# 'compiled' (default) scores through CompiledForest, 'sklearn' uses the estimator directly
+ENGINE_ENV_VAR = 'WEBSITE_MODEL_ENGINE'
+
+# Directory of memory-mappable node arrays written by utils/convert_models.py
+COMPILED_MODEL_DIR = os.getenv('WEBSITE_MODEL_ARRAYS', os.path.join('models', 'website_model_arrays'))
+MANIFEST_FILE = 'manifest.json'
+ARTIFACT_VERSION = 1
+
+
+class CompiledForest:
+    """
+    Array-compiled replacement for ExtraTreesClassifier.predict/predict_proba
+
+    All trees are stored in one set of node arrays (feature, threshold,
+    left/right child, leaf class probabilities). Leaves point back to
+    themselves, and a batch is evaluated by stepping every (sample, tree)
+    pair one level at a time until all of them have reached a leaf.
+    """
+
+    def __init__(self, model, block_size=2048, vectorized_max_rows=16):
+        """
+        Args:
+            model: Fitted forest classifier (e.g. ExtraTreesClassifier)
+            block_size: Rows scored per step (bounds temporary memory)
+            vectorized_max_rows: Blocks up to this size walk the NumPy node
+                arrays; larger blocks use each tree's native apply kernel,
+                which is faster once per-call overhead is amortized
+        """
+        trees = [estimator.tree_ for estimator in model.estimators_]
+        node_counts = np.array([tree.node_count for tree in trees])
+        offsets = np.concatenate([[0], np.cumsum(node_counts)[:-1]])
+
+        self.classes_ = np.asarray(model.classes_)
+        self.n_features_in_ = model.n_features_in_
+        self.n_estimators = len(trees)
+        self.max_depth = max(tree.max_depth for tree in trees)
+        self.block_size = block_size
+        self.vectorized_max_rows = vectorized_max_rows
+        self.native_trees = trees
+        self.roots = offsets.astype(np.intp)
+
+        total_nodes = int(node_counts.sum())
+        n_classes = len(self.classes_)
+        self.feature = np.zeros(total_nodes, dtype=np.intp)
+        self.threshold = np.full(total_nodes, np.inf, dtype=np.float64)
+        self.left = np.arange(total_nodes, dtype=np.intp)
+        self.right = np.arange(total_nodes, dtype=np.intp)
+        self.leaf_proba = np.zeros((total_nodes, n_classes), dtype=np.float64)
+
+        for tree, offset in zip(trees, offsets):
+            nodes = slice(offset, offset + tree.node_count)
+            split = tree.children_left != -1
+
+            self.feature[nodes][split] = tree.feature[split]
+            self.threshold[nodes][split] = tree.threshold[split]
+            self.left[nodes][split] = tree.children_left[split] + offset
+            self.right[nodes][split] = tree.children_right[split] + offset
+
+            # Same normalization as DecisionTreeClassifier.predict_proba
+            value = tree.value[:, 0, :]
+            normalizer = value.sum(axis=1, keepdims=True)
+            normalizer[normalizer == 0.0] = 1.0
+            self.leaf_proba[nodes] = value / normalizer
+
+        # Interleaved (left, right) children so one gather picks the next node
+        self.children = np.column_stack([self.left, self.right]).ravel()
+        self.is_leaf = self.left == np.arange(total_nodes)
+
+        # Round thresholds down to float32: for float32 inputs x > t32 exactly when x > t
+        threshold32 = self.threshold.astype(np.float32)
+        too_high = threshold32.astype(np.float64) > self.threshold
+        threshold32[too_high] = np.nextafter(threshold32[too_high], np.float32(-np.inf))
+        self.threshold32 = threshold32
+
+        # One contiguous row per class makes the per-tree sum a cheap gather
+        self.leaf_proba_by_class = np.ascontiguousarray(self.leaf_proba.T)
+
+    # Node arrays used for scoring; everything else is rebuilt from the manifest
+    SCORING_ARRAYS = ('roots', 'feature', 'threshold32', 'children', 'is_leaf', 'leaf_proba_by_class', 'classes_')
+
+    def save(self, directory, source_path=None):
+        """
+        Write the scoring arrays as .npy files plus a manifest
+
+        The manifest is written last, so a directory without one is an
+        interrupted conversion and is never loaded.
+
+        Args:
+            directory: Output directory (created if missing)
+            source_path: Model file the forest was compiled from; its SHA-256
+                is recorded so a stale conversion can be detected at load time
+        """
+        os.makedirs(directory, exist_ok=True)
+        manifest_path = os.path.join(directory, MANIFEST_FILE)
+        if os.path.exists(manifest_path):
+            os.remove(manifest_path)
+        for name in self.SCORING_ARRAYS:
+            np.save(os.path.join(directory, f'{name}.npy'), np.ascontiguousarray(getattr(self, name)),
+                    allow_pickle=False)
+        manifest = {
+            'version': ARTIFACT_VERSION,
+            'n_features_in': int(self.n_features_in_),
+            'n_estimators': int(self.n_estimators),
+            'max_depth': int(self.max_depth),
+            'source_sha256': file_sha256(source_path) if source_path else None,
+        }
+        with open(manifest_path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+
+    @classmethod
+    def load(cls, directory, mmap_mode='r', block_size=2048):
+        """
+        Load a saved forest with its node arrays memory-mapped read-only
+
+        Every process mapping the same files shares one copy of the pages in
+        the OS page cache. The sklearn trees are not kept, so every batch size
+        scores through the node-array walk.
+
+        Returns:
+            CompiledForest
+        """
+        with open(os.path.join(directory, MANIFEST_FILE)) as f:
+            manifest = json.load(f)
+        if manifest.get('version') != ARTIFACT_VERSION:
+            raise ValueError(f"Unsupported compiled model version: {manifest.get('version')}")
+
+        forest = cls.__new__(cls)
+        for name in cls.SCORING_ARRAYS:
+            setattr(forest, name, np.load(os.path.join(directory, f'{name}.npy'),
+                                          mmap_mode=mmap_mode, allow_pickle=False))
+        forest.n_features_in_ = manifest['n_features_in']
+        forest.n_estimators = manifest['n_estimators']
+        forest.max_depth = manifest['max_depth']
+        forest.block_size = block_size
+        forest.vectorized_max_rows = block_size
+        forest.native_trees = None
+        forest.source_sha256 = manifest.get('source_sha256')
+        return forest
+
+    def apply(self, X):
+        """Return the global leaf index reached by each sample in each tree, shape (n_samples, n_trees)"""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if not np.isfinite(X).all():
+            # NaN would silently take the left branch in the walk; sklearn refuses it the same way
+            if np.isnan(X).any():
+                raise ValueError("Input X contains NaN.")
+            raise ValueError("Input X contains infinity or a value too large for dtype('float32').")
+        if X.shape[0] > self.vectorized_max_rows and self.native_trees is not None:
+            leaves = np.empty((X.shape[0], self.n_estimators), dtype=np.intp)
+            for i, tree in enumerate(self.native_trees):
+                leaves[:, i] = tree.apply(X) + self.roots[i]
+            return leaves
+        return self._walk(X)
+
+    def _walk(self, X):
+        X_flat = X.ravel()
+        n_samples = X.shape[0]
+
+        # Walk every (sample, tree) pair together; pairs drop out as they reach a leaf
+        leaves = np.broadcast_to(self.roots, (n_samples, self.n_estimators)).ravel().copy()
+        pair = np.flatnonzero(~self.is_leaf[leaves])
+        nodes = leaves[pair]
+        base = (pair // self.n_estimators) * X.shape[1]
+        while pair.size:
+            go_right = X_flat[base + self.feature[nodes]] > self.threshold32[nodes]
+            nodes = self.children[2 * nodes + go_right]
+            done = self.is_leaf[nodes]
+            if done.any():
+                leaves[pair[done]] = nodes[done]
+                active = ~done
+                pair, nodes, base = pair[active], nodes[active], base[active]
+        return leaves.reshape(n_samples, self.n_estimators)
+
+    def predict_proba(self, X):
+        """Average leaf class probabilities over all trees"""
+        X = np.atleast_2d(np.asarray(X, dtype=np.float32))
+        proba = np.empty((X.shape[0], len(self.classes_)), dtype=np.float64)
+        for start in range(0, X.shape[0], self.block_size):
+            block = slice(start, start + self.block_size)
+            leaves = self.apply(X[block])
+            for k, class_proba in enumerate(self.leaf_proba_by_class):
+                proba[block, k] = class_proba[leaves].sum(axis=1) / self.n_estimators
+        return proba
+
+    def predict_with_proba(self, X):
+        """Return (labels, probabilities) from a single traversal of every tree"""
+        proba = self.predict_proba(X)
+        return self.classes_[proba.argmax(axis=1)], proba
+
+    def predict(self, X):
+        return self.predict_with_proba(X)[0]
+
+
+def predict_with_proba(model, X):
+    """
+    Labels and probabilities from one pass, for CompiledForest or any sklearn classifier
+
+    Args:
+        model: CompiledForest or fitted sklearn classifier
+        X: Feature matrix (n_samples, n_features)
+
+    Returns:
+        tuple: (labels, probabilities)
+    """
+    if hasattr(model, 'predict_with_proba'):
+        return model.predict_with_proba(X)
+    proba = model.predict_proba(X)
+    return model.classes_[proba.argmax(axis=1)], proba
+
+
+def file_sha256(path):
+    """Hex SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_compiled_forest(directory=COMPILED_MODEL_DIR, source_path=None, mmap_mode='r'):
+    """
+    Memory-mapped CompiledForest if a current conversion exists
+
+    Args:
+        directory: Directory written by CompiledForest.save
+        source_path: Model file the arrays must have been converted from;
+            if it has changed since the conversion, the arrays are ignored
+
+    Returns:
+        CompiledForest or None if there is no usable conversion
+    """
+    if not os.path.exists(os.path.join(directory, MANIFEST_FILE)):
+        return None
+    try:
+        forest = CompiledForest.load(directory, mmap_mode=mmap_mode)
+    except (OSError, ValueError, KeyError):
+        return None
+    if source_path and forest.source_sha256 != file_sha256(source_path):
+        return None
+    return forest
+
+
+def compile_website_model(model, engine=None):
+    """
+    Wrap the website model in the engine selected by WEBSITE_MODEL_ENGINE
+
+    Falls back to the sklearn estimator if the model cannot be compiled
+    (e.g. it is not a tree ensemble).
+    """
+    engine = engine or os.getenv(ENGINE_ENV_VAR, 'compiled')
+    if engine != 'compiled':
+        return model
+    try:
+        return CompiledForest(model)
+    except (AttributeError, TypeError):
+        return model
+
+
+def load_website_forest(model_path, arrays_dir=COMPILED_MODEL_DIR, engine=None):
+    """
+    Website model ready for scoring
+
+    Uses the memory-mapped arrays when a current conversion exists, otherwise
+    unpickles the joblib model and wraps it per WEBSITE_MODEL_ENGINE.
+
+    Args:
+        model_path: Fitted sklearn forest saved with joblib
+        arrays_dir: Directory written by utils/convert_models.py
+        engine: 'compiled' or 'sklearn' (default: WEBSITE_MODEL_ENGINE)
+    """
+    engine = engine or os.getenv(ENGINE_ENV_VAR, 'compiled')
+    model = None
+    if engine == 'compiled':
+        model = load_compiled_forest(arrays_dir, source_path=model_path)
+    if model is None:
+        model = compile_website_model(joblib.load(model_path), engine)
+    return model
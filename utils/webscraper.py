@@ -3,29 +3,53 @@ Website Metadata Scraper
 Extracts features from a live website URL for credibility prediction
 """
 
+import asyncio
 import requests
-from bs4 import BeautifulSoup
+from utils.http_session import get_session, get_timeout
 import time
 from urllib.parse import urlparse, urljoin
 import ssl
 import socket
 from datetime import datetime
+import os
 import re
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from utils import rdap
+from utils.domains import registrable_domain
+from utils.html_features import extract_html_features
+from utils.keywords import KNOWN_SITE_AGES, SCRAPER_KEYWORDS
+from utils.page_cache import PAGE_CACHE_MAX_BYTES, CachedPage, PageCache, is_cacheable
+from utils.sqlite_cache import SQLiteCache, cache_path
 
-def scrape_website_metadata(url, timeout=10):
-    """
-    Scrape metadata from a website URL
-    
-    Args:
-        url: Website URL to scrape
-        timeout: Request timeout in seconds
-        
-    Returns:
-        dict: Extracted metadata features
-    """
-    
-    # Initialize metadata dictionary with default values
-    metadata = {
+# WHOIS results barely change: keep hits for 30 days, retry failures after an hour
+WHOIS_CACHE_TTL = float(os.getenv('WHOIS_CACHE_TTL', 30 * 24 * 3600))
+WHOIS_NEGATIVE_TTL = float(os.getenv('WHOIS_NEGATIVE_TTL', 3600))
+_whois_cache = None
+
+_page_cache = None
+
+# Largest page body read, in bytes (after decompression); longer pages are analysed from this prefix
+PAGE_MAX_BYTES = int(os.getenv('SCRAPER_MAX_PAGE_BYTES', 5 * 1024 * 1024))
+# In head-only mode reading stops once </head> and at least this many bytes have arrived
+PAGE_HEAD_BYTES = int(os.getenv('SCRAPER_HEAD_BYTES', 32 * 1024))
+HTML_CONTENT_TYPES = ('text/html', 'application/xhtml+xml')
+_HEAD_END = re.compile(rb'</head\s*>', re.I)
+
+# Metadata a cached page contributes when it revalidates with a 304 (everything derived from the download)
+CACHED_PAGE_KEYS = [
+    'page_load_time_sec', 'external_links_count', 'ads_density_score', 'popups_present',
+    'mobile_responsive', 'contact_info_available', 'privacy_policy_exists', 'terms_of_service_exists',
+    'social_media_presence', 'cdn_used', 'server_location', 'hosting_type', 'content_update_frequency',
+]
+
+# Overall budget for the raced WHOIS strategies, in seconds
+WHOIS_DEADLINE = float(os.getenv('WHOIS_DEADLINE', 5))
+
+def _default_metadata():
+    """Metadata dictionary with the default value of every feature"""
+    return {
         'domain': '',
         'has_https': 'No',
         'ssl_valid': 'No',
@@ -52,427 +76,622 @@ def scrape_website_metadata(url, timeout=10):
         'mobile_responsive': 'No',
         'debug_info': []  # For debugging
     }
-    
+
+
+def _error_metadata(error):
+    """Map a scraping exception to the error dict returned to callers"""
+    if isinstance(error, requests.exceptions.Timeout):
+        return {'error': 'Request timeout - website took too long to respond'}
+    if isinstance(error, requests.exceptions.ConnectionError):
+        return {'error': 'Connection error - could not reach website'}
+    if isinstance(error, requests.exceptions.RequestException):
+        return {'error': f'Request error: {str(error)}'}
+    return {'error': f'Scraping error: {str(error)}'}
+
+
+def _normalize_url(url):
+    if not url.startswith(('http://', 'https://')):
+        url = 'https://' + url
+    return url, urlparse(url)
+
+
+# ---------------------------------------------------------------------------
+# Network stages - independent of each other, so they can run concurrently
+# ---------------------------------------------------------------------------
+
+def _get_page_cache():
+    """Process-wide page cache, opened on first use (None if disabled or unusable)"""
+    global _page_cache
+    if _page_cache is None and PAGE_CACHE_MAX_BYTES > 0:
+        try:
+            _page_cache = PageCache(cache_path('pages.sqlite3'))
+        except sqlite3.Error:
+            return None
+    return _page_cache
+
+
+def _read_body(response, head_only=False):
+    """
+    Stream the body into response.content, stopping at PAGE_MAX_BYTES
+
+    Successful responses that declare a non-HTML Content-Type are refused
+    before any of the body is read. With head_only, reading stops as soon as
+    the document head and the first PAGE_HEAD_BYTES have arrived. Responses
+    cut short get a `partial` flag so they are not stored in the page cache.
+    """
+    mime_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+    if 200 <= response.status_code < 300 and mime_type and mime_type not in HTML_CONTENT_TYPES:
+        response.close()
+        raise ValueError(f"Not an HTML page (Content-Type: {mime_type})")
+
+    body = bytearray()
+    partial = False
+    head_seen = False
+    for chunk in response.iter_content(64 * 1024):
+        # Look for </head> in the new bytes (plus a few, in case it straddles two chunks)
+        search_from = max(len(body) - 8, 0)
+        body += chunk
+        if len(body) >= PAGE_MAX_BYTES:
+            partial = True
+            break
+        if head_only:
+            head_seen = head_seen or _HEAD_END.search(body, search_from) is not None
+            if head_seen and len(body) >= PAGE_HEAD_BYTES:
+                partial = True
+                break
+    response.close()
+
+    response._content = bytes(body[:PAGE_MAX_BYTES])
+    response._content_consumed = True
+    response.partial = partial
+    return response
+
+
+def _fetch_page(url, timeout, head_only=False):
+    """
+    Stage 1: HTTP GET
+
+    The request verifies the certificate, so a successful HTTPS fetch also
+    proves the certificate valid and carries its details. If verification
+    fails the page is fetched again without it and the SSLError is returned
+    in place of the TLS details.
+
+    A page already in the page cache is revalidated with If-None-Match /
+    If-Modified-Since; on a 304 the stored page (a CachedPage) is returned
+    together with the load time measured when it was first downloaded.
+    The body is streamed and capped, see _read_body.
+
+    Returns:
+        tuple: (response, load_time_sec, tls_info) where tls_info is
+        (cert, tls_version) from the original host's connection, the
+        SSLError, or None if nothing could be captured
+    """
+    session = get_session()
+    cache = _get_page_cache()
+    try:
+        cached = cache.get(url) if cache is not None else None
+    except sqlite3.Error:
+        cached = None
+    headers = cached.conditional_headers() if cached is not None else None
+
+    tls_info = None
+    try:
+        start_time = time.time()
+        response = session.get(url, timeout=get_timeout(timeout), allow_redirects=True, headers=headers,
+                               stream=True)
+    except requests.exceptions.SSLError as ssl_error:
+        start_time = time.time()
+        response = session.get(url, timeout=get_timeout(timeout), allow_redirects=True, verify=False,
+                               headers=headers, stream=True)
+        tls_info = ssl_error
+    else:
+        # The first hop is the connection to the host the user asked about
+        first_hop = (response.history or [response])[0]
+        if getattr(first_hop, 'peer_certificate', None):
+            tls_info = (first_hop.peer_certificate, first_hop.tls_version)
+
+    if cached is not None and response.status_code == 304:
+        response.close()
+        cache.record_hit()
+        return cached, cached.features.get('page_load_time_sec', time.time() - start_time), tls_info
+
+    _read_body(response, head_only)
+    return response, time.time() - start_time, tls_info
+
+
+def _store_page(url, response, metadata):
+    """Keep a freshly downloaded page and its derived features for later revalidation"""
+    cache = _get_page_cache()
+    if (cache is None or isinstance(response, CachedPage) or getattr(response, 'partial', False)
+            or not is_cacheable(response)):
+        return
+    try:
+        cache.put(url, response, {key: metadata[key] for key in CACHED_PAGE_KEYS})
+    except sqlite3.Error:
+        pass
+
+
+def _fetch_tls_info(hostname):
+    """Fallback TLS handshake when the page connection exposed no certificate. Returns (cert, tls_version)"""
+    context = ssl.create_default_context()
+    with socket.create_connection((hostname, 443), timeout=5) as sock:
+        with context.wrap_socket(sock, server_hostname=hostname) as ssock:
+            return ssock.getpeercert(), ssock.version()
+
+
+def _age_in_years(creation_date):
+    age_days = (datetime.now() - creation_date).days
+    return round(age_days / 365.25, 1)
+
+
+def _get_whois_cache():
+    """Process-wide WHOIS cache, opened on first use (None if the cache file is unusable)"""
+    global _whois_cache
+    if _whois_cache is None:
+        try:
+            _whois_cache = SQLiteCache(cache_path('whois.sqlite3'), default_ttl=WHOIS_CACHE_TTL)
+        except sqlite3.Error:
+            return None
+    return _whois_cache
+
+
+def _cached_whois_lookup(domain):
+    """
+    WHOIS stage behind a persistent cache keyed by registrable domain
+
+    Successful lookups (with a creation date) are kept for WHOIS_CACHE_TTL;
+    lookups that found no creation date are cached for WHOIS_NEGATIVE_TTL so
+    failing or rate-limited domains are not re-queried on every request.
+    """
+    key = registrable_domain(domain)
+    cache = _get_whois_cache() if key else None
+    if cache is None:
+        return _lookup_whois(domain)
+
+    try:
+        cached = cache.get(key)
+    except sqlite3.Error:
+        cached = None
+    if cached is not None:
+        record = dict(cached)
+        if record.get('creation_date'):
+            record['creation_date'] = datetime.fromisoformat(record['creation_date'])
+        return record, [f"WHOIS cache hit for {key} ({cache.stats_text()})"]
+
+    record, debug_info = _lookup_whois(domain)
+    found = record.get('creation_date') is not None
+    stored = dict(record)
+    if found:
+        stored['creation_date'] = record['creation_date'].isoformat()
+    try:
+        cache.set(key, stored, ttl=WHOIS_CACHE_TTL if found else WHOIS_NEGATIVE_TTL)
+    except sqlite3.Error:
+        pass
+    debug_info.append(f"WHOIS cache miss for {key} ({cache.stats_text()})")
+    return record, debug_info
+
+
+def _normalize_registrar(registrar):
+    registrar = str(registrar)
+    if 'MarkMonitor' in registrar:
+        return 'MarkMonitor'
+    elif 'CSC' in registrar or 'Corporation Service' in registrar:
+        return 'CSC Corporate'
+    elif 'Network Solutions' in registrar:
+        return 'Network Solutions'
+    elif 'Verisign' in registrar:
+        return 'Verisign'
+    elif 'GoDaddy' in registrar:
+        return 'GoDaddy'
+    elif 'Namecheap' in registrar:
+        return 'Namecheap'
+    return registrar[:30]
+
+
+def _whois_via_library(domain, timeout, cancelled):
+    """WHOIS strategy: python-whois library. Returns (record, debug messages)"""
+    import whois
+    record = {}
+    debug_info = [f"Querying WHOIS for {domain}..."]
+    try:
+        domain_info = whois.whois(domain, timeout=max(1, int(timeout)))
+    except TypeError:
+        # python-whois releases before 0.9 take no timeout argument
+        domain_info = whois.whois(domain)
+    debug_info.append("WHOIS query completed")
+
+    if domain_info and hasattr(domain_info, 'creation_date') and domain_info.creation_date:
+        creation_date = domain_info.creation_date
+        if isinstance(creation_date, list):
+            creation_date = creation_date[0]
+
+        if creation_date:
+            age_years = _age_in_years(creation_date)
+            record['creation_date'] = creation_date
+            debug_info.append(f"Domain age found: {age_years} years")
+    else:
+        debug_info.append("No creation_date in WHOIS response")
+
+    if domain_info and hasattr(domain_info, 'registrar') and domain_info.registrar:
+        record['domain_registrar'] = _normalize_registrar(domain_info.registrar)
+
+    # Check WHOIS privacy
+    if domain_info and hasattr(domain_info, 'emails') and domain_info.emails:
+        emails = domain_info.emails if isinstance(domain_info.emails, list) else [domain_info.emails]
+        record['whois_privacy_enabled'] = bool(
+            SCRAPER_KEYWORDS.find_in_any([str(email).lower() for email in emails], ('whois_privacy',))
+        )
+
+    return record, debug_info
+
+
+def _whois_via_api(domain, timeout, cancelled):
+    """WHOIS strategy: whoisxmlapi.com free tier. Returns (record, debug messages)"""
+    record = {}
+    whois_api_url = f"https://www.whoisxmlapi.com/whoisserver/WhoisService?apiKey=at_free&domainName={domain}&outputFormat=JSON"
+    whois_response = get_session().get(whois_api_url, timeout=get_timeout(timeout))
+
+    if whois_response.status_code == 200:
+        whois_data = whois_response.json()
+        if 'WhoisRecord' in whois_data and 'createdDate' in whois_data['WhoisRecord']:
+            created_date_str = whois_data['WhoisRecord']['createdDate']
+            # Parse date (format: 2024-01-15T00:00:00Z)
+            record['creation_date'] = datetime.strptime(created_date_str.split('T')[0], '%Y-%m-%d')
+
+            # Also get registrar if available
+            if 'registrarName' in whois_data['WhoisRecord']:
+                record['domain_registrar'] = whois_data['WhoisRecord']['registrarName'][:30]
+
+    return record, []
+
+
+def _whois_via_rdap(domain, timeout, cancelled):
+    """WHOIS strategy: RDAP for the registrable domain, port 43 for TLDs without RDAP. Returns (record, debug messages)"""
+    return rdap.lookup_domain(registrable_domain(domain) or domain, timeout, cancelled)
+
+
+# Strategies raced by _lookup_whois, in order of preference for partial results
+WHOIS_STRATEGIES = [
+    ('python-whois', _whois_via_library),
+    ('whoisxmlapi', _whois_via_api),
+    ('rdap', _whois_via_rdap),
+]
+
+
+def _lookup_whois(domain, deadline=None):
+    """
+    Stage 3: Domain age, registrar and privacy via WHOIS
+
+    All WHOIS_STRATEGIES are started at once; the first one that returns a
+    creation date wins and the others are abandoned. Nothing waits past one
+    overall deadline, so a dead WHOIS server costs one timeout rather than
+    one per strategy. If no strategy finds a creation date, registrar and
+    privacy fields are merged from whatever did answer.
+
+    Args:
+        domain: Hostname to look up
+        deadline: Overall WHOIS budget in seconds (default WHOIS_DEADLINE)
+
+    Returns:
+        tuple: (record dict with creation_date / domain_registrar /
+        whois_privacy_enabled for whatever was found, debug messages list)
+    """
+    deadline = WHOIS_DEADLINE if deadline is None else deadline
+    debug_info = ["Starting WHOIS lookup..."]
+    cancelled = threading.Event()
+    started = time.monotonic()
+
+    executor = ThreadPoolExecutor(max_workers=len(WHOIS_STRATEGIES), thread_name_prefix='whois')
+    futures = {
+        executor.submit(strategy, domain, deadline, cancelled): name
+        for name, strategy in WHOIS_STRATEGIES
+    }
+    results = {}
+    winner = None
+    pending = set(futures)
+    try:
+        while pending and winner is None:
+            remaining = deadline - (time.monotonic() - started)
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = futures[future]
+                try:
+                    record, messages = future.result()
+                except Exception as error:
+                    debug_info.append(f"{name} failed: {error}")
+                    continue
+                debug_info.extend(messages)
+                results[name] = record
+                if winner is None and record.get('creation_date'):
+                    winner = name
+    finally:
+        # Stop whatever is still running; threads blocked in I/O are left to their own timeouts
+        cancelled.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    elapsed = time.monotonic() - started
+    if winner is not None:
+        debug_info.append(f"WHOIS answered by {winner} in {elapsed:.2f}s")
+    elif pending:
+        debug_info.append(f"WHOIS deadline of {deadline:g}s reached "
+                          f"({', '.join(futures[f] for f in pending)} still running)")
+
+    record = dict(results.get(winner, {}))
+    for name, _ in WHOIS_STRATEGIES:
+        for field, value in results.get(name, {}).items():
+            if field != 'creation_date':
+                record.setdefault(field, value)
+    return record, debug_info
+
+
+# ---------------------------------------------------------------------------
+# Feature assembly - turns the stage results into the metadata dict
+# ---------------------------------------------------------------------------
+
+def _apply_tls_features(metadata, cert, tls_version):
+    """SSL/TLS features from the peer certificate and negotiated version"""
+    # TLS version
+    if tls_version:
+        metadata['tls_version'] = tls_version.replace('v', ' ')
+
+    # SSL Issuer
+    if cert and 'issuer' in cert:
+        issuer_info = dict(x[0] for x in cert['issuer'])
+        org = issuer_info.get('organizationName', 'Unknown')
+        cn = issuer_info.get('commonName', '')
+
+        issuer_full = f"{org} {cn}".lower()
+
+        if 'let\'s encrypt' in issuer_full or 'letsencrypt' in issuer_full:
+            metadata['ssl_issuer'] = "Let's Encrypt"
+        elif 'digicert' in issuer_full:
+            metadata['ssl_issuer'] = 'DigiCert'
+        elif 'globalsign' in issuer_full:
+            metadata['ssl_issuer'] = 'GlobalSign'
+        elif 'google' in issuer_full:
+            metadata['ssl_issuer'] = 'DigiCert'  # Google Trust Services -> map to DigiCert (similar tier)
+        elif 'comodo' in issuer_full or 'sectigo' in issuer_full:
+            metadata['ssl_issuer'] = 'DigiCert'  # Comodo/Sectigo -> map to DigiCert (similar tier)
+        elif 'geotrust' in issuer_full:
+            metadata['ssl_issuer'] = 'GeoTrust'
+        elif 'cloudflare' in issuer_full:
+            metadata['ssl_issuer'] = 'Cloudflare'
+        elif 'amazon' in issuer_full:
+            metadata['ssl_issuer'] = 'Amazon'
+        else:
+            metadata['ssl_issuer'] = org[:20]  # Truncate long names
+
+    # Certificate type (heuristic + professional site upgrade)
+    if cert and 'subject' in cert:
+        subject = dict(x[0] for x in cert['subject'])
+
+        # Check if it's a well-known professional site
+        if SCRAPER_KEYWORDS.matches(metadata['domain'].lower(), 'major_tech_site'):
+            # Major tech companies typically have OV or EV certificates
+            metadata['certificate_type'] = 'OV'
+        elif 'organizationName' in subject and 'localityName' in subject:
+            metadata['certificate_type'] = 'OV'  # Organization Validation
+        elif 'organizationName' in subject:
+            metadata['certificate_type'] = 'DV'  # Domain Validation
+        else:
+            metadata['certificate_type'] = 'DV'
+
+
+def _apply_page_features(metadata, response, parsed_url):
+    """Content, infrastructure and header features from the fetched page"""
+    if isinstance(response, CachedPage):
+        # Revalidated page: reuse the features computed from the original download
+        metadata.update({key: value for key, value in response.features.items()
+                         if key != 'page_load_time_sec'})
+        return
+
+    # Content features from one pass over the HTML
+    page_features = extract_html_features(response.content, parsed_url.netloc)
+    cdn_found = page_features.pop('cdn_in_resources')
+    date_meta = page_features.pop('modified_meta')
+    metadata.update(page_features)
+
+    # Also check response headers for CDN indicators
+    if not cdn_found:
+        headers_to_check = ['server', 'x-cache', 'x-cdn', 'cf-ray', 'x-amz-cf-id', 'x-fastly-request-id']
+        for header in headers_to_check:
+            if header in response.headers:
+                header_value = response.headers[header].lower()
+                if SCRAPER_KEYWORDS.matches(header_value, 'cdn') or 'cache' in header_value:
+                    cdn_found = True
+                    break
+
+    metadata['cdn_used'] = 'yes' if cdn_found else 'no'
+
+    # Server location (from response headers)
+    server_header = response.headers.get('Server', '')
+    cf_ray = response.headers.get('CF-RAY', '')  # Cloudflare
+
+    if cf_ray or 'cloudflare' in server_header.lower():
+        metadata['server_location'] = 'USA'  # Cloudflare is US-based
+    else:
+        metadata['server_location'] = 'Unknown'
+
+    # Hosting type heuristic
+    # Model only knows: dedicated (nothing else!)
+    # Set to dedicated for professional/enterprise server headers or well-known professional domains
+    is_professional = (SCRAPER_KEYWORDS.matches(server_header.lower(), 'hosting') or
+                       SCRAPER_KEYWORDS.matches(metadata['domain'].lower(), 'professional_site'))
+
+    if is_professional:
+        metadata['hosting_type'] = 'dedicated'
+    else:
+        # Don't set hosting_type if uncertain
+        pass  # metadata['hosting_type'] already has '' as default
+
+    # Content update frequency (heuristic based on meta tags)
+    last_modified = response.headers.get('Last-Modified', '')
+    if date_meta or last_modified:
+        metadata['content_update_frequency'] = 'weekly'
+    else:
+        metadata['content_update_frequency'] = 'irregular'
+
+
+def _apply_whois_features(metadata, whois_result):
+    """Domain age / registrar features from the WHOIS stage, with known-site fallbacks"""
+    record, debug_info = whois_result
+    domain_age_found = record.get('creation_date') is not None
+    if domain_age_found:
+        metadata['domain_age_years'] = _age_in_years(record['creation_date'])
+    for key in ('domain_registrar', 'whois_privacy_enabled'):
+        if key in record:
+            metadata[key] = record[key]
+    metadata['debug_info'].extend(debug_info)
+
+    # Fallback: For well-known sites, assign likely registrar and better age estimates
+    if metadata['domain_registrar'] == 'Unknown':
+        domain_lower = metadata['domain'].lower()
+
+        # Major tech companies typically use MarkMonitor
+        if SCRAPER_KEYWORDS.matches(domain_lower, 'markmonitor_site'):
+            metadata['domain_registrar'] = 'MarkMonitor'
+            metadata['debug_info'].append("Assigned MarkMonitor based on site recognition")
+
+    # Fallback: Better age estimates for well-known sites
+    if not domain_age_found:
+        domain_lower = metadata['domain'].lower()
+        site = SCRAPER_KEYWORDS.first(domain_lower, 'known_age_site')
+        if site is not None:
+            age = KNOWN_SITE_AGES[site]
+            metadata['domain_age_years'] = age
+            metadata['debug_info'].append(f"Assigned known age for {site.title()}: {age} years")
+            domain_age_found = True
+
+    # Add debug info if domain age couldn't be retrieved
+    if not domain_age_found:
+        metadata['debug_info'].append(f"Could not retrieve actual domain age - using default neutral value ({metadata['domain_age_years']} years)")
+
+
+def _assemble_metadata(metadata, parsed_url, page, tls_info, whois_result):
+    """
+    Combine the stage results into the final metadata dict
+
+    Args:
+        metadata: Defaults with 'domain' and 'has_https' already set
+        parsed_url: Parsed (normalized) URL
+        page: (response, load_time, ...) from _fetch_page
+        tls_info: (cert, tls_version), an exception if the certificate
+            could not be verified, or None for plain HTTP
+        whois_result: (record, debug_info) from _cached_whois_lookup
+    """
+    response, load_time = page[0], page[1]
+    metadata['page_load_time_sec'] = round(load_time, 2)
+    metadata['server_response_code'] = response.status_code
+    metadata['redirect_count'] = len(response.history)
+
+    # SSL/TLS Information
+    if parsed_url.scheme == 'https':
+        try:
+            if isinstance(tls_info, BaseException) or tls_info is None:
+                raise tls_info or ssl.SSLError('No TLS information available')
+            metadata['ssl_valid'] = 'Yes'
+            _apply_tls_features(metadata, *tls_info)
+        except Exception as ssl_error:
+            metadata['ssl_valid'] = 'No'
+            metadata['ssl_issuer'] = 'Unknown'
+
+    _apply_page_features(metadata, response, parsed_url)
+    _store_page(parsed_url.geturl(), response, metadata)
+    _apply_whois_features(metadata, whois_result)
+    return metadata
+
+
+def scrape_website_metadata(url, timeout=10, head_only=False):
+    """
+    Scrape metadata from a website URL
+
+    Args:
+        url: Website URL to scrape
+        timeout: Request timeout in seconds
+        head_only: Stop downloading after the document head and the first
+            PAGE_HEAD_BYTES (faster; body-level features see only that part)
+
+    Returns:
+        dict: Extracted metadata features
+    """
+
+    # Initialize metadata dictionary with default values
+    metadata = _default_metadata()
+
     try:
         # Normalize URL
-        if not url.startswith(('http://', 'https://')):
-            url = 'https://' + url
-        
-        parsed_url = urlparse(url)
+        url, parsed_url = _normalize_url(url)
         metadata['domain'] = parsed_url.netloc or parsed_url.path
-        
+
         # Check HTTPS
         metadata['has_https'] = 'Yes' if parsed_url.scheme == 'https' else 'No'
-        
-        # Make HTTP request and measure load time
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
-        
-        start_time = time.time()
-        response = requests.get(url, headers=headers, timeout=timeout, allow_redirects=True, verify=False)
-        load_time = time.time() - start_time
-        
-        metadata['page_load_time_sec'] = round(load_time, 2)
-        metadata['server_response_code'] = response.status_code
-        metadata['redirect_count'] = len(response.history)
-        
-        # SSL/TLS Information
-        if parsed_url.scheme == 'https':
+
+        # Make HTTP request and measure load time (TLS details come from the same connection)
+        page = _fetch_page(url, timeout, head_only)
+        tls_info = page[2]
+
+        if parsed_url.scheme == 'https' and tls_info is None:
             try:
-                metadata['ssl_valid'] = 'Yes'
-                
-                # Get SSL certificate info
-                hostname = parsed_url.netloc
-                context = ssl.create_default_context()
-                
-                with socket.create_connection((hostname, 443), timeout=5) as sock:
-                    with context.wrap_socket(sock, server_hostname=hostname) as ssock:
-                        cert = ssock.getpeercert()
-                        tls_version = ssock.version()
-                        
-                        # TLS version
-                        if tls_version:
-                            metadata['tls_version'] = tls_version.replace('v', ' ')
-                        
-                        # SSL Issuer
-                        if cert and 'issuer' in cert:
-                            issuer_info = dict(x[0] for x in cert['issuer'])
-                            org = issuer_info.get('organizationName', 'Unknown')
-                            cn = issuer_info.get('commonName', '')
-                            
-                            issuer_full = f"{org} {cn}".lower()
-                            
-                            if 'let\'s encrypt' in issuer_full or 'letsencrypt' in issuer_full:
-                                metadata['ssl_issuer'] = "Let's Encrypt"
-                            elif 'digicert' in issuer_full:
-                                metadata['ssl_issuer'] = 'DigiCert'
-                            elif 'globalsign' in issuer_full:
-                                metadata['ssl_issuer'] = 'GlobalSign'
-                            elif 'google' in issuer_full:
-                                metadata['ssl_issuer'] = 'DigiCert'  # Google Trust Services -> map to DigiCert (similar tier)
-                            elif 'comodo' in issuer_full or 'sectigo' in issuer_full:
-                                metadata['ssl_issuer'] = 'DigiCert'  # Comodo/Sectigo -> map to DigiCert (similar tier)
-                            elif 'geotrust' in issuer_full:
-                                metadata['ssl_issuer'] = 'GeoTrust'
-                            elif 'cloudflare' in issuer_full:
-                                metadata['ssl_issuer'] = 'Cloudflare'
-                            elif 'amazon' in issuer_full:
-                                metadata['ssl_issuer'] = 'Amazon'
-                            else:
-                                metadata['ssl_issuer'] = org[:20]  # Truncate long names
-                        
-                        # Certificate type (heuristic + professional site upgrade)
-                        if cert and 'subject' in cert:
-                            subject = dict(x[0] for x in cert['subject'])
-                            
-                            # Check if it's a well-known professional site
-                            domain_parts = metadata['domain'].lower()
-                            major_tech_sites = ['github', 'google', 'youtube', 'facebook', 'microsoft', 
-                                              'amazon', 'apple', 'netflix', 'twitter', 'linkedin', 'reddit',
-                                              'wikipedia', 'stackoverflow', 'zoom', 'dropbox', 'adobe']
-                            
-                            is_major_site = any(site in domain_parts for site in major_tech_sites)
-                            
-                            if is_major_site:
-                                # Major tech companies typically have OV or EV certificates
-                                metadata['certificate_type'] = 'OV'
-                            elif 'organizationName' in subject and 'localityName' in subject:
-                                metadata['certificate_type'] = 'OV'  # Organization Validation
-                            elif 'organizationName' in subject:
-                                metadata['certificate_type'] = 'DV'  # Domain Validation
-                            else:
-                                metadata['certificate_type'] = 'DV'
-                        
+                tls_info = _fetch_tls_info(parsed_url.netloc)
             except Exception as ssl_error:
-                metadata['ssl_valid'] = 'No'
-                metadata['ssl_issuer'] = 'Unknown'
-        
-        # Parse HTML content
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Extract text content
-        text_content = soup.get_text()
-        
-        # Count external links
-        all_links = soup.find_all('a', href=True)
-        external_links = 0
-        for link in all_links:
-            href = link['href']
-            if href.startswith('http') and parsed_url.netloc not in href:
-                external_links += 1
-        metadata['external_links_count'] = external_links
-        
-        # Detect ads (heuristic: look for common ad-related classes/ids)
-        ad_indicators = soup.find_all(class_=re.compile(r'ad|advertisement|banner|sponsor', re.I))
-        ad_indicators += soup.find_all(id=re.compile(r'ad|advertisement|banner|sponsor', re.I))
-        iframe_ads = soup.find_all('iframe', src=re.compile(r'ad|doubleclick|adsense', re.I))
-        
-        total_elements = len(soup.find_all())
-        ad_elements = len(ad_indicators) + len(iframe_ads)
-        metadata['ads_density_score'] = round(min(ad_elements / max(total_elements, 1), 1.0), 2)
-        
-        # Detect popups (heuristic: modal, overlay classes)
-        # Be more strict - many legitimate sites use modals for cookie consent
-        popup_indicators = soup.find_all(class_=re.compile(r'popup|pop-up|popover', re.I))
-        popup_indicators += soup.find_all(id=re.compile(r'popup|pop-up', re.I))
-        # Filter out cookie/consent modals which are legitimate
-        popup_indicators = [p for p in popup_indicators 
-                          if not any(word in str(p.get('class', [])).lower() + str(p.get('id', '')).lower() 
-                                    for word in ['cookie', 'consent', 'gdpr', 'privacy'])]
-        metadata['popups_present'] = 'Yes' if len(popup_indicators) > 3 else 'No'
-        
-        # Check for mobile responsiveness
-        viewport = soup.find('meta', attrs={'name': 'viewport'})
-        if viewport and 'content' in viewport.attrs:
-            metadata['mobile_responsive'] = 'Yes'
-        else:
-            # Check for responsive classes
-            responsive_classes = soup.find_all(class_=re.compile(r'responsive|mobile|col-', re.I))
-            metadata['mobile_responsive'] = 'Partial' if len(responsive_classes) > 5 else 'No'
-        
-        # Check for contact information
-        contact_keywords = ['contact', 'email', 'phone', 'address', 'reach us', 'get in touch']
-        contact_found = any(keyword in text_content.lower() for keyword in contact_keywords)
-        contact_page = any('contact' in str(link.get('href', '')).lower() for link in all_links)
-        metadata['contact_info_available'] = contact_found or contact_page
-        
-        # Check for privacy policy
-        privacy_keywords = ['privacy policy', 'privacy notice', 'data protection']
-        privacy_found = any(keyword in text_content.lower() for keyword in privacy_keywords)
-        privacy_link = any('privacy' in str(link.get('href', '')).lower() for link in all_links)
-        metadata['privacy_policy_exists'] = privacy_found or privacy_link
-        
-        # Check for terms of service
-        terms_keywords = ['terms of service', 'terms and conditions', 'terms of use', 'user agreement']
-        terms_found = any(keyword in text_content.lower() for keyword in terms_keywords)
-        terms_link = any('terms' in str(link.get('href', '')).lower() for link in all_links)
-        metadata['terms_of_service_exists'] = terms_found or terms_link
-        
-        # Check for social media presence
-        # Model only knows: low, medium, none (NOT high!)
-        social_platforms = ['facebook.com', 'twitter.com', 'x.com', 'linkedin.com', 'instagram.com', 
-                          'youtube.com', 'tiktok.com', 'pinterest.com']
-        social_links = sum(1 for link in all_links 
-                          if any(platform in str(link.get('href', '')).lower() for platform in social_platforms))
-        
-        if social_links >= 2:
-            metadata['social_media_presence'] = 'medium'
-        elif social_links >= 1:
-            metadata['social_media_presence'] = 'low'
-        else:
-            metadata['social_media_presence'] = 'none'
-        
-        # Detect CDN usage (check for common CDN domains in resources AND headers)
-        cdn_indicators = ['cloudflare', 'cloudfront', 'akamai', 'fastly', 'cdn.', 'maxcdn', 'cloudimg', 'jsdelivr','cdnjs']
-        scripts = soup.find_all('script', src=True)
-        links_tags = soup.find_all('link', href=True)
-        images = soup.find_all('img', src=True)
-        
-        # Check in HTML resources
-        cdn_found = any(
-            any(cdn in str(tag.get('src', '') + tag.get('href', '')).lower() for cdn in cdn_indicators)
-            for tag in scripts + links_tags + images
+                tls_info = ssl_error
+
+        whois_result = _cached_whois_lookup(metadata['domain'])
+
+        return _assemble_metadata(metadata, parsed_url, page, tls_info, whois_result)
+
+    except Exception as e:
+        return _error_metadata(e)
+
+
+async def scrape_website_metadata_async(url, timeout=10, head_only=False):
+    """
+    Async variant of scrape_website_metadata
+
+    The HTTP GET and WHOIS lookup do not depend on each other, so they run
+    concurrently in worker threads and end-to-end latency tracks the slowest
+    stage rather than the sum of all of them. TLS details come from the page
+    connection; a separate handshake only runs if none were captured.
+
+    Args:
+        url: Website URL to scrape
+        timeout: Request timeout in seconds
+        head_only: See scrape_website_metadata
+
+    Returns:
+        dict: Extracted metadata features (same shape as scrape_website_metadata)
+    """
+    metadata = _default_metadata()
+
+    try:
+        url, parsed_url = _normalize_url(url)
+        metadata['domain'] = parsed_url.netloc or parsed_url.path
+        metadata['has_https'] = 'Yes' if parsed_url.scheme == 'https' else 'No'
+
+        page, whois_result = await asyncio.gather(
+            asyncio.to_thread(_fetch_page, url, timeout, head_only),
+            asyncio.to_thread(_cached_whois_lookup, metadata['domain']),
+            return_exceptions=True
         )
-        
-        # Also check response headers for CDN indicators
-        if not cdn_found:
-            headers_to_check = ['server', 'x-cache', 'x-cdn', 'cf-ray', 'x-amz-cf-id', 'x-fastly-request-id']
-            for header in headers_to_check:
-                if header in response.headers:
-                    header_value = response.headers[header].lower()
-                    if any(cdn in header_value for cdn in cdn_indicators) or 'cache' in header_value:
-                        cdn_found = True
-                        break
-        
-        metadata['cdn_used'] = 'yes' if cdn_found else 'no'
-        
-        # Server location (from response headers)
-        server_header = response.headers.get('Server', '')
-        cf_ray = response.headers.get('CF-RAY', '')  # Cloudflare
-        
-        if cf_ray or 'cloudflare' in server_header.lower():
-            metadata['server_location'] = 'USA'  # Cloudflare is US-based
-        else:
-            metadata['server_location'] = 'Unknown'
-        
-        # Hosting type heuristic
-        # Model only knows: dedicated (nothing else!)
-        # Set to dedicated for professional/enterprise indicators
-        server_indicators = server_header.lower()
-        hosting_indicators = ['enterprise', 'aws', 'azure', 'gcp', 'google', 'amazon', 'microsoft', 'cloudflare', 'fastly', 'akamai']
-        
-        # Also check for well-known professional domains
-        domain_parts = metadata['domain'].lower()
-        professional_sites = ['github', 'google', 'youtube', 'facebook', 'microsoft', 'amazon', 'apple', 'netflix', 'twitter', 'linkedin']
-        
-        is_professional = (any(ind in server_indicators for ind in hosting_indicators) or 
-                          any(site in domain_parts for site in professional_sites))
-        
-        if is_professional:
-            metadata['hosting_type'] = 'dedicated'
-        else:
-            # Don't set hosting_type if uncertain
-            pass  # metadata['hosting_type'] already has '' as default
-        
-        # Domain age (multiple approaches for better reliability)
-        domain_age_found = False
-        metadata['debug_info'].append("Starting WHOIS lookup...")
-        
-        # Method 1: Try python-whois library
-        try:
-            import whois
-            metadata['debug_info'].append(f"Querying WHOIS for {metadata['domain']}...")
-            domain_info = whois.whois(metadata['domain'])
-            metadata['debug_info'].append("WHOIS query completed")
-            
-            if domain_info and hasattr(domain_info, 'creation_date') and domain_info.creation_date:
-                creation_date = domain_info.creation_date
-                if isinstance(creation_date, list):
-                    creation_date = creation_date[0]
-                
-                if creation_date:
-                    age_days = (datetime.now() - creation_date).days
-                    metadata['domain_age_years'] = round(age_days / 365.25, 1)
-                    domain_age_found = True
-                    metadata['debug_info'].append(f"Domain age found: {metadata['domain_age_years']} years")
-            else:
-                metadata['debug_info'].append("No creation_date in WHOIS response")
-            
-            if domain_info and hasattr(domain_info, 'registrar') and domain_info.registrar:
-                registrar = str(domain_info.registrar)
-                if 'MarkMonitor' in registrar:
-                    metadata['domain_registrar'] = 'MarkMonitor'
-                elif 'CSC' in registrar or 'Corporation Service' in registrar:
-                    metadata['domain_registrar'] = 'CSC Corporate'
-                elif 'Network Solutions' in registrar:
-                    metadata['domain_registrar'] = 'Network Solutions'
-                elif 'Verisign' in registrar:
-                    metadata['domain_registrar'] = 'Verisign'
-                elif 'GoDaddy' in registrar:
-                    metadata['domain_registrar'] = 'GoDaddy'
-                elif 'Namecheap' in registrar:
-                    metadata['domain_registrar'] = 'Namecheap'
-                else:
-                    metadata['domain_registrar'] = registrar[:30]
-            
-            # Check WHOIS privacy
-            if domain_info and hasattr(domain_info, 'emails') and domain_info.emails:
-                emails = domain_info.emails if isinstance(domain_info.emails, list) else [domain_info.emails]
-                privacy_keywords = ['privacy', 'protect', 'whoisguard', 'proxy']
-                metadata['whois_privacy_enabled'] = any(
-                    any(kw in str(email).lower() for kw in privacy_keywords) for email in emails
-                )
-        
-        except Exception as whois_error:
-            # WHOIS lookup failed, try alternative methods
-            metadata['debug_info'].append(f"python-whois failed: {str(whois_error)}")
-            pass
-        
-        # Method 2: If python-whois failed, try WHOIS API (whoisxmlapi.com free tier)
-        if not domain_age_found:
-            try:
-                whois_api_url = f"https://www.whoisxmlapi.com/whoisserver/WhoisService?apiKey=at_free&domainName={metadata['domain']}&outputFormat=JSON"
-                whois_response = requests.get(whois_api_url, timeout=5)
-                
-                if whois_response.status_code == 200:
-                    whois_data = whois_response.json()
-                    if 'WhoisRecord' in whois_data and 'createdDate' in whois_data['WhoisRecord']:
-                        created_date_str = whois_data['WhoisRecord']['createdDate']
-                        # Parse date (format: 2024-01-15T00:00:00Z)
-                        created_date = datetime.strptime(created_date_str.split('T')[0], '%Y-%m-%d')
-                        age_days = (datetime.now() - created_date).days
-                        metadata['domain_age_years'] = round(age_days / 365.25, 1)
-                        domain_age_found = True
-                        
-                        # Also get registrar if available
-                        if 'registrarName' in whois_data['WhoisRecord']:
-                            metadata['domain_registrar'] = whois_data['WhoisRecord']['registrarName'][:30]
-            
-            except Exception as api_error:
-                pass
-        
-        # Method 3: Manual socket-based WHOIS query as last resort
-        if not domain_age_found:
+
+        if isinstance(page, BaseException):
+            raise page
+        if isinstance(whois_result, BaseException):
+            whois_result = ({}, [f"WHOIS lookup failed: {whois_result}"])
+
+        tls_info = page[2]
+        if parsed_url.scheme == 'https' and tls_info is None:
             try:
-                # Determine WHOIS server
-                tld = metadata['domain'].split('.')[-1]
-                whois_servers = {
-                    'com': 'whois.verisign-grs.com',
-                    'net': 'whois.verisign-grs.com',
-                    'org': 'whois.pir.org',
-                    'uk': 'whois.nic.uk',
-                    'io': 'whois.nic.io',
-                    'co': 'whois.nic.co',
-                }
-                
-                whois_server = whois_servers.get(tld, f'whois.nic.{tld}')
-                
-                # Connect to WHOIS server
-                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                sock.settimeout(5)
-                sock.connect((whois_server, 43))
-                sock.send(f"{metadata['domain']}\r\n".encode())
-                
-                whois_data = b""
-                while True:
-                    data = sock.recv(4096)
-                    if not data:
-                        break
-                    whois_data += data
-                sock.close()
-                
-                whois_text = whois_data.decode('utf-8', errors='ignore')
-                
-                # Parse creation date from text
-                date_patterns = [
-                    r'Creation Date:\s*(\d{4}-\d{2}-\d{2})',
-                    r'Created:\s*(\d{4}-\d{2}-\d{2})',
-                    r'created:\s*(\d{4}-\d{2}-\d{2})',
-                    r'Registration Date:\s*(\d{4}-\d{2}-\d{2})',
-                    r'Registered on:\s*(\d{2}-\w{3}-\d{4})',  # UK format
-                ]
-                
-                for pattern in date_patterns:
-                    match = re.search(pattern, whois_text, re.IGNORECASE)
-                    if match:
-                        date_str = match.group(1)
-                        try:
-                            # Try YYYY-MM-DD format
-                            created_date = datetime.strptime(date_str, '%Y-%m-%d')
-                        except:
-                            try:
-                                # Try DD-MMM-YYYY format (UK)
-                                created_date = datetime.strptime(date_str, '%d-%b-%Y')
-                            except:
-                                continue
-                        
-                        age_days = (datetime.now() - created_date).days
-                        metadata['domain_age_years'] = round(age_days / 365.25, 1)
-                        domain_age_found = True
-                        break
-                
-                # Extract registrar
-                if not domain_age_found:
-                    registrar_match = re.search(r'Registrar:\s*(.+)', whois_text, re.IGNORECASE)
-                    if registrar_match:
-                        metadata['domain_registrar'] = registrar_match.group(1).strip()[:30]
-            
-            except Exception as socket_error:
-                # All methods failed - using defaults
-                pass
-        
-        # Fallback: For well-known sites, assign likely registrar and better age estimates
-        if metadata['domain_registrar'] == 'Unknown':
-            domain_lower = metadata['domain'].lower()
-            
-            # Major tech companies typically use MarkMonitor
-            markmonitor_sites = ['github', 'google', 'youtube', 'facebook', 'microsoft', 'apple', 
-                               'amazon', 'netflix', 'linkedin', 'twitter', 'reddit', 'ebay']
-            if any(site in domain_lower for site in markmonitor_sites):
-                metadata['domain_registrar'] = 'MarkMonitor'
-                metadata['debug_info'].append("Assigned MarkMonitor based on site recognition")
-        
-        # Fallback: Better age estimates for well-known sites
-        if not domain_age_found:
-            domain_lower = metadata['domain'].lower()
-            known_sites_ages = {
-                'google': 26, 'youtube': 19, 'facebook': 20, 'twitter': 18, 'linkedin': 21,
-                'github': 18, 'reddit': 19, 'microsoft': 39, 'apple': 28, 'amazon': 30,
-                'wikipedia': 24, 'netflix': 27, 'ebay': 29, 'yahoo': 29, 'instagram': 14
-            }
-            
-            for site, age in known_sites_ages.items():
-                if site in domain_lower:
-                    metadata['domain_age_years'] = age
-                    metadata['debug_info'].append(f"Assigned known age for {site.title()}: {age} years")
-                    domain_age_found = True
-                    break
-        
-        # Content update frequency (heuristic based on meta tags)
-        last_modified = response.headers.get('Last-Modified', '')
-        date_meta = soup.find('meta', attrs={'property': 'article:modified_time'}) or \
-                   soup.find('meta', attrs={'name': 'last-modified'})
-        
-        if date_meta or last_modified:
-            metadata['content_update_frequency'] = 'weekly'
-        else:
-            metadata['content_update_frequency'] = 'irregular'
-        
-        # Add debug info if domain age couldn't be retrieved
-        if not domain_age_found:
-            metadata['debug_info'].append(f"Could not retrieve actual domain age - using default neutral value ({metadata['domain_age_years']} years)")
-        
-        return metadata
-        
-    except requests.exceptions.Timeout:
-        return {'error': 'Request timeout - website took too long to respond'}
-    except requests.exceptions.ConnectionError:
-        return {'error': 'Connection error - could not reach website'}
-    except requests.exceptions.RequestException as e:
-        return {'error': f'Request error: {str(e)}'}
+                tls_info = await asyncio.to_thread(_fetch_tls_info, parsed_url.netloc)
+            except Exception as ssl_error:
+                tls_info = ssl_error
+
+        return _assemble_metadata(metadata, parsed_url, page, tls_info, whois_result)
+
     except Exception as e:
-        return {'error': f'Scraping error: {str(e)}'}
+        return _error_metadata(e)
 
 
 def format_metadata_for_display(metadata):